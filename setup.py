@@ -0,0 +1,24 @@
+"""Optional mypyc build.
+
+Set ``MSCHEMA_MYPYC=1`` (with mypy installed and ``--no-build-isolation``) to
+compile the pure-data modules to C extensions. Default builds stay pure Python.
+"""
+
+import os
+
+from setuptools import setup
+
+# Modules without typer/motor/pydantic entanglements that mypyc compiles cleanly.
+MYPYC_MODULES = [
+    "src/mongo_schematic/diff.py",
+    "src/mongo_schematic/drift.py",
+    "src/mongo_schematic/schema_io.py",
+]
+
+ext_modules = []
+if os.environ.get("MSCHEMA_MYPYC") == "1":
+    from mypyc.build import mypycify
+
+    ext_modules = mypycify(["--ignore-missing-imports", *MYPYC_MODULES])
+
+setup(ext_modules=ext_modules)
@@ -2,21 +2,141 @@
 
 from __future__ import annotations
 
+import asyncio
+import copy
+import functools
 import json
 import logging
-import re
+import os
 import time
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+from mongo_schematic.ai_cache import MemoryTTLCache, make_cache_key
+from mongo_schematic.exceptions import AIError, CircuitBreakerOpenError
 
 logger = logging.getLogger(__name__)
 
+# Bump these to invalidate cached responses after prompt or parsing changes.
+PROMPT_VERSION = "2"
+CODE_VERSION = "1"
+
+# Seconds a cached Gemini response stays valid.
+CACHE_TTL = 3600.0
+
+# Per-attempt Gemini timeout in seconds; slow attempts are retried.
+DEFAULT_REQUEST_TIMEOUT = float(os.environ.get("MSCHEMA_GEMINI_TIMEOUT", "15"))
+
+_response_cache = MemoryTTLCache()
+
+
+class _CircuitBreaker:
+    """Fail fast after repeated Gemini failures until a cooldown has passed."""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 60.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+
+    def is_open(self) -> bool:
+        """Return True while the breaker is open and the cooldown has not elapsed."""
+        if self.opened_at is None:
+            return False
+        # After the cooldown, let a trial call through (half-open).
+        return time.monotonic() - self.opened_at < self.reset_timeout
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        if self.consecutive_failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+
+    def reset(self) -> None:
+        self.consecutive_failures = 0
+        self.opened_at = None
+
+
+_breaker = _CircuitBreaker()
+
+# Collections per multi-collection prompt; larger batches give diminishing returns.
+BATCH_SIZE = 6
+
+GEMINI_MODEL = "gemini-1.5-flash"
+
+# Static prompt text; only the JSON payloads are spliced in per call.
+_RECS_PROMPT_HEADER = "You are a MongoDB schema advisor. Provide 3-5 concise recommendations."
+_RECS_PROMPT_FOOTER = (
+    "Return a JSON array of objects with fields: type, title, description, priority.\n"
+    "Priority should be: high, medium, or low."
+)
+
+_BATCH_RECS_PROMPT_HEADER = (
+    "You are a MongoDB schema advisor. For each collection below, provide 3-5 "
+    "concise recommendations.\n"
+    "Collections (JSON array of {id, schema, anomalies}):"
+)
+_BATCH_RECS_PROMPT_FOOTER = (
+    "Return a JSON object keyed by collection id. Each value is an array of objects "
+    "with fields: type, title, description, priority.\n"
+    "Priority should be: high, medium, or low."
+)
+
+_MIGRATION_PROMPT_HEADER = (
+    "You are a MongoDB migration planner. Provide a safe migration plan in JSON."
+)
+_MIGRATION_PROMPT_FOOTER = (
+    "Return JSON object with fields: strategy, batch_size, steps[].\n"
+    "Each step: action (add_field|remove_field|convert_type|rename_field), field, details."
+)
+
+# Response schema for a single collection's recommendations (Gemini OpenAPI subset).
+RECOMMENDATIONS_SCHEMA: Dict[str, Any] = {
+    "type": "array",
+    "items": {
+        "type": "object",
+        "properties": {
+            "type": {"type": "string"},
+            "title": {"type": "string"},
+            "description": {"type": "string"},
+            "priority": {"type": "string", "enum": ["high", "medium", "low"]},
+        },
+        "required": ["title", "description", "priority"],
+    },
+}
+
+# JSON mode makes Gemini return bare JSON instead of fenced markdown. Batch
+# results are keyed by collection id and migration step details are free-form,
+# which response schemas cannot express, so those only set the MIME type.
+_JSON_GENERATION_CONFIG: Dict[str, Any] = {"response_mime_type": "application/json"}
+_RECS_GENERATION_CONFIG: Dict[str, Any] = {
+    **_JSON_GENERATION_CONFIG,
+    "response_schema": RECOMMENDATIONS_SCHEMA,
+}
+
+
+@functools.lru_cache(maxsize=4)
+def _get_model(api_key: str) -> Any:
+    """Configure the Gemini client and build the model once per API key."""
+    import google.generativeai as genai
+
+    genai.configure(api_key=api_key)
+    return genai.GenerativeModel(GEMINI_MODEL)
+
 
 def _extract_json_from_text(text: str) -> Optional[str]:
     """Extract JSON from text that may contain markdown code blocks."""
-    json_pattern = r"```(?:json)?\s*([\s\S]*?)```"
-    matches = re.findall(json_pattern, text)
-    if matches:
-        return matches[0].strip()
+    start = text.find("```")
+    if start != -1:
+        body_start = start + 3
+        if text.startswith("json", body_start):
+            body_start += 4
+        end = text.find("```", body_start)
+        if end != -1:
+            return text[body_start:end].strip()
 
     text = text.strip()
     if text.startswith("[") or text.startswith("{"):
@@ -25,40 +145,181 @@ def _extract_json_from_text(text: str) -> Optional[str]:
     return None
 
 
+def _dumps_pretty(payload: Any) -> str:
+    """Serialize a prompt payload as indented JSON, using orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(payload, indent=2)
+
+
+def _loads(text: str) -> Any:
+    """Parse JSON text, using orjson when available."""
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
 def _parse_json_safe(text: str, default: Any) -> Any:
-    """Safely parse JSON with fallback extraction."""
+    """Safely parse JSON, falling back to fence extraction for non-JSON-mode replies."""
+    # orjson.JSONDecodeError subclasses json.JSONDecodeError.
     try:
-        return json.loads(text)
+        return _loads(text)
     except json.JSONDecodeError:
         extracted = _extract_json_from_text(text)
         if extracted:
             try:
-                return json.loads(extracted)
+                return _loads(extracted)
             except json.JSONDecodeError:
                 pass
         return default
 
 
-def _retry_api_call(func, max_retries: int = 2, delay: float = 1.0):
-    """Retry an API call with exponential backoff."""
+class _JsonStreamScanner:
+    """Track bracket depth across streamed chunks to spot the end of a JSON value.
+
+    Brackets inside string literals (including escaped quotes) are ignored, so
+    the buffered text only needs to be parsed once a top-level value closes. A
+    closed value that does not parse (a bracketed aside in prose) is skipped
+    and scanning resumes just after its opening bracket.
+    """
+
+    def __init__(self) -> None:
+        self._text = ""
+        self._pos = 0
+        self._start = -1
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+
+    def feed(self, chunk: str) -> Optional[str]:
+        """Consume a chunk; return the complete JSON text once it closes."""
+        self._text += chunk
+        text = self._text
+        i = self._pos
+        while i < len(text):
+            ch = text[i]
+            if self._start < 0:
+                if ch in "[{":
+                    self._start = i
+                    self._depth = 1
+            elif self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch in "[{":
+                self._depth += 1
+            elif ch in "]}":
+                self._depth -= 1
+                if self._depth == 0:
+                    candidate = text[self._start:i + 1]
+                    try:
+                        _loads(candidate)
+                    except json.JSONDecodeError:
+                        i = self._start
+                        self._start = -1
+                        self._in_string = False
+                        self._escape = False
+                    else:
+                        return candidate
+            i += 1
+
+        self._pos = i
+        return None
+
+
+async def _stream_json_text(
+    model: Any,
+    prompt: str,
+    generation_config: Optional[Dict[str, Any]] = None,
+) -> str:
+    """Stream a Gemini response and stop as soon as the top-level JSON value closes.
+
+    Falls back to the full response text if no complete JSON value is seen.
+    """
+    response = await model.generate_content_async(
+        prompt,
+        generation_config=generation_config,
+        stream=True,
+    )
+    scanner = _JsonStreamScanner()
+    buffer: List[str] = []
+    async for chunk in response:
+        text = chunk.text or ""
+        buffer.append(text)
+        complete = scanner.feed(text)
+        if complete is not None:
+            return complete
+    return "".join(buffer)
+
+
+def _cache_key(kind: str, payload: Dict[str, Any]) -> str:
+    """Build a response cache key tied to the current prompt and code versions."""
+    return make_cache_key({
+        "kind": kind,
+        "prompt_version": PROMPT_VERSION,
+        "code_version": CODE_VERSION,
+        **payload,
+    })
+
+
+async def _retry_api_call(
+    func,
+    max_retries: int = 2,
+    delay: float = 1.0,
+    timeout: Optional[float] = None,
+):
+    """Retry an async API call with a per-attempt timeout and exponential backoff."""
     last_error = None
     for attempt in range(max_retries + 1):
+        if _breaker.is_open():
+            raise CircuitBreakerOpenError(
+                "Gemini calls are paused after repeated failures; try again later."
+            )
         try:
-            return func()
+            result = await asyncio.wait_for(func(), timeout=timeout)
         except Exception as e:
+            if isinstance(e, asyncio.TimeoutError):
+                e = AIError(f"Gemini request timed out after {timeout}s")
+            _breaker.record_failure()
             last_error = e
             if attempt < max_retries:
                 logger.warning(f"API call failed (attempt {attempt + 1}), retrying: {e}")
-                time.sleep(delay * (2 ** attempt))
+                await asyncio.sleep(delay * (2 ** attempt))
             else:
                 logger.error(f"API call failed after {max_retries + 1} attempts: {e}")
+        else:
+            _breaker.reset()
+            return result
     raise last_error
 
 
-def generate_recommendations_with_gemini(
+def _normalize_recommendations(parsed: Any) -> List[Dict[str, Any]]:
+    """Keep well-formed recommendation objects and fill in default fields."""
+    if not isinstance(parsed, list):
+        return []
+
+    valid_recs = []
+    for rec in parsed:
+        if isinstance(rec, dict) and "title" in rec:
+            valid_recs.append({
+                "type": rec.get("type", "AI_RECOMMENDATION"),
+                "title": rec.get("title", ""),
+                "description": rec.get("description", ""),
+                "priority": rec.get("priority", "medium"),
+            })
+    return valid_recs
+
+
+async def generate_recommendations_with_gemini(
     api_key: Optional[str],
     schema: Dict[str, Any],
     anomalies: List[Dict[str, Any]],
+    request_timeout: float = DEFAULT_REQUEST_TIMEOUT,
 ) -> List[Dict[str, Any]]:
     """Generate schema recommendations using Gemini AI.
 
@@ -66,6 +327,7 @@ def generate_recommendations_with_gemini(
         api_key: Gemini API key.
         schema: The analyzed schema.
         anomalies: Detected anomalies.
+        request_timeout: Seconds to wait for each Gemini attempt.
 
     Returns:
         List of recommendation objects with type, title, description, priority.
@@ -74,57 +336,117 @@ def generate_recommendations_with_gemini(
         logger.warning("Gemini API key not configured. Skipping AI recommendations.")
         return []
 
+    cache_key = _cache_key("recommendations", {"schema": schema, "anomalies": anomalies})
+    cached = _response_cache.get(cache_key)
+    if cached is not None:
+        return copy.deepcopy(cached)
+
     try:
-        import google.generativeai as genai
+        import google.generativeai  # noqa: F401
     except ImportError:
         logger.warning("google-generativeai package not installed. Skipping AI recommendations.")
         return []
 
     try:
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel("gemini-1.5-flash")
-
-        prompt = (
-            "You are a MongoDB schema advisor. Provide 3-5 concise recommendations.\n"
-            "Schema (JSON):\n"
-            f"{json.dumps(schema, indent=2)}\n\n"
-            "Anomalies (JSON):\n"
-            f"{json.dumps(anomalies, indent=2)}\n\n"
-            "Return a JSON array of objects with fields: type, title, description, priority.\n"
-            "Priority should be: high, medium, or low.\n"
-            "Return ONLY the JSON array, no markdown formatting."
-        )
-
-        def make_request():
-            return model.generate_content(prompt)
-
-        response = _retry_api_call(make_request)
-        text = response.text or "[]"
+        model = _get_model(api_key)
+        prompt = "\n".join([
+            _RECS_PROMPT_HEADER,
+            "Schema (JSON):",
+            _dumps_pretty(schema),
+            "",
+            "Anomalies (JSON):",
+            _dumps_pretty(anomalies),
+            "",
+            _RECS_PROMPT_FOOTER,
+        ])
+
+        async def make_request():
+            return await _stream_json_text(model, prompt, _RECS_GENERATION_CONFIG)
+
+        text = await _retry_api_call(make_request, timeout=request_timeout) or "[]"
 
         parsed = _parse_json_safe(text, [])
-        if isinstance(parsed, list):
-            valid_recs = []
-            for rec in parsed:
-                if isinstance(rec, dict) and "title" in rec:
-                    valid_recs.append({
-                        "type": rec.get("type", "AI_RECOMMENDATION"),
-                        "title": rec.get("title", ""),
-                        "description": rec.get("description", ""),
-                        "priority": rec.get("priority", "medium"),
-                    })
-            return valid_recs
-
-        return []
+        recommendations = _normalize_recommendations(parsed)
+        if recommendations:
+            _response_cache.set(cache_key, copy.deepcopy(recommendations), ttl=CACHE_TTL)
+        return recommendations
 
     except Exception as e:
         logger.error(f"Failed to generate AI recommendations: {e}")
         return []
 
 
-def generate_migration_plan_with_gemini(
+async def generate_recommendations_batch(
+    api_key: Optional[str],
+    items: List[Tuple[str, Dict[str, Any], List[Dict[str, Any]]]],
+    batch_size: int = BATCH_SIZE,
+    request_timeout: float = DEFAULT_REQUEST_TIMEOUT,
+) -> Dict[str, List[Dict[str, Any]]]:
+    """Generate recommendations for several collections with one prompt per batch.
+
+    Args:
+        api_key: Gemini API key.
+        items: Tuples of (collection name, schema, anomalies).
+        batch_size: Number of collections marshaled into a single prompt.
+        request_timeout: Seconds to wait for each Gemini attempt.
+
+    Returns:
+        Mapping of collection name to its list of recommendation objects.
+    """
+    results: Dict[str, List[Dict[str, Any]]] = {name: [] for name, _, _ in items}
+    if not items:
+        return results
+
+    if not api_key:
+        logger.warning("Gemini API key not configured. Skipping AI recommendations.")
+        return results
+
+    try:
+        import google.generativeai  # noqa: F401
+    except ImportError:
+        logger.warning("google-generativeai package not installed. Skipping AI recommendations.")
+        return results
+
+    model = _get_model(api_key)
+
+    async def run_batch(batch: List[Tuple[str, Dict[str, Any], List[Dict[str, Any]]]]) -> None:
+        payload = [
+            {"id": name, "schema": schema, "anomalies": anomalies}
+            for name, schema, anomalies in batch
+        ]
+        prompt = "\n".join([
+            _BATCH_RECS_PROMPT_HEADER,
+            _dumps_pretty(payload),
+            "",
+            _BATCH_RECS_PROMPT_FOOTER,
+        ])
+
+        async def make_request():
+            return await _stream_json_text(model, prompt, _JSON_GENERATION_CONFIG)
+
+        try:
+            text = await _retry_api_call(make_request, timeout=request_timeout)
+            parsed = _parse_json_safe(text or "{}", {})
+        except Exception as e:
+            logger.error(f"Failed to generate batched AI recommendations: {e}")
+            return
+
+        if not isinstance(parsed, dict):
+            return
+        for name, _, _ in batch:
+            results[name] = _normalize_recommendations(parsed.get(name))
+
+    size = max(1, batch_size)
+    batches = [items[i:i + size] for i in range(0, len(items), size)]
+    await asyncio.gather(*(run_batch(batch) for batch in batches))
+    return results
+
+
+async def generate_migration_plan_with_gemini(
     api_key: Optional[str],
     draft_plan: Dict[str, Any],
     constraints: Optional[Dict[str, Any]] = None,
+    request_timeout: float = DEFAULT_REQUEST_TIMEOUT,
 ) -> Dict[str, Any]:
     """Generate a refined migration plan using Gemini AI.
 
@@ -132,6 +454,7 @@ def generate_migration_plan_with_gemini(
         api_key: Gemini API key.
         draft_plan: The initial migration plan from diff analysis.
         constraints: Optional constraints (strategy, batch_size, allow_remove).
+        request_timeout: Seconds to wait for each Gemini attempt.
 
     Returns:
         Refined migration plan with strategy, batch_size, and steps.
@@ -140,15 +463,19 @@ def generate_migration_plan_with_gemini(
         logger.warning("Gemini API key not configured. Returning draft plan.")
         return draft_plan
 
+    cache_key = _cache_key("migration_plan", {"draft_plan": draft_plan, "constraints": constraints})
+    cached = _response_cache.get(cache_key)
+    if cached is not None:
+        return copy.deepcopy(cached)
+
     try:
-        import google.generativeai as genai
+        import google.generativeai  # noqa: F401
     except ImportError:
         logger.warning("google-generativeai package not installed. Returning draft plan.")
         return draft_plan
 
     try:
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel("gemini-1.5-flash")
+        model = _get_model(api_key)
 
         constraints_payload = constraints or {
             "strategy": "eager",
@@ -156,30 +483,31 @@ def generate_migration_plan_with_gemini(
             "allow_remove": False,
         }
 
-        prompt = (
-            "You are a MongoDB migration planner. Provide a safe migration plan in JSON.\n"
-            "Draft plan (JSON):\n"
-            f"{json.dumps(draft_plan, indent=2)}\n\n"
-            "Constraints (JSON):\n"
-            f"{json.dumps(constraints_payload, indent=2)}\n\n"
-            "Return JSON object with fields: strategy, batch_size, steps[].\n"
-            "Each step: action (add_field|remove_field|convert_type|rename_field), field, details.\n"
-            "Return ONLY the JSON object, no markdown formatting."
-        )
+        prompt = "\n".join([
+            _MIGRATION_PROMPT_HEADER,
+            "Draft plan (JSON):",
+            _dumps_pretty(draft_plan),
+            "",
+            "Constraints (JSON):",
+            _dumps_pretty(constraints_payload),
+            "",
+            _MIGRATION_PROMPT_FOOTER,
+        ])
 
-        def make_request():
-            return model.generate_content(prompt)
+        async def make_request():
+            return await _stream_json_text(model, prompt, _JSON_GENERATION_CONFIG)
 
-        response = _retry_api_call(make_request)
-        text = response.text or "{}"
+        text = await _retry_api_call(make_request, timeout=request_timeout) or "{}"
 
         parsed = _parse_json_safe(text, {})
         if isinstance(parsed, dict):
-            return {
+            plan = {
                 "strategy": parsed.get("strategy", "eager"),
                 "batch_size": parsed.get("batch_size", 1000),
                 "steps": parsed.get("steps", []),
             }
+            _response_cache.set(cache_key, copy.deepcopy(plan), ttl=CACHE_TTL)
+            return plan
 
         return draft_plan
 
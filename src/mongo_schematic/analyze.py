@@ -1,21 +1,62 @@
 from __future__ import annotations
 
 from collections import defaultdict
-from datetime import datetime
-from typing import Any, Dict, List
-
-from motor.motor_asyncio import AsyncIOMotorClient
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Set, Tuple
 
 from mongo_schematic.utils import detect_type
 
+if TYPE_CHECKING:
+    from motor.motor_asyncio import AsyncIOMotorClient
 
-def _init_stats():
-    return {
-        "count": 0,
-        "types": defaultdict(int),
-        "null_count": 0,
-        "sample_values": [],
-    }
+# Documents fetched per cursor round-trip while sampling.
+CURSOR_BATCH_SIZE = 500
+
+# Documents processed between early-stop convergence checks.
+CONVERGENCE_WINDOW = 500
+
+# (presence, null_rate, dominant type share) per field id.
+FieldMetrics = List[Tuple[float, float, Optional[float]]]
+
+# (presence, dominant type share) per field id.
+ConvergenceSnapshot = List[Tuple[float, Optional[float]]]
+
+
+class FieldTable:
+    """Per-path field statistics stored as parallel lists indexed by path id.
+
+    Each path is interned to a small integer the first time it is seen, so the
+    document walk updates counters by list index instead of per-field dicts.
+    """
+
+    def __init__(self) -> None:
+        self.path_to_id: Dict[str, int] = {}
+        self.id_to_path: List[str] = []
+        self.count: List[int] = []
+        self.null_count: List[int] = []
+        self.types: List[Dict[str, int]] = []
+        self.sample_values: List[List[str]] = []
+        self.sample_seen: List[Set[Tuple[type, Any]]] = []
+
+    def intern(self, path: str) -> int:
+        """Return the id for path, allocating counters on first sight."""
+        field_id = self.path_to_id.get(path)
+        if field_id is None:
+            field_id = len(self.id_to_path)
+            self.path_to_id[path] = field_id
+            self.id_to_path.append(path)
+            self.count.append(0)
+            self.null_count.append(0)
+            self.types.append(defaultdict(int))
+            self.sample_values.append([])
+            self.sample_seen.append(set())
+        return field_id
+
+    def __len__(self) -> int:
+        return len(self.id_to_path)
+
+    def __contains__(self, path: str) -> bool:
+        return path in self.path_to_id
 
 
 async def analyze_collection(
@@ -23,11 +64,34 @@ async def analyze_collection(
     database: str,
     collection: str,
     sample_size: int = 10000,
+    early_stop: bool = True,
+    convergence_epsilon: float = 0.005,
+    deep_analysis: bool = True,
+    exact_count: bool = False,
 ) -> Dict[str, Any]:
+    """Infer a collection's schema from a sample of its documents.
+
+    With ``early_stop`` enabled, sampling ends once every field's presence and
+    dominant-type share move by less than ``convergence_epsilon`` over a
+    ``CONVERGENCE_WINDOW``-document window. Ratios are relative to the number
+    of documents actually sampled. Early stop only applies to ``$sample``
+    cursors; a collection no larger than ``sample_size`` is read in natural
+    order and is always walked in full, so late-added fields are not missed.
+
+    With ``deep_analysis`` disabled, top-level field types and null counts are
+    aggregated server-side instead of walking documents in Python; nested
+    paths and sample values are not collected.
+
+    ``total_documents`` comes from collection metadata unless ``exact_count``
+    is set, so it may be slightly stale; it only sizes the sample.
+    """
     db = client[database]
     coll = db[collection]
 
-    total_docs = await coll.count_documents({})
+    if exact_count:
+        total_docs = await coll.count_documents({})
+    else:
+        total_docs = await coll.estimated_document_count()
     target = min(sample_size, total_docs) if total_docs > 0 else 0
 
     if target == 0:
@@ -41,42 +105,161 @@ async def analyze_collection(
             "anomalies": [],
             "recommendations": [],
             "confidence": 0.0,
-            "analyzed_at": datetime.utcnow().isoformat(),
+            "analyzed_at": datetime.now(timezone.utc).isoformat(),
         }
 
-    if target == total_docs:
-        docs = await coll.find().to_list(length=target)
+    if not deep_analysis:
+        table, sampled = await _aggregate_top_level_stats(coll, target, total_docs)
     else:
-        pipeline = [{"$sample": {"size": target}}]
-        docs = await coll.aggregate(pipeline).to_list(length=target)
+        table, sampled = await _walk_sample(
+            coll, target, total_docs, early_stop, convergence_epsilon
+        )
 
-    field_stats: Dict[str, Dict[str, Any]] = defaultdict(_init_stats)
+    return _build_analysis(database, collection, table, total_docs, sampled, sample_size)
 
-    for doc in docs:
-        _process_document(doc, field_stats, prefix="")
 
-    schema = _generate_schema(field_stats, total_docs)
-    anomalies = _detect_anomalies(field_stats, total_docs)
+def _build_analysis(
+    database: str,
+    collection: str,
+    table: FieldTable,
+    total_docs: int,
+    sampled: int,
+    sample_size: int,
+) -> Dict[str, Any]:
+    """Turn accumulated field stats into an analyze_collection result."""
+    metrics = _field_metrics(table, sampled)
+    schema = _generate_schema(table, sampled, metrics)
+    anomalies = _detect_anomalies(table, sampled, metrics)
     recommendations = _basic_recommendations(schema, anomalies)
-    confidence = _confidence_score(field_stats, total_docs)
+    confidence = _confidence_score(table, sampled, metrics)
 
     return {
         "database": database,
         "collection": collection,
         "total_documents": total_docs,
-        "sampled_documents": len(docs),
+        "sampled_documents": sampled,
         "sample_size": sample_size,
         "schema": schema,
         "anomalies": anomalies,
         "recommendations": recommendations,
         "confidence": confidence,
-        "analyzed_at": datetime.utcnow().isoformat(),
+        "analyzed_at": datetime.now(timezone.utc).isoformat(),
     }
 
 
+async def _walk_sample(
+    coll,
+    target: int,
+    total_docs: int,
+    early_stop: bool,
+    convergence_epsilon: float,
+) -> Tuple[FieldTable, int]:
+    """Stream sampled documents through the Python walker."""
+    if target == total_docs:
+        cursor = coll.find().limit(target).batch_size(CURSOR_BATCH_SIZE)
+        # Natural order is not random: a converged prefix says nothing about the tail.
+        early_stop = False
+    else:
+        pipeline = [{"$sample": {"size": target}}]
+        cursor = coll.aggregate(pipeline, batchSize=CURSOR_BATCH_SIZE)
+
+    table = FieldTable()
+    sampled = 0
+    previous: Optional[ConvergenceSnapshot] = None
+
+    async for doc in cursor:
+        _process_document(doc, table, prefix="")
+        sampled += 1
+
+        if early_stop and sampled % CONVERGENCE_WINDOW == 0 and sampled < target:
+            snapshot = _convergence_snapshot(table, sampled)
+            if previous is not None and _has_converged(previous, snapshot, convergence_epsilon):
+                await cursor.close()
+                break
+            previous = snapshot
+
+    return table, sampled
+
+
+async def _aggregate_top_level_stats(
+    coll,
+    target: int,
+    total_docs: int,
+) -> Tuple[FieldTable, int]:
+    """Count top-level field types and nulls with a server-side $group."""
+    source = [{"$limit": target}] if target == total_docs else [{"$sample": {"size": target}}]
+    pipeline = source + [
+        {"$project": {"fields": {"$objectToArray": "$$ROOT"}}},
+        {
+            "$facet": {
+                "sampled": [{"$count": "n"}],
+                "fields": [
+                    {"$unwind": "$fields"},
+                    {"$match": {"fields.k": {"$ne": "_id"}}},
+                    {
+                        "$group": {
+                            "_id": {"k": "$fields.k", "t": {"$type": "$fields.v"}},
+                            "c": {"$sum": 1},
+                        }
+                    },
+                ],
+            }
+        },
+    ]
+    results = await coll.aggregate(pipeline).to_list(length=1)
+    if not results:
+        return FieldTable(), 0
+
+    facet = results[0]
+    sampled = facet["sampled"][0]["n"] if facet.get("sampled") else 0
+    return _table_from_field_groups(facet.get("fields", [])), sampled
+
+
+def _table_from_field_groups(groups: List[Dict[str, Any]]) -> FieldTable:
+    """Build a FieldTable from ``{_id: {k, t}, c}`` $group results."""
+    table = FieldTable()
+    for group in groups:
+        key = group["_id"]
+        i = table.intern(key["k"])
+        count = group["c"]
+        table.count[i] += count
+        if key["t"] == "null":
+            table.null_count[i] += count
+        else:
+            table.types[i][key["t"]] += count
+    return table
+
+
+def _convergence_snapshot(table: FieldTable, sampled: int) -> ConvergenceSnapshot:
+    """Capture (presence, dominant type share) for every field."""
+    snapshot: ConvergenceSnapshot = []
+    for count, types in zip(table.count, table.types):
+        type_share = max(types.values()) / count if types else None
+        snapshot.append((count / sampled, type_share))
+    return snapshot
+
+
+def _has_converged(
+    previous: ConvergenceSnapshot,
+    current: ConvergenceSnapshot,
+    epsilon: float,
+) -> bool:
+    """Return True if no field appeared and no ratio moved by epsilon or more."""
+    if len(previous) != len(current):
+        return False
+    for (presence, type_share), (prev_presence, prev_share) in zip(current, previous):
+        if abs(presence - prev_presence) >= epsilon:
+            return False
+        if (type_share is None) != (prev_share is None):
+            return False
+        if type_share is not None and abs(type_share - prev_share) >= epsilon:
+            return False
+    return True
+
+
 def _process_document(
     doc: Dict[str, Any],
-    stats: Dict[str, Dict[str, Any]],
+    table: FieldTable,
     prefix: str,
     max_depth: int = 8,
     depth: int = 0,
@@ -84,57 +267,98 @@ def _process_document(
     if depth >= max_depth:
         return
 
+    _detect_type = detect_type
+    path_to_id = table.path_to_id
+    counts = table.count
+
     for key, value in doc.items():
         if key == "_id" and not prefix:
             continue
 
         path = f"{prefix}.{key}" if prefix else key
-        stats[path]["count"] += 1
+        i = path_to_id.get(path)
+        if i is None:
+            i = table.intern(path)
+        counts[i] += 1
 
         if value is None:
-            stats[path]["null_count"] += 1
+            table.null_count[i] += 1
             continue
 
-        value_type = detect_type(value)
-        stats[path]["types"][value_type] += 1
-
-        if len(stats[path]["sample_values"]) < 5:
-            if value not in stats[path]["sample_values"]:
+        table.types[i][_detect_type(value)] += 1
+
+        samples = table.sample_values[i]
+        if len(samples) < 5:
+            seen = table.sample_seen[i]
+            # Keyed by type so True, 1 and 1.0 stay distinct samples.
+            sample_key: Tuple[type, Any] = (type(value), value)
+            try:
+                unseen = sample_key not in seen
+            except TypeError:
+                # Unhashable values (dicts, lists) are keyed by their text.
+                sample_key = (type(value), str(value))
+                unseen = sample_key not in seen
+            if unseen:
+                seen.add(sample_key)
                 sample_val = str(value)
                 if len(sample_val) > 120:
                     sample_val = sample_val[:120] + "..."
-                stats[path]["sample_values"].append(sample_val)
+                samples.append(sample_val)
 
-        if isinstance(value, dict):
-            _process_document(value, stats, prefix=path, max_depth=max_depth, depth=depth + 1)
-        elif isinstance(value, list) and value:
+        value_cls = type(value)
+        if value_cls is dict or (value_cls is not list and isinstance(value, dict)):
+            _process_document(value, table, prefix=path, max_depth=max_depth, depth=depth + 1)
+        elif (value_cls is list or isinstance(value, list)) and value:
+            item_prefix = f"{path}[]"
             for item in value[:5]:
                 if isinstance(item, dict):
                     _process_document(
                         item,
-                        stats,
-                        prefix=f"{path}[]",
+                        table,
+                        prefix=item_prefix,
                         max_depth=max_depth,
                         depth=depth + 1,
                     )
 
 
-def _generate_schema(field_stats: Dict[str, Dict[str, Any]], total_docs: int) -> Dict[str, Any]:
+def _field_metrics(table: FieldTable, total_docs: int) -> FieldMetrics:
+    """Compute (presence, null_rate, dominant type share) for every field in one pass.
+
+    The dominant type share is None for fields that were only ever null.
+    """
+    metrics: FieldMetrics = []
+    for count, null_count, types in zip(table.count, table.null_count, table.types):
+        presence = count / total_docs if total_docs else 0
+        null_rate = null_count / count if count else 0
+        type_share = max(types.values()) / count if types else None
+        metrics.append((presence, null_rate, type_share))
+    return metrics
+
+
+def _generate_schema(
+    table: FieldTable,
+    total_docs: int,
+    metrics: Optional[FieldMetrics] = None,
+) -> Dict[str, Any]:
+    if metrics is None:
+        metrics = _field_metrics(table, total_docs)
+
     schema = {
         "type": "object",
         "properties": {},
         "required": [],
     }
 
-    for field, stats in field_stats.items():
+    for i, field in enumerate(table.id_to_path):
         if "." in field or "[]" in field:
             continue
 
-        if not stats["types"]:
+        types = table.types[i]
+        if not types:
             continue
 
         # Get all types sorted by frequency (most common first)
-        sorted_types = sorted(stats["types"].keys(), key=lambda t: stats["types"][t], reverse=True)
+        sorted_types = sorted(types.keys(), key=lambda t: types[t], reverse=True)
         
         # Use array if multiple types, single string if only one
         if len(sorted_types) == 1:
@@ -142,8 +366,7 @@ def _generate_schema(field_stats: Dict[str, Dict[str, Any]], total_docs: int) ->
         else:
             bson_type = sorted_types  # List of types
         
-        presence = stats["count"] / total_docs if total_docs else 0
-        null_rate = stats["null_count"] / stats["count"] if stats["count"] else 0
+        presence, null_rate, _ = metrics[i]
 
         schema["properties"][field] = {
             "bsonType": bson_type,
@@ -157,20 +380,28 @@ def _generate_schema(field_stats: Dict[str, Dict[str, Any]], total_docs: int) ->
     return schema
 
 
-def _detect_anomalies(field_stats: Dict[str, Dict[str, Any]], total_docs: int) -> List[Dict[str, Any]]:
+def _detect_anomalies(
+    table: FieldTable,
+    total_docs: int,
+    metrics: Optional[FieldMetrics] = None,
+) -> List[Dict[str, Any]]:
+    if metrics is None:
+        metrics = _field_metrics(table, total_docs)
+
     anomalies: List[Dict[str, Any]] = []
 
-    for field, stats in field_stats.items():
-        if len(stats["types"]) > 1:
+    for i, field in enumerate(table.id_to_path):
+        presence, null_rate, _ = metrics[i]
+
+        if len(table.types[i]) > 1:
             anomalies.append(
                 {
                     "type": "MULTIPLE_TYPES",
                     "field": field,
-                    "details": dict(stats["types"]),
+                    "details": dict(table.types[i]),
                 }
             )
 
-        presence = stats["count"] / total_docs if total_docs else 0
         if 0 < presence < 0.05:
             anomalies.append(
                 {
@@ -180,16 +411,14 @@ def _detect_anomalies(field_stats: Dict[str, Dict[str, Any]], total_docs: int) -
                 }
             )
 
-        if stats["count"]:
-            null_rate = stats["null_count"] / stats["count"]
-            if null_rate > 0.3 and presence > 0.5:
-                anomalies.append(
-                    {
-                        "type": "HIGH_NULL_RATE",
-                        "field": field,
-                        "details": {"null_rate": round(null_rate, 4)},
-                    }
-                )
+        if null_rate > 0.3 and presence > 0.5:
+            anomalies.append(
+                {
+                    "type": "HIGH_NULL_RATE",
+                    "field": field,
+                    "details": {"null_rate": round(null_rate, 4)},
+                }
+            )
 
     return anomalies
 
@@ -223,16 +452,21 @@ def _basic_recommendations(schema: Dict[str, Any], anomalies: List[Dict[str, Any
     return recommendations
 
 
-def _confidence_score(field_stats: Dict[str, Dict[str, Any]], total_docs: int) -> float:
-    if not field_stats or total_docs == 0:
+def _confidence_score(
+    table: FieldTable,
+    total_docs: int,
+    metrics: Optional[FieldMetrics] = None,
+) -> float:
+    if not len(table) or total_docs == 0:
         return 0.0
 
+    if metrics is None:
+        metrics = _field_metrics(table, total_docs)
+
     scores = []
-    for stats in field_stats.values():
-        if stats["types"]:
-            max_type_count = max(stats["types"].values())
-            scores.append(max_type_count / stats["count"])
-        presence = stats["count"] / total_docs
+    for presence, _, type_share in metrics:
+        if type_share is not None:
+            scores.append(type_share)
         scores.append(1.0 if presence < 0.05 or presence > 0.95 else min(presence, 1 - presence) * 2)
 
     return round(sum(scores) / len(scores), 3) if scores else 0.0
@@ -1,32 +1,18 @@
 from __future__ import annotations
 
 import asyncio
+import functools
 import json
+import sys
 from pathlib import Path
-from typing import Optional
-from urllib import request
+from types import MappingProxyType
+from typing import Any, Awaitable, Callable, Dict, List, Mapping, Optional, Tuple
 
 import typer
 from rich.console import Console
 
-from mongo_schematic.analyze import analyze_collection
-from mongo_schematic.ai import generate_migration_plan_with_gemini, generate_recommendations_with_gemini
-from mongo_schematic.config import DEFAULT_CONFIG_PATH, load_runtime_config, write_default_config
-from mongo_schematic.db import get_motor_client, init_odm
 from mongo_schematic import __version__
-from mongo_schematic.models import AnalysisRun, SchemaSnapshot
-from mongo_schematic.schema_io import load_schema, write_schema
-from mongo_schematic.diff import diff_schemas
-from mongo_schematic.drift import detect_drift
-from mongo_schematic.validate import apply_validation, validate_collection
-from mongo_schematic.migrate import apply_migration_plan, generate_migration_file, generate_migration_plan
-from mongo_schematic.reporting import print_json
-from mongo_schematic.indexes import index_usage, list_indexes, recommend_indexes
-from mongo_schematic.codegen.pydantic import generate_pydantic_code
-from mongo_schematic.codegen.typescript import generate_typescript_code
-from mongo_schematic.docs_gen import generate_docs
-from mongo_schematic.seed import seed_collection
-from mongo_schematic.hooks import install_hooks
+from mongo_schematic.reporting import dumps_json, loads_json, print_json
 
 
 
@@ -47,30 +33,181 @@ app.add_typer(db_app, name="db")
 app.add_typer(generate_app, name="generate")
 app.add_typer(docs_app, name="docs")
 app.add_typer(hook_app, name="hook")
-console = Console()
 
 
+@functools.lru_cache(maxsize=1)
+def _console() -> Console:
+    """Create the Rich console on first use rather than at import time."""
+    return Console()
+
+
+def _progress(message: str) -> None:
+    """Print a dim progress line, skipped when stdout is piped.
+
+    Keeps piped output (e.g. ``mschema db analyze | jq``) pure JSON and avoids
+    Rich markup work per collection in non-interactive runs.
+    """
+    if sys.stdout.isatty():
+        _console().print(f"[dim]{message}[/dim]")
+
+
+# Collections processed at once by db-wide commands.
+DB_CONCURRENCY = 16
+
+# Motor pool sized to the concurrency above, with a few warm connections and a
+# fast failure when the server is unreachable.
+DB_POOL_OPTIONS: Dict[str, Any] = {
+    "maxPoolSize": DB_CONCURRENCY,
+    "minPoolSize": 4,
+    "serverSelectionTimeoutMS": 5000,
+}
+
+
+async def _map_collections(
+    names: List[str],
+    worker: Callable[[str], Awaitable[Any]],
+    label: str,
+    limit: int = DB_CONCURRENCY,
+    on_result: Optional[Callable[[str, Any], None]] = None,
+) -> Dict[str, Any]:
+    """Run worker for each collection name with bounded concurrency.
+
+    Progress is printed as each collection finishes; results are keyed in the
+    order of ``names``. When ``on_result`` is given, each result is passed to
+    it as soon as it finishes and is not retained, so an empty dict is returned.
+
+    If a worker raises, the remaining workers are cancelled and awaited before
+    the error propagates, so callers can safely close the client afterwards.
+    """
+    semaphore = asyncio.Semaphore(limit)
+
+    async def run(name: str):
+        async with semaphore:
+            return name, await worker(name)
+
+    tasks = [asyncio.ensure_future(run(name)) for name in names]
+    finished: Dict[str, Any] = {}
+    try:
+        for future in asyncio.as_completed(tasks):
+            name, result = await future
+            _progress(f"{label} {name}")
+            if on_result is not None:
+                on_result(name, result)
+            else:
+                finished[name] = result
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+    if on_result is not None:
+        return {}
+    return {name: finished[name] for name in names}
+
+
+@functools.lru_cache(maxsize=1)
+def _config():
+    """Load the runtime config once per process."""
+    from mongo_schematic.config import load_runtime_config
+
+    return load_runtime_config()
+
+
+def _resolve_conn(uri: Optional[str], db: Optional[str]) -> Tuple[str, str, Optional[str]]:
+    """Resolve the MongoDB URI, database and Gemini key for a command.
+
+    Passing both --uri and --db skips the config files entirely, in which case
+    no Gemini key is available.
+    """
+    if uri and db:
+        return uri, db, None
+    config = _config()
+    return uri or config.mongodb_uri, db or config.default_db, config.gemini_api_key
+
+
+def _run_async(coro: Awaitable[Any]) -> Any:
+    """Run a coroutine to completion on uvloop when installed, else asyncio."""
+    try:
+        import uvloop
+    except ImportError:
+        return asyncio.run(coro)
+    return uvloop.run(coro)
+
+
+@functools.lru_cache(maxsize=512)
+def _load_schema_cached(resolved_path: str) -> Dict[str, Any]:
+    from mongo_schematic.schema_io import load_schema
+
+    return load_schema(Path(resolved_path))
+
+
+def _load_schema(path: Path) -> Dict[str, Any]:
+    """Load a schema file, parsing each resolved path at most once per process.
+
+    The returned dict is shared between callers and must not be mutated.
+    """
+    return _load_schema_cached(str(path.resolve()))
+
+
+@functools.lru_cache(maxsize=32)
+def _schema_index_cached(directory: Path, mtime_ns: int) -> Mapping[str, Path]:
+    from mongo_schematic.schema_io import list_schema_files
+
+    return MappingProxyType({p.stem: p for p in list_schema_files(directory)})
+
+
+def _schema_index(directory: Path) -> Mapping[str, Path]:
+    """Map schema names to files in a directory, rescanning only when it changes.
+
+    The directory's mtime is part of the cache key, so adding, removing or
+    renaming a schema file invalidates the cached index. A missing directory
+    maps to an empty index.
+    """
+    try:
+        mtime_ns = directory.stat().st_mtime_ns
+    except FileNotFoundError:
+        return MappingProxyType({})
+    return _schema_index_cached(directory, mtime_ns)
+
+
+def _write_json(path: Path, payload: Any) -> None:
+    """Write a payload as indented JSON bytes, creating parent directories."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(dumps_json(payload, default=str))
+
 
 def _post_webhook(url: str, payload: dict) -> None:
-    data = json.dumps(payload).encode("utf-8")
+    from urllib import request
+
+    data = dumps_json(payload, indent=False)
     req = request.Request(url, data=data, headers={"Content-Type": "application/json"})
     request.urlopen(req, timeout=10)
 
 
+async def _post_webhook_async(url: str, payload: dict) -> None:
+    """POST a webhook from a worker thread so the event loop keeps running."""
+    try:
+        await asyncio.to_thread(_post_webhook, url, payload)
+    except Exception as e:
+        _console().print(f"[red]Webhook delivery failed: {e}[/red]")
+
+
 @app.command()
 def version() -> None:
-    console.print(f"MongoSchematic CLI v{__version__}")
+    _console().print(f"MongoSchematic CLI v{__version__}")
 
 
 @app.command()
 def init(path: Optional[Path] = typer.Option(None, "--path", help="Path for config file")) -> None:
+    from mongo_schematic.config import DEFAULT_CONFIG_PATH, write_default_config
+
     config_path = path or DEFAULT_CONFIG_PATH
     if config_path.exists():
-        console.print(f"Config already exists at {config_path}")
+        _console().print(f"Config already exists at {config_path}")
         raise typer.Exit(code=0)
 
     write_default_config(config_path)
-    console.print(f"Created config at {config_path}")
+    _console().print(f"Created config at {config_path}")
 
 
 @app.command()
@@ -83,23 +220,28 @@ def analyze(
     use_ai: bool = typer.Option(True, "--ai/--no-ai", help="Use Gemini for recommendations"),
     store: bool = typer.Option(False, "--store", help="Store analysis via Beanie ODM"),
     save: Optional[Path] = typer.Option(None, "--save", help="Save schema output to file"),
+    deep: bool = typer.Option(
+        True,
+        "--deep/--shallow",
+        help="Walk nested fields in Python, or aggregate top-level fields server-side",
+    ),
 ) -> None:
+    from mongo_schematic.analyze import analyze_collection
+    from mongo_schematic.ai import generate_recommendations_with_gemini
+    from mongo_schematic.db import get_motor_client, init_odm
+    from mongo_schematic.models import AnalysisRun, SchemaSnapshot
+    from mongo_schematic.schema_io import write_schema
+
     async def _run() -> None:
-        if uri and db:
-            mongodb_uri = uri
-            default_db = db
-            gemini_key = None
-        else:
-            config = load_runtime_config()
-            mongodb_uri = uri or config.mongodb_uri
-            default_db = db or config.default_db
-            gemini_key = config.gemini_api_key
+        mongodb_uri, default_db, gemini_key = _resolve_conn(uri, db)
 
         client = get_motor_client(mongodb_uri)
-        result = await analyze_collection(client, default_db, collection, sample)
+        result = await analyze_collection(
+            client, default_db, collection, sample, deep_analysis=deep
+        )
 
         if use_ai:
-            gemini_recs = generate_recommendations_with_gemini(
+            gemini_recs = await generate_recommendations_with_gemini(
                 gemini_key, result.get("schema", {}), result.get("anomalies", [])
             )
             if gemini_recs:
@@ -133,11 +275,11 @@ def analyze(
         if output == "json":
             print_json(result)
         else:
-            console.print(json.dumps(result, indent=2))
+            _console().print(json.dumps(result, indent=2))
 
         client.close()
 
-    asyncio.run(_run())
+    _run_async(_run())
 
 
 @schema_app.command("export")
@@ -149,22 +291,19 @@ def schema_export(
     out: Path = typer.Option(..., "--out", help="Output schema file path"),
     use_ai: bool = typer.Option(True, "--ai/--no-ai", help="Use Gemini for recommendations"),
 ) -> None:
+    from mongo_schematic.analyze import analyze_collection
+    from mongo_schematic.ai import generate_recommendations_with_gemini
+    from mongo_schematic.db import get_motor_client
+    from mongo_schematic.schema_io import write_schema
+
     async def _run() -> None:
-        if uri and db:
-            mongodb_uri = uri
-            default_db = db
-            gemini_key = None
-        else:
-            config = load_runtime_config()
-            mongodb_uri = uri or config.mongodb_uri
-            default_db = db or config.default_db
-            gemini_key = config.gemini_api_key
+        mongodb_uri, default_db, gemini_key = _resolve_conn(uri, db)
 
         client = get_motor_client(mongodb_uri)
         result = await analyze_collection(client, default_db, collection, sample)
 
         if use_ai:
-            gemini_recs = generate_recommendations_with_gemini(
+            gemini_recs = await generate_recommendations_with_gemini(
                 gemini_key, result.get("schema", {}), result.get("anomalies", [])
             )
             if gemini_recs:
@@ -174,7 +313,7 @@ def schema_export(
         print_json({"status": "saved", "path": str(out)})
         client.close()
 
-    asyncio.run(_run())
+    _run_async(_run())
 
 
 @schema_app.command("diff")
@@ -182,6 +321,9 @@ def schema_diff(
     source: Path = typer.Option(..., "--from", help="Source schema file"),
     target: Path = typer.Option(..., "--to", help="Target schema file"),
 ) -> None:
+    from mongo_schematic.schema_io import load_schema
+    from mongo_schematic.diff import diff_schemas
+
     result = diff_schemas(load_schema(source), load_schema(target))
     print_json(result)
 
@@ -193,14 +335,12 @@ def schema_recommend_indexes(
     db: Optional[str] = typer.Option(None, "--db", help="Database name"),
     collection: str = typer.Option(..., "--collection", help="Collection name"),
 ) -> None:
+    from mongo_schematic.db import get_motor_client
+    from mongo_schematic.schema_io import load_schema
+    from mongo_schematic.indexes import list_indexes, recommend_indexes
+
     async def _run() -> None:
-        if uri and db:
-            mongodb_uri = uri
-            default_db = db
-        else:
-            config = load_runtime_config()
-            mongodb_uri = uri or config.mongodb_uri
-            default_db = db or config.default_db
+        mongodb_uri, default_db, _ = _resolve_conn(uri, db)
 
         client = get_motor_client(mongodb_uri)
         indexes = await list_indexes(client, default_db, collection)
@@ -208,7 +348,7 @@ def schema_recommend_indexes(
         print_json({"indexes": indexes, "recommendations": recs})
         client.close()
 
-    asyncio.run(_run())
+    _run_async(_run())
 
 
 @schema_app.command("index-usage")
@@ -217,21 +357,18 @@ def schema_index_usage(
     db: Optional[str] = typer.Option(None, "--db", help="Database name"),
     collection: str = typer.Option(..., "--collection", help="Collection name"),
 ) -> None:
+    from mongo_schematic.db import get_motor_client
+    from mongo_schematic.indexes import index_usage
+
     async def _run() -> None:
-        if uri and db:
-            mongodb_uri = uri
-            default_db = db
-        else:
-            config = load_runtime_config()
-            mongodb_uri = uri or config.mongodb_uri
-            default_db = db or config.default_db
+        mongodb_uri, default_db, _ = _resolve_conn(uri, db)
 
         client = get_motor_client(mongodb_uri)
         usage = await index_usage(client, default_db, collection)
         print_json({"index_usage": usage})
         client.close()
 
-    asyncio.run(_run())
+    _run_async(_run())
 
 
 @drift_app.command("detect")
@@ -242,14 +379,13 @@ def drift_detect(
     collection: str = typer.Option(..., "--collection", help="Collection name"),
     sample: int = typer.Option(10000, "--sample", help="Sample size"),
 ) -> None:
+    from mongo_schematic.analyze import analyze_collection
+    from mongo_schematic.db import get_motor_client
+    from mongo_schematic.schema_io import load_schema
+    from mongo_schematic.drift import detect_drift
+
     async def _run() -> None:
-        if uri and db:
-            mongodb_uri = uri
-            default_db = db
-        else:
-            config = load_runtime_config()
-            mongodb_uri = uri or config.mongodb_uri
-            default_db = db or config.default_db
+        mongodb_uri, default_db, _ = _resolve_conn(uri, db)
 
         client = get_motor_client(mongodb_uri)
         observed = await analyze_collection(client, default_db, collection, sample)
@@ -261,7 +397,7 @@ def drift_detect(
         if result.get("has_drift"):
             raise typer.Exit(code=1)
 
-    asyncio.run(_run())
+    _run_async(_run())
 
 
 @drift_app.command("compare")
@@ -269,6 +405,9 @@ def drift_compare(
     source: Path = typer.Option(..., "--from", help="Source schema file"),
     target: Path = typer.Option(..., "--to", help="Target schema file"),
 ) -> None:
+    from mongo_schematic.schema_io import load_schema
+    from mongo_schematic.diff import diff_schemas
+
     result = diff_schemas(load_schema(source), load_schema(target))
     print_json(result)
 
@@ -283,27 +422,33 @@ def drift_monitor(
     interval: int = typer.Option(300, "--interval", help="Seconds between checks"),
     webhook: Optional[str] = typer.Option(None, "--webhook", help="Webhook URL for alerts"),
 ) -> None:
+    from mongo_schematic.analyze import analyze_collection
+    from mongo_schematic.db import get_motor_client
+    from mongo_schematic.schema_io import load_schema
+    from mongo_schematic.drift import detect_drift
+
     async def _run() -> None:
-        if uri and db:
-            mongodb_uri = uri
-            default_db = db
-        else:
-            config = load_runtime_config()
-            mongodb_uri = uri or config.mongodb_uri
-            default_db = db or config.default_db
+        mongodb_uri, default_db, _ = _resolve_conn(uri, db)
 
         expected_schema = load_schema(expected)
-        while True:
-            client = get_motor_client(mongodb_uri)
-            observed = await analyze_collection(client, default_db, collection, sample)
-            result = detect_drift(expected_schema, observed)
-            print_json(result)
-            if webhook:
-                _post_webhook(webhook, result)
+        # Hold references so in-flight webhook tasks are not garbage collected.
+        pending_webhooks: set = set()
+        # One client for the whole monitor keeps its connection pool warm between checks.
+        client = get_motor_client(mongodb_uri, minPoolSize=1)
+        try:
+            while True:
+                observed = await analyze_collection(client, default_db, collection, sample)
+                result = detect_drift(expected_schema, observed)
+                print_json(result)
+                if webhook:
+                    task = asyncio.create_task(_post_webhook_async(webhook, result))
+                    pending_webhooks.add(task)
+                    task.add_done_callback(pending_webhooks.discard)
+                await asyncio.sleep(interval)
+        finally:
             client.close()
-            await asyncio.sleep(interval)
 
-    asyncio.run(_run())
+    _run_async(_run())
 
 
 @validate_app.command("test")
@@ -315,14 +460,12 @@ def validate_test(
     sample: int = typer.Option(10000, "--sample", help="Sample size"),
     max_errors: int = typer.Option(100, "--max-errors", help="Max errors to return"),
 ) -> None:
+    from mongo_schematic.db import get_motor_client
+    from mongo_schematic.schema_io import load_schema
+    from mongo_schematic.validate import validate_collection
+
     async def _run() -> None:
-        if uri and db:
-            mongodb_uri = uri
-            default_db = db
-        else:
-            config = load_runtime_config()
-            mongodb_uri = uri or config.mongodb_uri
-            default_db = db or config.default_db
+        mongodb_uri, default_db, _ = _resolve_conn(uri, db)
 
         client = get_motor_client(mongodb_uri)
         result = await validate_collection(
@@ -336,7 +479,7 @@ def validate_test(
         print_json(result)
         client.close()
 
-    asyncio.run(_run())
+    _run_async(_run())
 
 
 @migrate_app.command("create")
@@ -346,6 +489,9 @@ def migrate_create(
     collection: str = typer.Option(..., "--collection", help="Collection name"),
     out: Path = typer.Option(..., "--out", help="Migration file path"),
 ) -> None:
+    from mongo_schematic.schema_io import load_schema
+    from mongo_schematic.migrate import generate_migration_file
+
     path = generate_migration_file(load_schema(source), load_schema(target), collection, out)
     print_json({"status": "created", "path": str(path)})
 
@@ -357,24 +503,25 @@ def migrate_plan(
     use_ai: bool = typer.Option(False, "--ai/--no-ai", help="Use Gemini to refine plan"),
     out: Optional[Path] = typer.Option(None, "--out", help="Output plan file path"),
 ) -> None:
+    from mongo_schematic.ai import generate_migration_plan_with_gemini
+    from mongo_schematic.schema_io import load_schema
+    from mongo_schematic.migrate import generate_migration_plan
+
     source_schema = load_schema(source)
     target_schema = load_schema(target)
     base_plan = generate_migration_plan(source_schema, target_schema)
     if use_ai:
-        config = load_runtime_config()
-        ai_plan = generate_migration_plan_with_gemini(config.gemini_api_key, base_plan)
+        ai_plan = _run_async(generate_migration_plan_with_gemini(_config().gemini_api_key, base_plan))
         if ai_plan:
             if out:
-                out.parent.mkdir(parents=True, exist_ok=True)
-                out.write_text(json.dumps(ai_plan, indent=2))
+                _write_json(out, ai_plan)
                 print_json({"status": "saved", "path": str(out)})
                 return
             print_json(ai_plan)
             return
 
     if out:
-        out.parent.mkdir(parents=True, exist_ok=True)
-        out.write_text(json.dumps(base_plan, indent=2))
+        _write_json(out, base_plan)
         print_json({"status": "saved", "path": str(out)})
         return
     print_json(base_plan)
@@ -391,17 +538,21 @@ def migrate_apply(
     dry_run: bool = typer.Option(False, "--dry-run", help="Do not write changes"),
     rate_limit_ms: int = typer.Option(0, "--rate-limit-ms", help="Delay between batches"),
     resume_from: Optional[str] = typer.Option(None, "--resume-from", help="Resume from _id"),
+    concurrent_steps: bool = typer.Option(
+        False, "--concurrent-steps", help="Run steps on unrelated fields concurrently"
+    ),
+    fuse_steps: bool = typer.Option(
+        False, "--fuse-steps", help="Send all steps as one bulk write when not batching"
+    ),
 ) -> None:
+    from mongo_schematic.db import get_motor_client
+    from mongo_schematic.schema_io import load_schema
+    from mongo_schematic.migrate import apply_migration_plan
+
     async def _run() -> None:
-        if uri and db:
-            mongodb_uri = uri
-            default_db = db
-        else:
-            config = load_runtime_config()
-            mongodb_uri = uri or config.mongodb_uri
-            default_db = db or config.default_db
+        mongodb_uri, default_db, _ = _resolve_conn(uri, db)
 
-        plan_payload = json.loads(plan.read_text())
+        plan_payload = loads_json(plan.read_bytes())
         client = get_motor_client(mongodb_uri)
         resume_value = resume_from
         result = await apply_migration_plan(
@@ -414,11 +565,13 @@ def migrate_apply(
             dry_run,
             rate_limit_ms,
             resume_value,
+            concurrent_steps=concurrent_steps,
+            fuse_steps=fuse_steps,
         )
         print_json(result)
         client.close()
 
-    asyncio.run(_run())
+    _run_async(_run())
 
 
 @validate_app.command("apply")
@@ -430,14 +583,12 @@ def validate_apply(
     level: str = typer.Option("moderate", "--level", help="Validation level"),
     action: str = typer.Option("error", "--action", help="Validation action"),
 ) -> None:
+    from mongo_schematic.db import get_motor_client
+    from mongo_schematic.schema_io import load_schema
+    from mongo_schematic.validate import apply_validation
+
     async def _run() -> None:
-        if uri and db:
-            mongodb_uri = uri
-            default_db = db
-        else:
-            config = load_runtime_config()
-            mongodb_uri = uri or config.mongodb_uri
-            default_db = db or config.default_db
+        mongodb_uri, default_db, _ = _resolve_conn(uri, db)
 
         client = get_motor_client(mongodb_uri)
         result = await apply_validation(
@@ -451,7 +602,7 @@ def validate_apply(
         print_json(result)
         client.close()
 
-    asyncio.run(_run())
+    _run_async(_run())
 
 
 # =============================================================================
@@ -465,43 +616,90 @@ def db_analyze(
     db: Optional[str] = typer.Option(None, "--db", help="Database name"),
     sample: int = typer.Option(5000, "--sample", help="Sample size per collection"),
     out: Optional[Path] = typer.Option(None, "--out", help="Output JSON file"),
+    out_format: str = typer.Option(
+        "json",
+        "--format",
+        help="Output file format: json, or jsonl to stream one collection per line",
+    ),
+    use_ai: bool = typer.Option(
+        False,
+        "--ai/--no-ai",
+        help="Add Gemini recommendations (json format only)",
+    ),
 ) -> None:
     """Analyze all collections in the database."""
+    from mongo_schematic.analyze import analyze_collection
+    from mongo_schematic.ai import generate_recommendations_batch
+    from mongo_schematic.db import get_motor_client
+
+    if out_format not in ("json", "jsonl"):
+        _console().print(f"[red]Unknown format: {out_format}. Supported: json, jsonl[/red]")
+        raise typer.Exit(code=1)
+    if out_format == "jsonl" and not out:
+        _console().print("[red]--format jsonl requires --out[/red]")
+        raise typer.Exit(code=1)
+    if out_format == "jsonl" and use_ai:
+        _console().print("[yellow]--ai is ignored with --format jsonl[/yellow]")
+
     async def _run() -> None:
-        if uri and db:
-            mongodb_uri = uri
-            default_db = db
-        else:
-            config = load_runtime_config()
-            mongodb_uri = uri or config.mongodb_uri
-            default_db = db or config.default_db
+        mongodb_uri, default_db, gemini_key = _resolve_conn(uri, db)
 
-        client = get_motor_client(mongodb_uri)
-        database = client[default_db]
-        collection_names = await database.list_collection_names()
-        
+        client = get_motor_client(mongodb_uri, **DB_POOL_OPTIONS)
         results = {"database": default_db, "collections": {}, "summary": {"total": 0, "with_anomalies": 0}}
-        
-        for coll_name in sorted(collection_names):
-            if coll_name.startswith("system."):
-                continue
-            console.print(f"[dim]Analyzing {coll_name}...[/dim]")
-            result = await analyze_collection(client, default_db, coll_name, sample)
-            results["collections"][coll_name] = result
+
+        async def analyze_one(coll_name: str) -> dict:
+            return await analyze_collection(client, default_db, coll_name, sample)
+
+        def tally(result: dict) -> None:
             results["summary"]["total"] += 1
             if result.get("anomalies"):
                 results["summary"]["with_anomalies"] += 1
-        
+
+        try:
+            collection_names = await client[default_db].list_collection_names()
+            names = sorted(n for n in collection_names if not n.startswith("system."))
+            if out_format == "jsonl":
+                # Write each collection as it finishes so only one result is held at a time.
+                out.parent.mkdir(parents=True, exist_ok=True)
+                with out.open("wb") as handle:
+                    def write_line(coll_name: str, result: dict) -> None:
+                        line = {"collection": coll_name, "result": result}
+                        handle.write(dumps_json(line, indent=False, default=str) + b"\n")
+                        tally(result)
+
+                    await _map_collections(names, analyze_one, "Analyzed", on_result=write_line)
+                analyzed = {}
+            else:
+                analyzed = await _map_collections(names, analyze_one, "Analyzed")
+        finally:
+            client.close()
+
+        for coll_name, result in analyzed.items():
+            results["collections"][coll_name] = result
+            tally(result)
+
+        if use_ai and analyzed:
+            # One prompt per batch of collections instead of a Gemini call each.
+            batch_recs = await generate_recommendations_batch(
+                gemini_key,
+                [
+                    (coll_name, result.get("schema", {}), result.get("anomalies", []))
+                    for coll_name, result in analyzed.items()
+                ],
+            )
+            for coll_name, recs in batch_recs.items():
+                if recs:
+                    results["collections"][coll_name]["recommendations"].extend(recs)
+
         if out:
-            out.parent.mkdir(parents=True, exist_ok=True)
-            out.write_text(json.dumps(results, indent=2, default=str))
+            # JSON Lines output was already streamed to the file above.
+            if out_format == "json":
+                _write_json(out, results)
             print_json({"status": "saved", "path": str(out), "summary": results["summary"]})
         else:
             print_json(results)
-        
-        client.close()
 
-    asyncio.run(_run())
+    _run_async(_run())
 
 
 @db_app.command("export")
@@ -512,35 +710,33 @@ def db_export(
     out_dir: Path = typer.Option(..., "--out-dir", help="Output directory for schema files"),
 ) -> None:
     """Export schemas for all collections to a directory."""
+    from mongo_schematic.analyze import analyze_collection
+    from mongo_schematic.db import get_motor_client
+    from mongo_schematic.schema_io import write_schema
+
     async def _run() -> None:
-        if uri and db:
-            mongodb_uri = uri
-            default_db = db
-        else:
-            config = load_runtime_config()
-            mongodb_uri = uri or config.mongodb_uri
-            default_db = db or config.default_db
+        mongodb_uri, default_db, _ = _resolve_conn(uri, db)
 
-        client = get_motor_client(mongodb_uri)
-        database = client[default_db]
-        collection_names = await database.list_collection_names()
-        
+        client = get_motor_client(mongodb_uri, **DB_POOL_OPTIONS)
         out_dir.mkdir(parents=True, exist_ok=True)
-        exported = []
-        
-        for coll_name in sorted(collection_names):
-            if coll_name.startswith("system."):
-                continue
-            console.print(f"[dim]Exporting {coll_name}...[/dim]")
+
+        async def export_one(coll_name: str) -> str:
             result = await analyze_collection(client, default_db, coll_name, sample)
             out_path = out_dir / f"{coll_name}.yml"
-            write_schema(out_path, result)
-            exported.append(str(out_path))
-        
+            # YAML dumping is CPU work; keep it off the event loop.
+            await asyncio.to_thread(write_schema, out_path, result)
+            return str(out_path)
+
+        try:
+            collection_names = await client[default_db].list_collection_names()
+            names = sorted(n for n in collection_names if not n.startswith("system."))
+            exported = list((await _map_collections(names, export_one, "Exported")).values())
+        finally:
+            client.close()
+
         print_json({"status": "exported", "count": len(exported), "files": exported})
-        client.close()
 
-    asyncio.run(_run())
+    _run_async(_run())
 
 
 @db_app.command("drift")
@@ -556,16 +752,14 @@ def db_drift(
     ),
 ) -> None:
     """Detect drift across all collections in the database."""
+    from mongo_schematic.analyze import analyze_collection
+    from mongo_schematic.db import get_motor_client
+    from mongo_schematic.drift import detect_drift
+
     async def _run() -> None:
-        if uri and db:
-            mongodb_uri = uri
-            default_db = db
-        else:
-            config = load_runtime_config()
-            mongodb_uri = uri or config.mongodb_uri
-            default_db = db or config.default_db
+        mongodb_uri, default_db, _ = _resolve_conn(uri, db)
 
-        client = get_motor_client(mongodb_uri)
+        client = get_motor_client(mongodb_uri, **DB_POOL_OPTIONS)
         
         results = {
             "database": default_db,
@@ -573,16 +767,18 @@ def db_drift(
             "summary": {"total": 0, "with_drift": 0, "critical": 0}
         }
         
-        schema_files = list(schema_dir.glob("*.yml")) + list(schema_dir.glob("*.yaml"))
-        
-        for schema_path in sorted(schema_files):
-            coll_name = schema_path.stem
-            console.print(f"[dim]Checking drift for {coll_name}...[/dim]")
-            
-            expected_schema = load_schema(schema_path)
+        schema_paths = _schema_index(schema_dir)
+
+        async def drift_one(coll_name: str) -> dict:
+            expected_schema = _load_schema(schema_paths[coll_name])
             observed = await analyze_collection(client, default_db, coll_name, sample)
-            drift_result = detect_drift(expected_schema, observed)
-            
+            return detect_drift(expected_schema, observed)
+
+        try:
+            drifted = await _map_collections(list(schema_paths), drift_one, "Checked drift for")
+        finally:
+            client.close()
+        for coll_name, drift_result in drifted.items():
             results["collections"][coll_name] = drift_result
             results["summary"]["total"] += 1
             if drift_result.get("has_drift"):
@@ -591,8 +787,7 @@ def db_drift(
                 results["summary"]["critical"] += 1
         
         print_json(results)
-        client.close()
-        
+
         if fail_on_critical:
             if results["summary"]["critical"] > 0:
                 raise typer.Exit(code=1)
@@ -600,7 +795,7 @@ def db_drift(
             if results["summary"]["with_drift"] > 0:
                 raise typer.Exit(code=1)
 
-    asyncio.run(_run())
+    _run_async(_run())
 
 
 @db_app.command("validate")
@@ -612,16 +807,13 @@ def db_validate(
     max_errors: int = typer.Option(100, "--max-errors", help="Max errors to return"),
 ) -> None:
     """Validate data in all collections against schemas."""
+    from mongo_schematic.db import get_motor_client
+    from mongo_schematic.validate import validate_collection
+
     async def _run() -> None:
-        if uri and db:
-            mongodb_uri = uri
-            default_db = db
-        else:
-            config = load_runtime_config()
-            mongodb_uri = uri or config.mongodb_uri
-            default_db = db or config.default_db
+        mongodb_uri, default_db, _ = _resolve_conn(uri, db)
 
-        client = get_motor_client(mongodb_uri)
+        client = get_motor_client(mongodb_uri, **DB_POOL_OPTIONS)
         
         results = {
             "database": default_db,
@@ -629,21 +821,23 @@ def db_validate(
             "summary": {"total_collections": 0, "valid_collections": 0, "invalid_collections": 0, "total_invalid_docs": 0}
         }
         
-        schema_files = list(schema_dir.glob("*.yml")) + list(schema_dir.glob("*.yaml"))
-        
-        for schema_path in sorted(schema_files):
-            coll_name = schema_path.stem
-            console.print(f"[dim]Validating {coll_name}...[/dim]")
-            
-            validation_result = await validate_collection(
-                client, 
-                default_db, 
-                coll_name, 
-                load_schema(schema_path), 
-                sample, 
+        schema_paths = _schema_index(schema_dir)
+
+        async def validate_one(coll_name: str) -> dict:
+            return await validate_collection(
+                client,
+                default_db,
+                coll_name,
+                _load_schema(schema_paths[coll_name]),
+                sample,
                 max_errors
             )
-            
+
+        try:
+            validated = await _map_collections(list(schema_paths), validate_one, "Validated")
+        finally:
+            client.close()
+        for coll_name, validation_result in validated.items():
             results["collections"][coll_name] = validation_result
             results["summary"]["total_collections"] += 1
             
@@ -654,12 +848,117 @@ def db_validate(
                 results["summary"]["valid_collections"] += 1
         
         print_json(results)
-        client.close()
-        
+
         if results["summary"]["total_invalid_docs"] > 0:
             raise typer.Exit(code=1)
 
-    asyncio.run(_run())
+    _run_async(_run())
+
+
+@db_app.command("inspect")
+def db_inspect(
+    schema_dir: Path = typer.Option(..., "--schema-dir", help="Directory with expected schema files"),
+    uri: Optional[str] = typer.Option(None, "--uri", help="MongoDB URI"),
+    db: Optional[str] = typer.Option(None, "--db", help="Database name"),
+    sample: int = typer.Option(10000, "--sample", help="Sample size per collection"),
+    max_errors: int = typer.Option(100, "--max-errors", help="Max errors to return"),
+    fail_on_critical: bool = typer.Option(
+        False,
+        "--fail-on-critical",
+        help="Exit non-zero on invalid documents or critical drift only",
+    ),
+) -> None:
+    """Check drift and validate data in one pass over each collection."""
+    from mongo_schematic.db import get_motor_client
+    from mongo_schematic.inspection import inspect_collection
+
+    async def _run() -> None:
+        mongodb_uri, default_db, _ = _resolve_conn(uri, db)
+
+        client = get_motor_client(mongodb_uri, **DB_POOL_OPTIONS)
+
+        results = {
+            "database": default_db,
+            "collections": {},
+            "summary": {
+                "total": 0,
+                "with_drift": 0,
+                "critical": 0,
+                "invalid_collections": 0,
+                "total_invalid_docs": 0,
+            },
+        }
+
+        schema_paths = _schema_index(schema_dir)
+
+        async def inspect_one(coll_name: str) -> dict:
+            return await inspect_collection(
+                client,
+                default_db,
+                coll_name,
+                _load_schema(schema_paths[coll_name]),
+                sample,
+                max_errors,
+            )
+
+        try:
+            inspected = await _map_collections(list(schema_paths), inspect_one, "Inspected")
+        finally:
+            client.close()
+
+        summary = results["summary"]
+        for coll_name, inspection in inspected.items():
+            drift_result = inspection["drift"]
+            validation_result = inspection["validation"]
+            results["collections"][coll_name] = {
+                "drift": drift_result,
+                "validation": validation_result,
+            }
+            summary["total"] += 1
+            if drift_result.get("has_drift"):
+                summary["with_drift"] += 1
+            if drift_result.get("critical_count", 0) > 0:
+                summary["critical"] += 1
+            if validation_result.get("invalid", 0) > 0:
+                summary["invalid_collections"] += 1
+                summary["total_invalid_docs"] += validation_result.get("invalid", 0)
+
+        print_json(results)
+
+        drift_failed = summary["critical"] if fail_on_critical else summary["with_drift"]
+        if drift_failed > 0 or summary["total_invalid_docs"] > 0:
+            raise typer.Exit(code=1)
+
+    _run_async(_run())
+
+
+def _build_migration(
+    from_path: Path,
+    to_path: Path,
+    coll_name: str,
+    out_dir: Path,
+) -> Tuple[str, Dict[str, Any], Optional[str]]:
+    """Diff one collection's schemas and write its migration if anything changed.
+
+    Runs in a worker process for db migrate. Returns the collection name, the
+    diff summary and the migration path, or None when there were no changes.
+    """
+    from mongo_schematic.diff import diff_schemas
+    from mongo_schematic.migrate import generate_migration_file
+    from mongo_schematic.schema_io import load_schema
+
+    from_schema = load_schema(from_path)
+    to_schema = load_schema(to_path)
+
+    diff = diff_schemas(from_schema, to_schema)
+    summary = diff.get("summary", {})
+
+    if summary.get("added", 0) == 0 and summary.get("removed", 0) == 0 and summary.get("changed", 0) == 0:
+        return coll_name, summary, None
+
+    out_path = out_dir / f"{coll_name}_migration.py"
+    generate_migration_file(from_schema, to_schema, coll_name, out_path, diff=diff)
+    return coll_name, summary, str(out_path)
 
 
 @db_app.command("migrate")
@@ -668,32 +967,51 @@ def db_migrate(
 
     to_dir: Path = typer.Option(..., "--to-dir", help="Directory with target schema files"),
     out_dir: Path = typer.Option(..., "--out-dir", help="Output directory for migration files"),
+    workers: Optional[int] = typer.Option(
+        None,
+        "--workers",
+        help="Worker processes for migration generation (default: CPU count)",
+    ),
 ) -> None:
     """Generate migrations for all changed collections."""
-    from_schemas = {p.stem: p for p in list(from_dir.glob("*.yml")) + list(from_dir.glob("*.yaml"))}
-    to_schemas = {p.stem: p for p in list(to_dir.glob("*.yml")) + list(to_dir.glob("*.yaml"))}
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    from_schemas = _schema_index(from_dir)
+    to_schemas = _schema_index(to_dir)
     
-    common = set(from_schemas.keys()) & set(to_schemas.keys())
+    common = sorted(set(from_schemas.keys()) & set(to_schemas.keys()))
     out_dir.mkdir(parents=True, exist_ok=True)
-    
+
+    built: Dict[str, Tuple[Dict[str, Any], Optional[str]]] = {}
+
+    def record(coll_name: str, summary: Dict[str, Any], path: Optional[str]) -> None:
+        if path is not None:
+            _progress(f"Generated migration for {coll_name}")
+        built[coll_name] = (summary, path)
+
+    if workers == 1 or len(common) < 2:
+        for coll_name in common:
+            _, summary, path = _build_migration(from_schemas[coll_name], to_schemas[coll_name], coll_name, out_dir)
+            record(coll_name, summary, path)
+    else:
+        # Diffing and code generation are CPU-bound and independent per collection.
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(_build_migration, from_schemas[n], to_schemas[n], n, out_dir)
+                for n in common
+            ]
+            for future in as_completed(futures):
+                record(*future.result())
+
     migrations = []
     skipped = []
-    
-    for coll_name in sorted(common):
-        from_schema = load_schema(from_schemas[coll_name])
-        to_schema = load_schema(to_schemas[coll_name])
-        
-        diff = diff_schemas(from_schema, to_schema)
-        summary = diff.get("summary", {})
-        
-        if summary.get("added", 0) == 0 and summary.get("removed", 0) == 0 and summary.get("changed", 0) == 0:
+
+    for coll_name in common:
+        summary, path = built[coll_name]
+        if path is None:
             skipped.append(coll_name)
-            continue
-        
-        console.print(f"[dim]Generating migration for {coll_name}...[/dim]")
-        out_path = out_dir / f"{coll_name}_migration.py"
-        generate_migration_file(from_schema, to_schema, coll_name, out_path)
-        migrations.append({"collection": coll_name, "path": str(out_path), "summary": summary})
+        else:
+            migrations.append({"collection": coll_name, "path": path, "summary": summary})
     
     print_json({
         "status": "generated",
@@ -710,12 +1028,45 @@ def db_migrate(
 
 @generate_app.command("models")
 def generate_models(
-    schema: Path = typer.Option(..., "--schema", help="Schema file"),
+    schema: Optional[Path] = typer.Option(None, "--schema", help="Schema file"),
     type: str = typer.Option(..., "--type", help="Output type: pydantic, typescript"),
     out: Optional[Path] = typer.Option(None, "--out", help="Output file path"),
     name: str = typer.Option("Model", "--name", help="Class/Interface name"),
+    schema_dir: Optional[Path] = typer.Option(
+        None, "--schema-dir", help="Generate one file per schema in this directory"
+    ),
+    out_dir: Optional[Path] = typer.Option(
+        None, "--out-dir", help="Output directory when using --schema-dir"
+    ),
 ) -> None:
     """Generate Pydantic models or TypeScript interfaces from schema."""
+    if schema_dir is not None:
+        from mongo_schematic.codegen import generate_models_batch
+
+        if schema is not None or out_dir is None:
+            _console().print("[red]--schema-dir requires --out-dir and cannot be combined with --schema[/red]")
+            raise typer.Exit(code=1)
+        try:
+            paths = generate_models_batch(
+                schema_dir,
+                out_dir,
+                type,
+                name_strategy="collection",
+            )
+        except ValueError as exc:
+            _console().print(f"[red]{exc}[/red]")
+            raise typer.Exit(code=1)
+        print_json({"status": "generated", "type": type, "paths": [str(p) for p in paths]})
+        return
+
+    if schema is None:
+        _console().print("[red]Provide --schema or --schema-dir[/red]")
+        raise typer.Exit(code=1)
+
+    from mongo_schematic.schema_io import load_schema
+    from mongo_schematic.codegen.pydantic import generate_pydantic_code
+    from mongo_schematic.codegen.typescript import generate_typescript_code
+
     schema_data = load_schema(schema)
     
     if type.lower() == "pydantic":
@@ -723,7 +1074,7 @@ def generate_models(
     elif type.lower() == "typescript":
         code = generate_typescript_code(schema_data, name)
     else:
-        console.print(f"[red]Unknown type: {type}. Supported: pydantic, typescript[/red]")
+        _console().print(f"[red]Unknown type: {type}. Supported: pydantic, typescript[/red]")
         raise typer.Exit(code=1)
     
     if out:
@@ -731,7 +1082,7 @@ def generate_models(
         out.write_text(code)
         print_json({"status": "generated", "path": str(out), "type": type})
     else:
-        console.print(code)
+        _console().print(code)
 
 # =============================================================================
 # Documentation Commands
@@ -744,7 +1095,9 @@ def docs_build(
     out: Path = typer.Option(..., "--out", help="Output HTML file path"),
 ) -> None:
     """Generate static HTML documentation."""
-    console.print(f"[dim]Generating documentation from {schema_dir}...[/dim]")
+    from mongo_schematic.docs_gen import generate_docs
+
+    _progress(f"Generating documentation from {schema_dir}...")
     generate_docs(schema_dir, out)
     print_json({"status": "generated", "path": str(out)})
 
@@ -762,25 +1115,23 @@ def seed(
     db: Optional[str] = typer.Option(None, "--db", help="Database name"),
 ) -> None:
     """Seed a collection with fake data based on schema."""
+    from mongo_schematic.db import get_motor_client
+    from mongo_schematic.schema_io import load_schema
+    from mongo_schematic.seed import seed_collection
+
     async def _run() -> None:
-        if uri and db:
-            mongodb_uri = uri
-            default_db = db
-        else:
-            config = load_runtime_config()
-            mongodb_uri = uri or config.mongodb_uri
-            default_db = db or config.default_db
+        mongodb_uri, default_db, _ = _resolve_conn(uri, db)
 
         client = get_motor_client(mongodb_uri)
         schema_data = load_schema(schema)
         
-        console.print(f"[dim]Seeding {count} documents into {collection}...[/dim]")
+        _progress(f"Seeding {count} documents into {collection}...")
         inserted = await seed_collection(client, default_db, collection, schema_data, count)
         
         print_json({"status": "seeded", "inserted": inserted, "collection": collection})
         client.close()
 
-    asyncio.run(_run())
+    _run_async(_run())
 
 # =============================================================================
 # Git Hook Commands
@@ -792,5 +1143,7 @@ def hook_install(
     path: Path = typer.Option(Path(".pre-commit-config.yaml"), "--path", help="Path to config file"),
 ) -> None:
     """Install MongoSchematic pre-commit hooks."""
+    from mongo_schematic.hooks import install_hooks
+
     install_hooks(path)
-    console.print(f"[green]Successfully installed MongoSchematic hooks to {path}[/green]")
+    _console().print(f"[green]Successfully installed MongoSchematic hooks to {path}[/green]")
@@ -0,0 +1,73 @@
+"""Code generation from MongoSchematic schema files."""
+
+from __future__ import annotations
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from mongo_schematic.codegen.pydantic import _to_pascal_case, generate_pydantic_code
+from mongo_schematic.codegen.typescript import generate_typescript_code
+from mongo_schematic.schema_io import list_schema_files, load_schema
+
+GENERATORS: Dict[str, Callable[..., str]] = {
+    "pydantic": generate_pydantic_code,
+    "typescript": generate_typescript_code,
+}
+
+OUTPUT_SUFFIXES: Dict[str, str] = {
+    "pydantic": ".py",
+    "typescript": ".ts",
+}
+
+
+def generate_models_batch(
+    schema_dir: Path,
+    out_dir: Path,
+    model_type: str,
+    name_strategy: str = "collection",
+    name: str = "Model",
+    max_workers: Optional[int] = None,
+) -> List[Path]:
+    """Generate one model file per schema in a directory.
+
+    Files are rendered on a thread pool: each job is a small YAML parse, some
+    string building and a file write, so threads keep the whole directory in
+    one process without the cost of spawning workers.
+
+    Args:
+        schema_dir: Directory containing .yml/.yaml schema files.
+        out_dir: Directory to write generated files into.
+        model_type: Output type, ``pydantic`` or ``typescript``.
+        name_strategy: ``collection`` derives each class name from the schema
+            file name (``users.v1.yml`` -> ``Users``); ``fixed`` uses ``name``.
+        name: Class/interface name when ``name_strategy`` is ``fixed``.
+        max_workers: Thread count (default: ``min(32, cpu_count * 4)``).
+
+    Returns:
+        Written file paths, in schema file order.
+    """
+    model_type = model_type.lower()
+    generator = GENERATORS.get(model_type)
+    if generator is None:
+        raise ValueError(f"Unknown type: {model_type}. Supported: {', '.join(GENERATORS)}")
+    if name_strategy not in ("collection", "fixed"):
+        raise ValueError(f"Unknown name strategy: {name_strategy}. Supported: collection, fixed")
+
+    suffix = OUTPUT_SUFFIXES[model_type]
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    def _gen_one(schema_path: Path) -> Path:
+        coll_name = schema_path.stem.split(".")[0]
+        class_name = _to_pascal_case(coll_name) if name_strategy == "collection" else name
+        code = generator(load_schema(schema_path), class_name)
+        out_path = out_dir / f"{coll_name}{suffix}"
+        out_path.write_text(code)
+        return out_path
+
+    files = list_schema_files(schema_dir)
+    if max_workers is None:
+        max_workers = min(32, (os.cpu_count() or 1) * 4)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(_gen_one, files))
@@ -0,0 +1,30 @@
+"""Shape and required-set interning shared by the code generators."""
+
+from __future__ import annotations
+
+import json
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, Iterable, Tuple
+
+
+def shape_key(field_def: Dict[str, Any]) -> str:
+    """Return a stable key for a nested object definition.
+
+    Nested objects with identical definitions (a shared ``address`` subdocument,
+    say) map to the same key, so generators can emit a single model for them.
+    """
+    return json.dumps(field_def, sort_keys=True, default=str)
+
+
+@lru_cache(maxsize=1024)
+def _interned_required(names: Tuple[str, ...]) -> FrozenSet[str]:
+    return frozenset(names)
+
+
+def required_set(required: Iterable[str]) -> FrozenSet[str]:
+    """Return a shared frozenset for a ``required`` list.
+
+    Sibling and cross-collection schemas often list the same required fields;
+    they all get the same frozenset instead of a fresh set per model.
+    """
+    return _interned_required(tuple(required))
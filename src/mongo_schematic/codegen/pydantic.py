@@ -1,37 +1,46 @@
-from typing import Any, Dict, List, Set, Tuple
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, List, Set
 
+from mongo_schematic.codegen.ordering import required_set, shape_key
+from mongo_schematic.schema_io import get_schema_block
+
+_SANITIZE_TABLE = str.maketrans({" ": "_", "-": "_"})
+
+@lru_cache(maxsize=4096)
 def _sanitize_name(name: str) -> str:
     """Sanitize field name for Python."""
     # Simple sanitization, can be expanded
-    return name.replace(" ", "_").replace("-", "_")
+    return name.translate(_SANITIZE_TABLE)
 
+@lru_cache(maxsize=4096)
 def _to_pascal_case(name: str) -> str:
     """Convert snake_case to PascalCase."""
     return "".join(word.capitalize() for word in _sanitize_name(name).split("_"))
 
+_BSON_TO_PY: Dict[str, str] = {
+    "string": "str",
+    "int": "int",
+    "double": "float",
+    "bool": "bool",
+    "objectId": "str",  # Often represented as str in Pydantic models for APIs
+    "date": "datetime",
+    "array": "List",
+    "object": "Dict[str, Any]",
+    "null": "None",
+    "long": "int",
+    "decimal": "Decimal",
+    "binData": "bytes",
+    "regex": "str",  # Pattern as string
+    "timestamp": "datetime",
+    "minKey": "Any",
+    "maxKey": "Any",
+    "javascript": "str",
+    "dbPointer": "str",  # Reference as string
+}
+
 def _get_python_type(bson_type: str) -> str:
     """Map BSON type to Python type."""
-    mapping = {
-        "string": "str",
-        "int": "int",
-        "double": "float",
-        "bool": "bool",
-        "objectId": "str",  # Often represented as str in Pydantic models for APIs
-        "date": "datetime",
-        "array": "List",
-        "object": "Dict[str, Any]",
-        "null": "None",
-        "long": "int",
-        "decimal": "Decimal",
-        "binData": "bytes",
-        "regex": "str",  # Pattern as string
-        "timestamp": "datetime",
-        "minKey": "Any",
-        "maxKey": "Any",
-        "javascript": "str",
-        "dbPointer": "str",  # Reference as string
-    }
-    return mapping.get(bson_type, "Any")
+    return _BSON_TO_PY.get(bson_type, "Any")
 
 def generate_pydantic_code(schema: Dict[str, Any], class_name: str = "Model") -> str:
     """Generate Pydantic model code from schema."""
@@ -44,76 +53,91 @@ def generate_pydantic_code(schema: Dict[str, Any], class_name: str = "Model") ->
         ""
     ]
     
-    models_to_generate: List[Tuple[str, Dict[str, Any]]] = [(class_name, schema)]
-    generated_models: Set[str] = set()
-    model_definitions: List[str] = []
+    root = get_schema_block(schema)
+    _emit_model(
+        class_name,
+        root.get("properties", {}),
+        required_set(root.get("required", ())),
+        lines,
+        seen=set(),
+        shape_names={},
+    )
+    return "\n\n".join(lines)
 
-    while models_to_generate:
-        curr_name, curr_schema = models_to_generate.pop(0)
-        if curr_name in generated_models:
-            continue
-        
-        generated_models.add(curr_name)
-        schema_props = curr_schema.get("schema", curr_schema).get("properties", {})
-        required_fields = set(curr_schema.get("schema", curr_schema).get("required", []))
-        
-        model_lines = [f"class {curr_name}(BaseModel):"]
-        
-        if not schema_props:
-            model_lines.append("    pass")
-            model_definitions.append("\n".join(model_lines))
-            continue
+def _emit_model(
+    curr_name: str,
+    schema_props: Dict[str, Any],
+    required_fields: FrozenSet[str],
+    out: List[str],
+    seen: Set[str],
+    shape_names: Dict[str, str],
+) -> None:
+    """Append a model to out, after the nested models it references.
 
-        for field_name, field_def in schema_props.items():
-            safe_name = _sanitize_name(field_name)
-            bson_type = field_def.get("bsonType", "any")
-            
-            # Handle union types (list of bsonTypes)
-            if isinstance(bson_type, list):
-                # Generate Union type for multiple types
-                type_list = [_get_python_type(t) for t in bson_type]
-                python_type = f"Union[{', '.join(type_list)}]"
-            # Handle nested objects
-            elif bson_type == "object":
-                nested_name = f"{curr_name}{_to_pascal_case(field_name)}"
-                python_type = nested_name
-                # Enqueue nested model for generation, but we need the sub-schema
-                # Ideally the schema analysis would provide nested structure deeper than currently implemented
-                # For now, treat unknown nested structure as Dict if not fully defined
-                # The current analyzer might not return deep nested structures in 'properties' 
-                # effectively unless it's a recursive recursive call.
-                # Assuming simple flat properties for now based on current analyze implementation
-                # If properties has 'properties', it's nested.
-                if "properties" in field_def:
-                     models_to_generate.append((nested_name, field_def))
-                else:
-                    python_type = "Dict[str, Any]"
+    A depth-first walk that emits each class post-order, so definitions come
+    out in dependency order without a separate sorting pass.
+    """
+    if curr_name in seen:
+        return
+    seen.add(curr_name)
+    
+    model_lines = [f"class {curr_name}(BaseModel):"]
+    
+    if not schema_props:
+        model_lines.append("    pass")
+        out.append("\n".join(model_lines))
+        return
 
-            elif bson_type == "array":
-                # Very basic array handling
-                python_type = "List[Any]"
-                # check if array of objects? (Not fully captured in current simplified analysis)
-            
+    for field_name, field_def in schema_props.items():
+        safe_name = _sanitize_name(field_name)
+        bson_type = field_def.get("bsonType", "any")
+        
+        # Handle union types (list of bsonTypes)
+        if isinstance(bson_type, list):
+            # Generate Union type for multiple types
+            python_type = f"Union[{', '.join(_BSON_TO_PY.get(t, 'Any') for t in bson_type)}]"
+        # Handle nested objects
+        elif bson_type == "object":
+            nested_name = f"{curr_name}{_to_pascal_case(field_name)}"
+            python_type = nested_name
+            # Ideally the schema analysis would provide nested structure deeper than currently implemented
+            # For now, treat unknown nested structure as Dict if not fully defined
+            # If properties has 'properties', it's nested.
+            if "properties" in field_def:
+                # Identical subdocuments share one model.
+                python_type = shape_names.setdefault(shape_key(field_def), nested_name)
+                if python_type == nested_name:
+                    _emit_model(
+                        nested_name,
+                        field_def["properties"],
+                        required_set(field_def.get("required", ())),
+                        out,
+                        seen,
+                        shape_names,
+                    )
             else:
-                python_type = _get_python_type(bson_type)
+                python_type = "Dict[str, Any]"
 
-            is_required = field_name in required_fields
-            nullable = field_def.get("nullable", False)
-            
-            if not is_required or nullable:
-                type_hint = f"Optional[{python_type}]"
-                default = " = None"
-            else:
-                type_hint = python_type
-                default = ""
-            
-            if safe_name != field_name:
-                field_arg = f', alias="{field_name}"'
-                default = f' = Field(default=None{field_arg})' if not is_required else f' = Field(..., alias="{field_name}")'
-            
-            model_lines.append(f"    {safe_name}: {type_hint}{default}")
+        elif bson_type == "array":
+            # Very basic array handling
+            python_type = "List[Any]"
+            # check if array of objects? (Not fully captured in current simplified analysis)
+        
+        else:
+            python_type = _BSON_TO_PY.get(bson_type, "Any")
 
-        model_definitions.insert(0, "\n".join(model_lines)) # Prepend to handle dependencies (basic)
+        is_required = field_name in required_fields
+        optional = not is_required or field_def.get("nullable", False)
         
-    lines.extend(model_definitions)
-    return "\n\n".join(lines)
+        if safe_name != field_name:
+            default = f' = Field(default=None, alias="{field_name}")' if not is_required else f' = Field(..., alias="{field_name}")'
+        else:
+            default = " = None" if optional else ""
+        
+        # One f-string per line: a single BUILD_STRING, no intermediate type hint.
+        if optional:
+            model_lines.append(f"    {safe_name}: Optional[{python_type}]{default}")
+        else:
+            model_lines.append(f"    {safe_name}: {python_type}{default}")
+
+    out.append("\n".join(model_lines))
@@ -1,21 +1,54 @@
 from __future__ import annotations
 
+import functools
+import os
 from pathlib import Path
-from typing import Optional
+from typing import Any, Dict, Optional, Tuple
 
 import yaml
 from pydantic import BaseModel, Field
-from pydantic_settings import BaseSettings, SettingsConfigDict
 
 from mongo_schematic.exceptions import ConfigurationError
 
 
-class EnvConfig(BaseSettings):
-    model_config = SettingsConfigDict(env_prefix="MSCHEMA_", case_sensitive=False)
+@functools.lru_cache(maxsize=1)
+def _env_config_class() -> type:
+    """Build EnvConfig on first use; pydantic_settings is slow to import."""
+    from pydantic_settings import BaseSettings, SettingsConfigDict
 
-    mongodb_uri: Optional[str] = None
-    default_db: Optional[str] = None
-    gemini_api_key: Optional[str] = None
+    class EnvConfig(BaseSettings):
+        model_config = SettingsConfigDict(env_prefix="MSCHEMA_", case_sensitive=False)
+
+        mongodb_uri: Optional[str] = None
+        default_db: Optional[str] = None
+        gemini_api_key: Optional[str] = None
+
+    EnvConfig.__module__ = __name__
+    EnvConfig.__qualname__ = "EnvConfig"
+    return EnvConfig
+
+
+@functools.lru_cache(maxsize=8)
+def _get_env_config(env: Tuple[Tuple[str, str], ...]) -> Any:
+    """Build EnvConfig once per distinct set of MSCHEMA_* variables."""
+    return _env_config_class()()
+
+
+def _env_snapshot() -> Tuple[Tuple[str, str], ...]:
+    return tuple(sorted(
+        (key, value) for key, value in os.environ.items() if key.upper().startswith("MSCHEMA_")
+    ))
+
+
+def __getattr__(name: str) -> Any:
+    if name == "EnvConfig":
+        return _env_config_class()
+    # Resolved against the current directory on access, not frozen at import.
+    if name == "DEFAULT_CONFIG_PATH":
+        return resolve_config_paths()[0]
+    if name == "LOCAL_CONFIG_PATH":
+        return resolve_config_paths()[1]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 class FileConfig(BaseModel):
@@ -30,29 +63,53 @@ class RuntimeConfig(BaseModel):
     gemini_api_key: Optional[str] = None
 
 
-DEFAULT_CONFIG_PATH = Path.cwd() / ".mschema.yml"
-LOCAL_CONFIG_PATH = Path.cwd() / ".mschema.local.yml"
+@functools.lru_cache(maxsize=8)
+def _paths_for(cwd: str) -> Tuple[Path, Path]:
+    base = Path(cwd)
+    return base / ".mschema.yml", base / ".mschema.local.yml"
+
+
+def resolve_config_paths() -> Tuple[Path, Path]:
+    """Return the (main, local) config file paths for the current directory."""
+    return _paths_for(os.getcwd())
+
 
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
 
-def load_file_config(path: Path = DEFAULT_CONFIG_PATH) -> FileConfig:
-    if not path.exists():
+
+@functools.lru_cache(maxsize=64)
+def _parse_yaml_cached(path_str: str, mtime_ns: int, size: int) -> Dict[str, Any]:
+    """Parse a YAML file; the stat fields key the cache so edits invalidate it."""
+    return yaml.load(Path(path_str).read_bytes(), Loader=_YAML_LOADER) or {}
+
+
+def load_file_config(path: Optional[Path] = None) -> FileConfig:
+    if path is None:
+        path = resolve_config_paths()[0]
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
         return FileConfig()
 
-    data = yaml.safe_load(path.read_text()) or {}
+    data = _parse_yaml_cached(str(path), stat.st_mtime_ns, stat.st_size)
     return FileConfig(**data)
 
 
-def load_runtime_config(path: Path = DEFAULT_CONFIG_PATH) -> RuntimeConfig:
+def load_runtime_config(path: Optional[Path] = None) -> RuntimeConfig:
     """Load configuration with priority: env vars > local file > main file."""
+    if path is None:
+        path, local_path = resolve_config_paths()
+    else:
+        local_path = path.parent / ".mschema.local.yml"
+
     # Load main config file
     file_config = load_file_config(path)
     
     # Load local override file (gitignored, for safe local testing)
-    local_path = path.parent / ".mschema.local.yml" if path != DEFAULT_CONFIG_PATH else LOCAL_CONFIG_PATH
     local_config = load_file_config(local_path)
     
     # Load environment variables
-    env_config = EnvConfig()
+    env_config = _get_env_config(_env_snapshot())
 
     # Priority: env > local > file
     mongodb_uri = env_config.mongodb_uri or local_config.mongodb_uri or file_config.mongodb_uri
@@ -71,7 +128,9 @@ def load_runtime_config(path: Path = DEFAULT_CONFIG_PATH) -> RuntimeConfig:
     )
 
 
-def write_default_config(path: Path = DEFAULT_CONFIG_PATH) -> Path:
+def write_default_config(path: Optional[Path] = None) -> Path:
+    if path is None:
+        path = resolve_config_paths()[0]
     if path.exists():
         return path
 
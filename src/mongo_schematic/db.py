@@ -1,16 +1,27 @@
 from __future__ import annotations
 
-from motor.motor_asyncio import AsyncIOMotorClient
-from beanie import init_beanie
+from typing import TYPE_CHECKING, Any
 
-from mongo_schematic.models import SchemaSnapshot, AnalysisRun
+if TYPE_CHECKING:
+    from motor.motor_asyncio import AsyncIOMotorClient
 
 
-def get_motor_client(mongodb_uri: str) -> AsyncIOMotorClient:
-    return AsyncIOMotorClient(mongodb_uri)
+# Motor, Beanie and the ODM models are imported on first use so commands that
+# never touch MongoDB do not pay for them at startup.
+
+
+def get_motor_client(mongodb_uri: str, **kwargs: Any) -> AsyncIOMotorClient:
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    return AsyncIOMotorClient(mongodb_uri, **kwargs)
 
 
 async def init_odm(mongodb_uri: str, database: str) -> AsyncIOMotorClient:
+    from beanie import init_beanie
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    from mongo_schematic.models import AnalysisRun, SchemaSnapshot
+
     client = AsyncIOMotorClient(mongodb_uri)
     await init_beanie(
         database=client[database],
@@ -6,22 +6,41 @@ from mongo_schematic.schema_io import get_schema_block
 
 
 def diff_schemas(source: Dict[str, Any], target: Dict[str, Any]) -> Dict[str, Any]:
+    # Drift checks often compare a cached schema against itself.
+    if source is target:
+        return _diff_result([], [], [])
+
     source_schema = get_schema_block(source)
     target_schema = get_schema_block(target)
 
     source_props = source_schema.get("properties", {}) if isinstance(source_schema, dict) else {}
     target_props = target_schema.get("properties", {}) if isinstance(target_schema, dict) else {}
 
-    added = sorted(set(target_props.keys()) - set(source_props.keys()))
-    removed = sorted(set(source_props.keys()) - set(target_props.keys()))
+    # Key views support set operations directly, without copying into sets first.
+    source_keys = source_props.keys()
+    target_keys = target_props.keys()
+    added = sorted(target_keys - source_keys)
+    removed = sorted(source_keys - target_keys)
+
+    common = source_keys & target_keys
 
     changed: List[Dict[str, Any]] = []
-    for field in sorted(set(source_props.keys()) & set(target_props.keys())):
+    for field in sorted(common):
         src = source_props[field]
         tgt = target_props[field]
+        if src is tgt:
+            continue
         if _field_signature(src) != _field_signature(tgt):
             changed.append({"field": field, "from": src, "to": tgt})
 
+    return _diff_result(added, removed, changed)
+
+
+def _diff_result(
+    added: List[str],
+    removed: List[str],
+    changed: List[Dict[str, Any]],
+) -> Dict[str, Any]:
     return {
         "added_fields": added,
         "removed_fields": removed,
@@ -35,13 +54,14 @@ def diff_schemas(source: Dict[str, Any], target: Dict[str, Any]) -> Dict[str, An
 
 
 def _field_signature(field_def: Any) -> Any:
+    """Return a ``(bsonType, nullable, presence)`` tuple for cheap comparison."""
     if not isinstance(field_def, dict):
         return field_def
-    return {
-        "bsonType": _normalize_bson_type(field_def.get("bsonType")),
-        "nullable": field_def.get("nullable"),
-        "presence": field_def.get("presence"),
-    }
+    return (
+        _normalize_bson_type(field_def.get("bsonType")),
+        field_def.get("nullable"),
+        field_def.get("presence"),
+    )
 
 
 def _normalize_bson_type(bson_type: Any) -> Any:
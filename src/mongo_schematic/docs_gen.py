@@ -1,10 +1,12 @@
+import html
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, List
 
 from mongo_schematic import __version__
-from mongo_schematic.schema_io import load_schema
+from mongo_schematic.schema_io import list_schema_files, load_schema
 
+# %-style placeholders: one pass, and the CSS braces need no escaping.
 HTML_TEMPLATE = """
 <!DOCTYPE html>
 <html lang="en">
@@ -13,21 +15,21 @@ HTML_TEMPLATE = """
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>MongoSchematic Documentation</title>
     <style>
-        :root {{
+        :root {
             --primary-color: #2563eb;
             --bg-color: #f8fafc;
             --sidebar-width: 280px;
             --border-color: #e2e8f0;
-        }}
-        body {{
+        }
+        body {
             font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, "Helvetica Neue", Arial, sans-serif;
             margin: 0;
             display: flex;
             min-height: 100vh;
             background: var(--bg-color);
             color: #1e293b;
-        }}
-        .sidebar {{
+        }
+        .sidebar {
             width: var(--sidebar-width);
             background: white;
             border-right: 1px solid var(--border-color);
@@ -35,158 +37,146 @@ HTML_TEMPLATE = """
             position: fixed;
             height: 100vh;
             overflow-y: auto;
-        }}
-        .main-content {{
+        }
+        .main-content {
             margin-left: var(--sidebar-width);
             padding: 3rem;
             flex: 1;
             max-width: 1000px;
-        }}
-        h1, h2, h3 {{ color: #0f172a; }}
-        a {{ color: var(--primary-color); text-decoration: none; }}
-        .nav-link {{
+        }
+        h1, h2, h3 { color: #0f172a; }
+        a { color: var(--primary-color); text-decoration: none; }
+        .nav-link {
             display: block;
             padding: 0.75rem 1rem;
             border-radius: 0.5rem;
             margin-bottom: 0.25rem;
             color: #64748b;
-        }}
-        .nav-link:hover, .nav-link.active {{
+        }
+        .nav-link:hover, .nav-link.active {
             background: #eff6ff;
             color: var(--primary-color);
-        }}
-        .schema-card {{
+        }
+        .schema-card {
             background: white;
             border-radius: 0.75rem;
             box-shadow: 0 1px 3px rgba(0,0,0,0.1);
             padding: 2rem;
             margin-bottom: 3rem;
-        }}
-        table {{
-            width: 100%;
+        }
+        table {
+            width: 100%%;
             border-collapse: collapse;
             margin-top: 1.5rem;
-        }}
-        th {{
+        }
+        th {
             text-align: left;
             padding: 0.75rem;
             background: #f8fafc;
             border-bottom: 2px solid var(--border-color);
             color: #64748b;
             font-weight: 600;
-        }}
-        td {{
+        }
+        td {
             padding: 0.75rem;
             border-bottom: 1px solid var(--border-color);
-        }}
-        .badge {{
+        }
+        .badge {
             display: inline-block;
             padding: 0.25rem 0.5rem;
             border-radius: 9999px;
             font-size: 0.75rem;
             font-weight: 600;
-        }}
-        .badge-req {{ background: #fee2e2; color: #991b1b; }}
-        .badge-opt {{ background: #eff6ff; color: #1e40af; }}
-        .badge-type {{ background: #f1f5f9; color: #475569; font-family: monospace; }}
-        .meta {{
+        }
+        .badge-req { background: #fee2e2; color: #991b1b; }
+        .badge-opt { background: #eff6ff; color: #1e40af; }
+        .badge-type { background: #f1f5f9; color: #475569; font-family: monospace; }
+        .meta {
             display: grid;
             grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
             gap: 1rem;
             margin-bottom: 2rem;
             padding-bottom: 2rem;
             border-bottom: 1px solid var(--border-color);
-        }}
-        .meta-item label {{ display: block; color: #64748b; font-size: 0.875rem; }}
-        .meta-item span {{ font-weight: 600; }}
-        .anomaly {{
+        }
+        .meta-item label { display: block; color: #64748b; font-size: 0.875rem; }
+        .meta-item span { font-weight: 600; }
+        .anomaly {
             margin-top: 1rem;
             padding: 1rem;
             background: #fffbeb;
             border: 1px solid #fcd34d;
             border-radius: 0.5rem;
             color: #92400e;
-        }}
+        }
     </style>
 </head>
 <body>
     <nav class="sidebar">
-        <h3>MongoSchematic v{version}</h3>
+        <h3>MongoSchematic v%(version)s</h3>
         <div style="margin-top: 2rem;">
-            {nav_items}
+            %(nav_items)s
         </div>
     </nav>
     <main class="main-content">
         <h1>Database Documentation</h1>
-        <p>Generated on {generated_at}</p>
+        <p>Generated on %(generated_at)s</p>
         
-        {content}
+        %(content)s
     </main>
 </body>
 </html>
 """
 
-def generate_docs(schema_dir: Path, out_file: Path) -> None:
-    """Generate static HTML documentation from schema directory."""
-    files = sorted(list(schema_dir.glob("*.yml")) + list(schema_dir.glob("*.yaml")))
-    
-    nav_items = []
-    content_blocks = []
-    
-    for schema_path in files:
-        schema = load_schema(schema_path)
-        coll_name = schema_path.stem.split(".")[0]
-        
-        nav_items.append(f'<a href="#{coll_name}" class="nav-link">{coll_name}</a>')
-        
-        props_html = []
-        properties = schema.get("schema", {}).get("properties", {})
-        required = set(schema.get("schema", {}).get("required", []))
-        
-        for field, details in properties.items():
-            bson_type = details.get("bsonType", "any")
-            req_badge = '<span class="badge badge-req">Required</span>' if field in required else '<span class="badge badge-opt">Optional</span>'
-            presence = f"{details.get('presence', 0) * 100:.1f}%"
-            
-            props_html.append(f"""
+# Page shell split around the cards so they can be streamed straight to disk.
+_PAGE_HEAD, _PAGE_TAIL = HTML_TEMPLATE.split("%(content)s")
+
+_NAV_TMPL = '<a href="#%s" class="nav-link">%s</a>'
+
+_ROW_TMPL = """
             <tr>
-                <td><strong>{field}</strong></td>
-                <td><span class="badge badge-type">{bson_type}</span></td>
-                <td>{req_badge}</td>
-                <td>{presence}</td>
+                <td><strong>%s</strong></td>
+                <td><span class="badge badge-type">%s</span></td>
+                <td>%s</td>
+                <td>%.1f%%</td>
             </tr>
-            """)
-        
-        anomalies_html = ""
-        anomalies = schema.get("anomalies", [])
-        if anomalies:
-            items = "".join([f"<li>{a.get('type')}: {a.get('field')}</li>" for a in anomalies])
-            anomalies_html = f"""
+            """
+
+_REQ_BADGE = '<span class="badge badge-req">Required</span>'
+_OPT_BADGE = '<span class="badge badge-opt">Optional</span>'
+
+_ANOMALY_ITEM_TMPL = "<li>%s: %s</li>"
+
+_ANOMALIES_OPEN = """
             <div class="anomaly">
                 <strong>⚠️ Anomalies Detected:</strong>
-                <ul>{items}</ul>
+                <ul>"""
+
+_ANOMALIES_CLOSE = """</ul>
             </div>
             """
 
-        content_blocks.append(f"""
-        <div id="{coll_name}" class="schema-card">
-            <h2>{coll_name}</h2>
+_CARD_OPEN_TMPL = """
+        <div id="%s" class="schema-card">
+            <h2>%s</h2>
             <div class="meta">
                 <div class="meta-item">
                     <label>Collection</label>
-                    <span>{schema.get('collection', coll_name)}</span>
+                    <span>%s</span>
                 </div>
                 <div class="meta-item">
                     <label>Database</label>
-                    <span>{schema.get('database', 'N/A')}</span>
+                    <span>%s</span>
                 </div>
                 <div class="meta-item">
                     <label>Total Documents</label>
-                    <span>{schema.get('total_documents', 'N/A')}</span>
+                    <span>%s</span>
                 </div>
             </div>
             
-            {anomalies_html}
+            """
+
+_TABLE_OPEN = """
             
             <table>
                 <thead>
@@ -198,18 +188,73 @@ def generate_docs(schema_dir: Path, out_file: Path) -> None:
                     </tr>
                 </thead>
                 <tbody>
-                    {''.join(props_html)}
+                    """
+
+_CARD_CLOSE = """
                 </tbody>
             </table>
         </div>
-        """)
-    
-    html = HTML_TEMPLATE.format(
-        version=__version__,
-        generated_at=datetime.now().strftime("%Y-%m-%d %H:%M"),
-        nav_items="\n".join(nav_items),
-        content="\n".join(content_blocks)
-    )
-    
+        """
+
+
+def _esc(value: Any) -> str:
+    """Escape a value for use as HTML text content."""
+    return html.escape(str(value), quote=False)
+
+
+def generate_docs(schema_dir: Path, out_file: Path) -> None:
+    """Generate static HTML documentation from schema directory.
+
+    The page is written as it is built, one collection card at a time, so
+    memory stays bounded by the largest card rather than the whole page.
+    """
+    files = list_schema_files(schema_dir)
+    coll_names = [schema_path.stem.split(".")[0] for schema_path in files]
+    coll_ids = [html.escape(name) for name in coll_names]
+
     out_file.parent.mkdir(parents=True, exist_ok=True)
-    out_file.write_text(html)
+    with out_file.open("w", buffering=1 << 20) as fh:
+        write = fh.write
+        write(_PAGE_HEAD % {
+            "version": __version__,
+            "generated_at": datetime.now().strftime("%Y-%m-%d %H:%M"),
+            "nav_items": "\n".join(_NAV_TMPL % (coll_id, coll_id) for coll_id in coll_ids),
+        })
+
+        for index, schema_path in enumerate(files):
+            schema = load_schema(schema_path)
+            coll_name = coll_names[index]
+            coll_id = coll_ids[index]
+
+            schema_block = schema.get("schema", {})
+            properties = schema_block.get("properties", {})
+            required = set(schema_block.get("required", []))
+
+            if index:
+                write("\n")
+            write(_CARD_OPEN_TMPL % (
+                coll_id,
+                coll_id,
+                _esc(schema.get("collection", coll_name)),
+                _esc(schema.get("database", "N/A")),
+                _esc(schema.get("total_documents", "N/A")),
+            ))
+
+            anomalies = schema.get("anomalies", [])
+            if anomalies:
+                write(_ANOMALIES_OPEN)
+                for a in anomalies:
+                    write(_ANOMALY_ITEM_TMPL % (_esc(a.get("type")), _esc(a.get("field"))))
+                write(_ANOMALIES_CLOSE)
+
+            write(_TABLE_OPEN)
+            for field, details in properties.items():
+                write(_ROW_TMPL % (
+                    _esc(field),
+                    _esc(details.get("bsonType", "any")),
+                    _REQ_BADGE if field in required else _OPT_BADGE,
+                    details.get("presence", 0) * 100,
+                ))
+            write(_CARD_CLOSE)
+
+        write(_PAGE_TAIL)
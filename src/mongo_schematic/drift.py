@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from typing import Any, Dict, List, Set
+from typing import Any, Callable, Dict, FrozenSet, List, Tuple
 
 from mongo_schematic.diff import diff_schemas
 
@@ -22,170 +22,212 @@ def detect_drift(
     """
     diff = diff_schemas(expected_schema, observed_schema)
 
-    # Filter out type changes that are compatible (expected allows observed)
-    filtered_changes: List[Dict[str, Any]] = []
-    for change in diff.get("changed_fields", []):
-        from_def = change.get("from", {})
-        to_def = change.get("to", {})
-        if _only_type_changed(from_def, to_def) and _is_type_compatible(from_def, to_def):
-            continue
-        filtered_changes.append(change)
+    # Stable schemas are the common case in CI hooks; skip the scoring pass.
+    if not diff["added_fields"] and not diff["removed_fields"] and not diff["changed_fields"]:
+        return {
+            **diff,
+            "severity": [],
+            "drift_score": 0.0,
+            "has_drift": False,
+            "critical_count": 0,
+            "warning_count": 0,
+            "info_count": 0,
+        }
+
+    # One pass filters compatible type changes, classifies, scores and counts.
+    filtered_changes, severity_items, drift_score, counts = _assess_drift(diff, filter_compatible=True)
 
     diff["changed_fields"] = filtered_changes
     if "summary" in diff and isinstance(diff["summary"], dict):
         diff["summary"]["changed"] = len(filtered_changes)
 
-    severity_items = _classify_severity(diff)
-    drift_score = _calculate_drift_score(diff)
-
     return {
         **diff,
         "severity": severity_items,
         "drift_score": drift_score,
         "has_drift": drift_score > 0,
-        "critical_count": len([s for s in severity_items if s["level"] == "critical"]),
-        "warning_count": len([s for s in severity_items if s["level"] == "warning"]),
-        "info_count": len([s for s in severity_items if s["level"] == "info"]),
+        "critical_count": counts["critical"],
+        "warning_count": counts["warning"],
+        "info_count": counts["info"],
     }
 
 
-def _classify_severity(diff: Dict[str, Any]) -> List[Dict[str, Any]]:
-    """Classify each drift item by severity level.
+# Severity levels as small ints; the JSON output uses their names. A changed
+# field's level is INFO + (presence shifted), so the order matters.
+INFO, WARNING, CRITICAL = 0, 1, 2
+_LEVEL_NAMES: Tuple[str, str, str] = ("info", "warning", "critical")
+
+
+def _assess_drift(
+    diff: Dict[str, Any],
+    filter_compatible: bool = False,
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], float, Dict[str, int]]:
+    """Classify and score a diff in a single pass over its changes.
+
+    Severity levels:
+    - critical: Type change the expected schema does not allow
+    - warning: Field removed, presence shifted by more than 20 points
+    - info: Field added, compatible type or minor presence changes
+
+    Scoring (0.0 to 1.0+):
+    - Each added field: +0.05
+    - Each removed field: +0.15
+    - Each type change: +0.25
+    - Each other change: +0.1
 
-    - critical: Required field removed, type change on high-presence field
-    - warning: Field removed (non-required), type changes
-    - info: Field added, minor presence changes
+    When ``filter_compatible`` is set, changes where only the type changed and
+    the observed type is allowed by the expected one are dropped.
+
+    Returns:
+        (kept changes, severity items, drift score, level counts)
     """
+    added = diff.get("added_fields", [])
+    removed = diff.get("removed_fields", [])
     items: List[Dict[str, Any]] = []
 
-    for field in diff.get("added_fields", []):
+    for field in added:
         items.append({
-            "level": "info",
+            "level": _LEVEL_NAMES[INFO],
             "type": "field_added",
             "field": field,
             "message": f"New field '{field}' detected in live data",
         })
 
-    for field in diff.get("removed_fields", []):
+    for field in removed:
         items.append({
-            "level": "warning",
+            "level": _LEVEL_NAMES[WARNING],
             "type": "field_removed",
             "field": field,
             "message": f"Field '{field}' missing from live data",
         })
 
+    level_counts = [len(added), len(removed), 0]
+    kept: List[Dict[str, Any]] = []
+
     for change in diff.get("changed_fields", []):
-        field = change.get("field", "unknown")
         from_def = change.get("from", {})
         to_def = change.get("to", {})
+        # Normalize each side once; both checks below reuse the results.
+        from_types = _normalize_types(from_def)
+        to_types = _normalize_types(to_def)
+        compatible = _types_compatible(from_types, to_types)
+        if (
+            filter_compatible
+            and compatible
+            and from_types != to_types
+            and _same_shape(from_def, to_def)
+        ):
+            continue
+        kept.append(change)
 
-        from_type = from_def.get("bsonType") if isinstance(from_def, dict) else None
-        to_type = to_def.get("bsonType") if isinstance(to_def, dict) else None
-
-        if from_type and to_type and from_type != to_type:
-            if _is_type_compatible(from_def, to_def):
-                from_presence = from_def.get("presence", 0) if isinstance(from_def, dict) else 0
-                to_presence = to_def.get("presence", 0) if isinstance(to_def, dict) else 0
-                delta = abs(to_presence - from_presence)
-                level = "warning" if delta > 0.2 else "info"
-                items.append({
-                    "level": level,
-                    "type": "field_changed",
-                    "field": field,
-                    "message": f"Field '{field}' definition changed",
-                    "presence_delta": round(delta, 4),
-                })
-            else:
-                items.append({
-                    "level": "critical",
-                    "type": "type_changed",
-                    "field": field,
-                    "message": f"Type changed for '{field}': {from_type} -> {to_type}",
-                    "from_type": from_type,
-                    "to_type": to_type,
-                })
-        else:
-            from_presence = from_def.get("presence", 0) if isinstance(from_def, dict) else 0
-            to_presence = to_def.get("presence", 0) if isinstance(to_def, dict) else 0
-            delta = abs(to_presence - from_presence)
-
-            if delta > 0.2:
-                level = "warning"
-            else:
-                level = "info"
+        field = change.get("field", "unknown")
+        from_is_dict = isinstance(from_def, dict)
+        to_is_dict = isinstance(to_def, dict)
+        from_type = from_def.get("bsonType") if from_is_dict else None
+        to_type = to_def.get("bsonType") if to_is_dict else None
 
+        if from_type and to_type and from_type != to_type and not compatible:
+            level_counts[CRITICAL] += 1
             items.append({
-                "level": level,
-                "type": "field_changed",
+                "level": _LEVEL_NAMES[CRITICAL],
+                "type": "type_changed",
                 "field": field,
-                "message": f"Field '{field}' definition changed",
-                "presence_delta": round(delta, 4),
+                "message": f"Type changed for '{field}': {from_type} -> {to_type}",
+                "from_type": from_type,
+                "to_type": to_type,
             })
+            continue
+
+        from_presence = from_def.get("presence", 0) if from_is_dict else 0
+        to_presence = to_def.get("presence", 0) if to_is_dict else 0
+        delta = abs(to_presence - from_presence)
+        level = INFO + (delta > 0.2)
+        level_counts[level] += 1
+
+        items.append({
+            "level": _LEVEL_NAMES[level],
+            "type": "field_changed",
+            "field": field,
+            "message": f"Field '{field}' definition changed",
+            "presence_delta": round(delta, 4),
+        })
+
+    critical = level_counts[CRITICAL]
+    score = (
+        len(added) * 0.05
+        + len(removed) * 0.15
+        + critical * 0.25
+        + (len(kept) - critical) * 0.1
+    )
+    counts = dict(zip(_LEVEL_NAMES, level_counts))
+    return kept, items, round(score, 2), counts
 
-    return items
 
+def _classify_severity(diff: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Classify each drift item by severity level (see _assess_drift)."""
+    return _assess_drift(diff)[1]
+
+
+_NULL_TYPES: FrozenSet[str] = frozenset(("null",))
+_NO_TYPES: FrozenSet[str] = frozenset()
+# Shared results for the common scalar types, so normalizing allocates nothing.
+_SINGLETON_TYPES: Dict[str, FrozenSet[str]] = {
+    t: frozenset((t,))
+    for t in (
+        "string", "int", "long", "double", "decimal", "bool", "date",
+        "timestamp", "objectId", "array", "object", "binData", "null",
+    )
+}
+
+
+def _normalize_str(bson_type: str) -> FrozenSet[str]:
+    cached = _SINGLETON_TYPES.get(bson_type)
+    return cached if cached is not None else frozenset((bson_type,))
+
+
+def _normalize_list(bson_type: List[Any]) -> FrozenSet[str]:
+    return frozenset(
+        "null" if entry is None else entry
+        for entry in bson_type
+        if entry is None or isinstance(entry, str)
+    )
 
-def _normalize_types(definition: Dict[str, Any]) -> Set[str]:
+
+def _normalize_none(bson_type: None) -> FrozenSet[str]:
+    return _NULL_TYPES
+
+
+_TYPE_NORMALIZERS: Dict[type, Callable[[Any], FrozenSet[str]]] = {
+    str: _normalize_str,
+    list: _normalize_list,
+    type(None): _normalize_none,
+}
+
+
+def _normalize_types(definition: Dict[str, Any]) -> FrozenSet[str]:
     if not isinstance(definition, dict):
-        return set()
+        return _NO_TYPES
     bson_type = definition.get("bsonType")
-    if isinstance(bson_type, list):
-        normalized: Set[str] = set()
-        for entry in bson_type:
-            if entry is None:
-                normalized.add("null")
-            elif isinstance(entry, str):
-                normalized.add(entry)
-        return normalized
-    if isinstance(bson_type, str):
-        return {bson_type}
-    if bson_type is None:
-        return {"null"}
-    return set()
-
-
-def _only_type_changed(from_def: Dict[str, Any], to_def: Dict[str, Any]) -> bool:
+    normalize = _TYPE_NORMALIZERS.get(type(bson_type))
+    return normalize(bson_type) if normalize is not None else _NO_TYPES
+
+
+def _same_shape(from_def: Dict[str, Any], to_def: Dict[str, Any]) -> bool:
+    """Whether nullability and presence match, ignoring bsonType."""
     if not isinstance(from_def, dict) or not isinstance(to_def, dict):
         return False
     return (
         from_def.get("nullable") == to_def.get("nullable")
         and from_def.get("presence") == to_def.get("presence")
-        and _normalize_types(from_def) != _normalize_types(to_def)
     )
 
 
-def _is_type_compatible(expected_def: Dict[str, Any], observed_def: Dict[str, Any]) -> bool:
-    expected_types = _normalize_types(expected_def)
-    observed_types = _normalize_types(observed_def)
+def _types_compatible(expected_types: FrozenSet[str], observed_types: FrozenSet[str]) -> bool:
     if not expected_types or not observed_types:
         return False
     return observed_types.issubset(expected_types)
 
 
 def _calculate_drift_score(diff: Dict[str, Any]) -> float:
-    """Calculate an overall drift score (0.0 to 1.0+).
-
-    Scoring:
-    - Each added field: +0.05
-    - Each removed field: +0.15
-    - Each type change: +0.25
-    - Each other change: +0.1
-    """
-    score = 0.0
-
-    score += len(diff.get("added_fields", [])) * 0.05
-    score += len(diff.get("removed_fields", [])) * 0.15
-
-    for change in diff.get("changed_fields", []):
-        from_def = change.get("from", {})
-        to_def = change.get("to", {})
-
-        from_type = from_def.get("bsonType") if isinstance(from_def, dict) else None
-        to_type = to_def.get("bsonType") if isinstance(to_def, dict) else None
-
-        if from_type and to_type and from_type != to_type and not _is_type_compatible(from_def, to_def):
-            score += 0.25
-        else:
-            score += 0.1
-
-    return round(score, 2)
+    """Calculate an overall drift score (see _assess_drift for weights)."""
+    return _assess_drift(diff)[2]
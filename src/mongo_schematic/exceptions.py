@@ -31,3 +31,9 @@ class AIError(MongoSchematicError):
     """Raised when Gemini AI operations fail."""
 
     pass
+
+
+class CircuitBreakerOpenError(AIError):
+    """Raised when Gemini calls are short-circuited after repeated failures."""
+
+    pass
@@ -27,14 +27,21 @@ PRE_COMMIT_CONFIG = {
     ]
 }
 
+# The config is static, so render it once; libyaml's dumper when available.
+_PRE_COMMIT_YAML = yaml.dump(
+    PRE_COMMIT_CONFIG,
+    Dumper=getattr(yaml, "CSafeDumper", yaml.SafeDumper),
+    sort_keys=False,
+)
+
+
 def install_hooks(path: Path = Path(".pre-commit-config.yaml")) -> None:
     """Install pre-commit hooks for MongoSchematic."""
     
     if path.exists():
-        content = yaml.safe_load(path.read_text())
         # Simplification: just return if file exists to avoid overwriting complex configs
         # In a real tool, we would merge
         print(f"Config {path} already exists. Please manually add MongoSchematic hooks.")
         return
 
-    path.write_text(yaml.dump(PRE_COMMIT_CONFIG, sort_keys=False))
+    path.write_text(_PRE_COMMIT_YAML)
@@ -1,11 +1,15 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List
-
-from motor.motor_asyncio import AsyncIOMotorClient
+from typing import TYPE_CHECKING, Any, Dict, List
 
 from mongo_schematic.schema_io import get_schema_block
 
+if TYPE_CHECKING:
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+_HIGH_PRESENCE_THRESHOLD = 0.8
+_HIGH_PRESENCE_REASON = "High presence; consider indexing"
+
 
 async def list_indexes(
     client: AsyncIOMotorClient, database: str, collection: str
@@ -40,23 +44,16 @@ def recommend_indexes(schema_payload: Dict[str, Any], indexes: List[Dict[str, An
     schema = get_schema_block(schema_payload)
     properties = schema.get("properties", {}) if isinstance(schema, dict) else {}
 
-    existing_fields = set()
-    for idx in indexes:
-        for key, _direction in idx.get("keys", []):
-            existing_fields.add(key)
-
-    recommendations = []
-    for field, field_def in properties.items():
-        if not isinstance(field_def, dict):
-            continue
-        presence = field_def.get("presence", 0)
-        if presence >= 0.8 and field not in existing_fields:
-            recommendations.append(
-                {
-                    "field": field,
-                    "reason": "High presence; consider indexing",
-                    "suggested_index": {"fields": {field: 1}},
-                }
-            )
-
-    return recommendations
+    existing_fields = {key for idx in indexes for key, _direction in idx.get("keys", ())}
+
+    return [
+        {
+            "field": field,
+            "reason": _HIGH_PRESENCE_REASON,
+            "suggested_index": {"fields": {field: 1}},
+        }
+        for field, field_def in properties.items()
+        if field not in existing_fields
+        and isinstance(field_def, dict)
+        and field_def.get("presence", 0) >= _HIGH_PRESENCE_THRESHOLD
+    ]
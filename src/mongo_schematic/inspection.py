@@ -0,0 +1,87 @@
+"""Single-pass collection inspection: schema inference, validation and drift."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Dict, List
+
+from mongo_schematic.analyze import (
+    CURSOR_BATCH_SIZE,
+    FieldTable,
+    _build_analysis,
+    _process_document,
+)
+from mongo_schematic.drift import detect_drift
+from mongo_schematic.schema_io import get_schema_block
+from mongo_schematic.validate import _validate_document
+
+if TYPE_CHECKING:
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+
+async def inspect_collection(
+    client: AsyncIOMotorClient,
+    database: str,
+    collection: str,
+    schema_payload: Dict[str, Any],
+    sample_size: int = 10000,
+    max_errors: int = 100,
+) -> Dict[str, Any]:
+    """Analyze, validate and drift-check a collection from one sample.
+
+    A single ``$sample`` cursor feeds both the schema walker and the document
+    validator, so checking drift and validity together reads each sampled
+    document once instead of twice.
+
+    Returns:
+        Dict with ``analysis`` (as from analyze_collection), ``validation``
+        (as from validate_collection) and ``drift`` (as from detect_drift).
+    """
+    db = client[database]
+    coll = db[collection]
+
+    total_docs = await coll.estimated_document_count()
+    target = min(sample_size, total_docs) if total_docs > 0 else 0
+
+    schema = get_schema_block(schema_payload)
+    properties = schema.get("properties", {})
+    required = set(schema.get("required", []))
+
+    table = FieldTable()
+    sampled = 0
+    valid_count = 0
+    errors: List[Dict[str, Any]] = []
+
+    if target > 0:
+        if target == total_docs:
+            cursor = coll.find().limit(target).batch_size(CURSOR_BATCH_SIZE)
+        else:
+            pipeline = [{"$sample": {"size": target}}]
+            cursor = coll.aggregate(pipeline, batchSize=CURSOR_BATCH_SIZE)
+
+        async for doc in cursor:
+            sampled += 1
+            _process_document(doc, table, prefix="")
+            doc_errors = _validate_document(doc, properties, required)
+            if doc_errors:
+                if len(errors) < max_errors:
+                    errors.append({"_id": str(doc.get("_id")), "issues": doc_errors})
+            else:
+                valid_count += 1
+
+    analysis = _build_analysis(database, collection, table, total_docs, sampled, sample_size)
+    validation = {
+        "database": database,
+        "collection": collection,
+        "total_documents": total_docs,
+        "sampled_documents": sampled,
+        "valid": valid_count,
+        "invalid": sampled - valid_count,
+        "errors": errors,
+        "validated_at": analysis["analyzed_at"],
+    }
+
+    return {
+        "analysis": analysis,
+        "validation": validation,
+        "drift": detect_drift(schema_payload, analysis),
+    }
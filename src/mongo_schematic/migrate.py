@@ -1,16 +1,286 @@
 from __future__ import annotations
 
-import json
-from datetime import datetime
+import asyncio
+import functools
+import io
+import os
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Set
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    FrozenSet,
+    List,
+    Optional,
+    Protocol,
+    Tuple,
+)
 
 from mongo_schematic.diff import diff_schemas
+from mongo_schematic.reporting import dumps_json
 from mongo_schematic.schema_io import get_schema_block
 
+if TYPE_CHECKING:
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+
+_NO_TYPES: FrozenSet[str] = frozenset()
+
+# Id pages combined into one bulk_write when a batched run is not throttled.
+PAGES_PER_BULK_WRITE = 16
+
+# Python reprs of the defaults written into generated migrations.
+_BSON_DEFAULTS = {
+    "string": '""',
+    "int": "0",
+    "double": "0.0",
+    "bool": "False",
+    "array": "[]",
+    "object": "{}",
+    "date": "datetime.now(timezone.utc)",
+    "null": "None",
+}
+
+# BSON type names mapped to MongoDB $convert "to" values.
+_BSON_CONVERT_TYPES = {
+    "string": "string",
+    "int": "int",
+    "double": "double",
+    "bool": "bool",
+    "objectId": "objectId",
+    "date": "date",
+    "long": "long",
+    "decimal": "decimal",
+}
+
+# Templates for the generated up()/down() bodies. Each renders whole lines,
+# including the trailing blank separator, so a block is one % substitution.
+_COLL_HEADER = """\
+        coll = self.db['%(collection)s']
+
+"""
+
+_SET_MISSING_TEMPLATE = """\
+        # %(comment)s
+        await coll.update_many(
+            {'%(field)s': {'$exists': False}},
+            {'$set': {'%(field)s': %(value)s}}
+        )
+
+"""
+
+_FILL_REQUIRED_TEMPLATE = """\
+        # Fill missing required field '%(field)s' with default
+        await coll.update_many(
+            {'$or': [{'%(field)s': {'$exists': False}}, {'%(field)s': None}]},
+            {'$set': {'%(field)s': %(value)s}}
+        )
+
+"""
+
+_FILL_NULLS_TEMPLATE = """\
+        # Fill nulls for '%(field)s' with default
+        await coll.update_many(
+            {'%(field)s': None},
+            {'$set': {'%(field)s': %(value)s}}
+        )
+
+"""
+
+_NOTE_TEMPLATE = """\
+        # %(note)s
+
+"""
+
+_WRAP_TEMPLATE = """\
+        # %(comment)s
+        await coll.update_many(
+            {'%(field)s': {'$exists': True}},
+            [{
+                '$set': {
+                    '%(field)s': {
+                        '$cond': [
+                            {'$isArray': '$%(field)s'},
+                            '$%(field)s',
+                            ['$%(field)s']
+                        ]
+                    }
+                }
+            }]
+        )
+
+"""
+
+_UNWRAP_TEMPLATE = """\
+        # %(comment)s
+        await coll.update_many(
+            {'%(field)s': {'$exists': True}},
+            [{
+                '$set': {
+                    '%(field)s': {
+                        '$cond': [
+                            {'$isArray': '$%(field)s'},
+                            {'$arrayElemAt': ['$%(field)s', 0]},
+                            '$%(field)s'
+                        ]
+                    }
+                }
+            }]
+        )
+
+"""
+
+_CONVERT_ITEMS_TEMPLATE = """\
+        # Convert '%(field)s' array items to %(to_item)s
+        await coll.update_many(
+            {'%(field)s': {'$exists': True}},
+            [{
+                '$set': {
+                    '%(field)s': {
+                        '$cond': [
+                            {'$isArray': '$%(field)s'},
+                            {'$map': {
+                                'input': '$%(field)s',
+                                'as': 'item',
+                                'in': {
+                                    '$convert': {'input': '$$item', 'to': '%(mongo_type)s', 'onError': '$$item', 'onNull': None}
+                                }
+                            }},
+                            '$%(field)s'
+                        ]
+                    }
+                }
+            }]
+        )
+
+"""
+
+_CONVERT_TEMPLATE = """\
+        # %(comment)s
+        await coll.update_many(
+            {'%(field)s': {'$exists': True}},
+            [{
+                '$set': {
+                    '%(field)s': {
+                        '$convert': {
+                            'input': '$%(field)s',
+                            'to': '%(mongo_type)s',
+                            'onError': '$%(field)s',
+                            'onNull': None
+                        }
+                    }
+                }
+            }]
+        )
+
+"""
+
+_REMOVE_COMMENTED_TEMPLATE = """\
+        # Uncomment to remove field '%(field)s' (DESTRUCTIVE)
+        # await coll.update_many(
+        #     {'%(field)s': {'$exists': True}},
+        #     {'$unset': {'%(field)s': ''}}
+        # )
+
+"""
+
+_UNSET_TEMPLATE = """\
+        # Remove field '%(field)s' (was added in up)
+        await coll.update_many(
+            {'%(field)s': {'$exists': True}},
+            {'$unset': {'%(field)s': ''}}
+        )
+
+"""
+
+_RESTORE_TEMPLATE = """\
+        # Restore field '%(field)s' - requires backup data
+        # TODO: Implement data restoration for '%(field)s'
+        pass
+
+"""
+
+# Skeleton of a generated migration module; filled once per file.
+_MIGRATION_TEMPLATE = '''"""
+Migration: %(collection)s schema change
+Generated at: %(generated_at)s
+
+Summary:
+  Added fields: %(n_added)d
+  Removed fields: %(n_removed)d
+  Changed fields: %(n_changed)d
+
+Usage:
+    from motor.motor_asyncio import AsyncIOMotorClient
+    
+    client = AsyncIOMotorClient("mongodb://localhost:27017")
+    migration = Migration(client, "your_database")
+    await migration.up()  # Apply migration
+    await migration.down()  # Rollback (if needed)
+"""
+
+from datetime import datetime, timezone
 from motor.motor_asyncio import AsyncIOMotorClient
-from pymongo import UpdateOne
-from bson import ObjectId
+
+
+class Migration:
+    """Schema migration for %(collection)s collection."""
+    
+    def __init__(self, client: AsyncIOMotorClient, database: str):
+        self.client = client
+        self.db = client[database]
+
+    async def up(self):
+        \"\"\"Apply the forward migration.\"\"\"
+%(up_code)s
+
+    async def down(self):
+        \"\"\"Rollback the migration.\"\"\"
+%(down_code)s
+
+
+__metadata__ = %(meta)r
+'''
+
+
+def _as_dict(value: Any) -> Dict[str, Any]:
+    """Return value if it is a dict, else an empty dict."""
+    return value if isinstance(value, dict) else {}
+
+
+def _field_defs(schema: Any) -> Dict[str, Dict[str, Any]]:
+    """Return a schema block's properties, skipping non-dict definitions."""
+    properties = _as_dict(schema).get("properties", {})
+    return {name: d for name, d in properties.items() if isinstance(d, dict)}
+
+
+def _schema_view(
+    payload: Optional[Dict[str, Any]],
+) -> Tuple[Dict[str, Dict[str, Any]], FrozenSet[str]]:
+    """Return a schema's dict-valued properties and its required field names.
+
+    Generators read both from the same unwrapped block, so they derive them
+    together once instead of re-checking the block per lookup.
+    """
+    block = get_schema_block(payload) if payload else {}
+    if not isinstance(block, dict):
+        return {}, frozenset()
+    return _field_defs(block), frozenset(block.get("required", ()))
+
+
+def _default_repr(value: Any) -> str:
+    """Render a schema default as a literal for the generated code."""
+    return dumps_json(value, indent=False).decode("utf-8")
+
+
+def _finish(buf: io.StringIO) -> str:
+    # Every template ends its lines with a newline; drop the final one so the
+    # body ends like the "\n".join(lines) output it replaces.
+    return buf.getvalue()[:-1]
 
 
 def _generate_up_code(
@@ -20,254 +290,142 @@ def _generate_up_code(
     from_schema: Dict[str, Any] | None = None,
 ) -> str:
     """Generate the up() method code based on schema diff."""
-    lines: List[str] = []
-    schema = get_schema_block(to_schema)
-    properties = schema.get("properties", {}) if isinstance(schema, dict) else {}
-    source_schema = get_schema_block(from_schema) if from_schema else {}
-    source_props = source_schema.get("properties", {}) if isinstance(source_schema, dict) else {}
+    properties, to_required = _schema_view(to_schema)
+    source_props, from_required = _schema_view(from_schema)
     
     added = diff.get("added_fields", [])
     removed = diff.get("removed_fields", [])
     changed = diff.get("changed_fields", [])
     
     if not added and not removed and not changed:
-        lines.append("        # No changes detected")
-        lines.append("        pass")
-        return "\n".join(lines)
+        return "        # No changes detected\n        pass"
     
-    lines.append(f"        coll = self.db['{collection}']")
-    lines.append("")
+    buf = io.StringIO()
+    write = buf.write
+    write(_COLL_HEADER % {"collection": collection})
     
     # Handle added fields
     for field in added:
         field_def = properties.get(field, {})
-        default = field_def.get("default") if isinstance(field_def, dict) else None
+        default = field_def.get("default")
         
         if default is not None:
-            default_repr = json.dumps(default)
-            lines.append(f"        # Add field '{field}' with default value")
-            lines.append(f"        await coll.update_many(")
-            lines.append(f"            {{'{field}': {{'$exists': False}}}},")
-            lines.append(f"            {{'$set': {{'{field}': {default_repr}}}}}")
-            lines.append(f"        )")
-            lines.append("")
+            comment = f"Add field '{field}' with default value"
+            value = _default_repr(default)
         else:
-            bson_type = field_def.get("bsonType", "null") if isinstance(field_def, dict) else "null"
-            default_for_type = _default_for_bson_type(bson_type)
-            lines.append(f"        # Add field '{field}' - TODO: verify default value")
-            lines.append(f"        await coll.update_many(")
-            lines.append(f"            {{'{field}': {{'$exists': False}}}},")
-            lines.append(f"            {{'$set': {{'{field}': {default_for_type}}}}}")
-            lines.append(f"        )")
-            lines.append("")
+            bson_type = field_def.get("bsonType", "null")
+            comment = f"Add field '{field}' - TODO: verify default value"
+            value = _BSON_DEFAULTS.get(bson_type, "None")
+        write(_SET_MISSING_TEMPLATE % {"comment": comment, "field": field, "value": value})
     
     # Handle required field additions
-    to_required = set(schema.get("required", [])) if isinstance(schema, dict) else set()
-    from_required = set(source_schema.get("required", [])) if isinstance(source_schema, dict) else set()
     new_required = sorted(to_required - from_required)
 
     for field in new_required:
-        field_def = properties.get(field, {}) if isinstance(properties.get(field), dict) else {}
-        default = field_def.get("default")
+        default = properties.get(field, {}).get("default")
         if default is not None:
-            default_repr = json.dumps(default)
-            lines.append(f"        # Fill missing required field '{field}' with default")
-            lines.append(f"        await coll.update_many(")
-            lines.append(f"            {{'$or': [{{'{field}': {{'$exists': False}}}}, {{'{field}': None}}]}},")
-            lines.append(f"            {{'$set': {{'{field}': {default_repr}}}}}")
-            lines.append(f"        )")
-            lines.append("")
+            write(_FILL_REQUIRED_TEMPLATE % {"field": field, "value": _default_repr(default)})
         else:
-            lines.append(f"        # Required field '{field}' has no default; manual backfill required")
-            lines.append("")
+            write(_NOTE_TEMPLATE % {"note": f"Required field '{field}' has no default; manual backfill required"})
 
     # Handle nullable -> non-nullable changes
     for field, to_def in properties.items():
-        if field not in source_props:
+        from_def = source_props.get(field)
+        if from_def is None:
             continue
-        from_def = source_props.get(field, {}) if isinstance(source_props.get(field), dict) else {}
         if from_def.get("nullable") is True and to_def.get("nullable") is False:
             default = to_def.get("default")
             if default is not None:
-                default_repr = json.dumps(default)
-                lines.append(f"        # Fill nulls for '{field}' with default")
-                lines.append(f"        await coll.update_many(")
-                lines.append(f"            {{'{field}': None}},")
-                lines.append(f"            {{'$set': {{'{field}': {default_repr}}}}}")
-                lines.append(f"        )")
-                lines.append("")
+                write(_FILL_NULLS_TEMPLATE % {"field": field, "value": _default_repr(default)})
             else:
-                lines.append(f"        # '{field}' is now non-nullable; manual backfill required")
-                lines.append("")
+                write(_NOTE_TEMPLATE % {"note": f"'{field}' is now non-nullable; manual backfill required"})
 
     # Handle type conversions
     for change in changed:
         field = change.get("field", "unknown")
-        from_def = change.get("from", {})
-        to_def = change.get("to", {})
-        from_type = from_def.get("bsonType") if isinstance(from_def, dict) else None
-        to_type = to_def.get("bsonType") if isinstance(to_def, dict) else None
+        from_def = _as_dict(change.get("from"))
+        to_def = _as_dict(change.get("to"))
+        from_type = from_def.get("bsonType")
+        to_type = to_def.get("bsonType")
         
         if not to_type:
             continue
 
-        if _normalize_types(from_def) == _normalize_types(to_def):
+        from_types = _normalize_types(from_def)
+        to_types = _normalize_types(to_def)
+        if from_types == to_types:
             if _array_items_changed(from_def, to_def):
                 continue
-            lines.append(f"        # '{field}' type unchanged; no migration needed")
-            lines.append("")
+            write(_NOTE_TEMPLATE % {"note": f"'{field}' type unchanged; no migration needed"})
             continue
 
         if isinstance(to_type, list):
-            if _normalize_types(from_def).issubset(_normalize_types(to_def)):
-                lines.append(f"        # '{field}' widened to union {to_type}; no data migration needed")
-                lines.append("")
+            if from_types.issubset(to_types):
+                write(_NOTE_TEMPLATE % {"note": f"'{field}' widened to union {to_type}; no data migration needed"})
                 continue
-            lines.append(f"        # '{field}' changed to union {to_type}; manual migration required")
-            lines.append("")
+            write(_NOTE_TEMPLATE % {"note": f"'{field}' changed to union {to_type}; manual migration required"})
             continue
 
         if to_type == "array" and from_type != "array":
-            lines.append(f"        # Wrap '{field}' into array")
-            lines.append(f"        await coll.update_many(")
-            lines.append(f"            {{'{field}': {{'$exists': True}}}},")
-            lines.append(f"            [{{")
-            lines.append(f"                '$set': {{")
-            lines.append(f"                    '{field}': {{")
-            lines.append(f"                        '$cond': [")
-            lines.append(f"                            {{'$isArray': '${field}'}},")
-            lines.append(f"                            '${field}',")
-            lines.append(f"                            ['${field}']")
-            lines.append(f"                        ]")
-            lines.append(f"                    }}")
-            lines.append(f"                }}")
-            lines.append(f"            }}]")
-            lines.append(f"        )")
-            lines.append("")
+            write(_WRAP_TEMPLATE % {"comment": f"Wrap '{field}' into array", "field": field})
             continue
 
         if from_type == "array" and to_type != "array":
-            lines.append(f"        # Unwrap '{field}' from array")
-            lines.append(f"        await coll.update_many(")
-            lines.append(f"            {{'{field}': {{'$exists': True}}}},")
-            lines.append(f"            [{{")
-            lines.append(f"                '$set': {{")
-            lines.append(f"                    '{field}': {{")
-            lines.append(f"                        '$cond': [")
-            lines.append(f"                            {{'$isArray': '${field}'}},")
-            lines.append(f"                            {{'$arrayElemAt': ['${field}', 0]}},")
-            lines.append(f"                            '${field}'")
-            lines.append(f"                        ]")
-            lines.append(f"                    }}")
-            lines.append(f"                }}")
-            lines.append(f"            }}]")
-            lines.append(f"        )")
-            lines.append("")
+            write(_UNWRAP_TEMPLATE % {"comment": f"Unwrap '{field}' from array", "field": field})
             continue
 
         if to_type == "array" and from_type == "array":
             from_item = _get_items_bson_type(from_def)
             to_item = _get_items_bson_type(to_def)
             if from_item and to_item and from_item != to_item and isinstance(to_item, str):
-                mongo_type = _bson_to_mongo_convert_type(to_item)
-                lines.append(f"        # Convert '{field}' array items to {to_item}")
-                lines.append(f"        await coll.update_many(")
-                lines.append(f"            {{'{field}': {{'$exists': True}}}},")
-                lines.append(f"            [{{")
-                lines.append(f"                '$set': {{")
-                lines.append(f"                    '{field}': {{")
-                lines.append(f"                        '$cond': [")
-                lines.append(f"                            {{'$isArray': '${field}'}},")
-                lines.append(f"                            {{'$map': {{")
-                lines.append(f"                                'input': '${field}',")
-                lines.append(f"                                'as': 'item',")
-                lines.append(f"                                'in': {{")
-                lines.append(
-                    f"                                    '$convert': {{'input': '$$item', 'to': '{mongo_type}', 'onError': '$$item', 'onNull': None}}"
-                )
-                lines.append(f"                                }}")
-                lines.append("                            }},")
-                lines.append(f"                            '${field}'")
-                lines.append(f"                        ]")
-                lines.append(f"                    }}")
-                lines.append(f"                }}")
-                lines.append(f"            }}]")
-                lines.append(f"        )")
-                lines.append("")
+                write(_CONVERT_ITEMS_TEMPLATE % {
+                    "field": field,
+                    "to_item": to_item,
+                    "mongo_type": _BSON_CONVERT_TYPES.get(to_item, "string"),
+                })
                 continue
 
-        mongo_type = _bson_to_mongo_convert_type(to_type)
-        lines.append(f"        # Convert '{field}' to {to_type}")
-        lines.append(f"        await coll.update_many(")
-        lines.append(f"            {{'{field}': {{'$exists': True}}}},")
-        lines.append(f"            [{{")
-        lines.append(f"                '$set': {{")
-        lines.append(f"                    '{field}': {{")
-        lines.append(f"                        '$convert': {{")
-        lines.append(f"                            'input': '${field}',")
-        lines.append(f"                            'to': '{mongo_type}',")
-        lines.append(f"                            'onError': '${field}',")
-        lines.append(f"                            'onNull': None")
-        lines.append(f"                        }}")
-        lines.append(f"                    }}")
-        lines.append(f"                }}")
-        lines.append(f"            }}]")
-        lines.append(f"        )")
-        lines.append("")
+        write(_CONVERT_TEMPLATE % {
+            "comment": f"Convert '{field}' to {to_type}",
+            "field": field,
+            "mongo_type": _BSON_CONVERT_TYPES.get(to_type, "string"),
+        })
     
     # Handle removed fields (commented out for safety)
     for field in removed:
-        lines.append(f"        # Uncomment to remove field '{field}' (DESTRUCTIVE)")
-        lines.append(f"        # await coll.update_many(")
-        lines.append(f"        #     {{'{field}': {{'$exists': True}}}},")
-        lines.append(f"        #     {{'$unset': {{'{field}': ''}}}}")
-        lines.append(f"        # )")
-        lines.append("")
+        write(_REMOVE_COMMENTED_TEMPLATE % {"field": field})
     
-    return "\n".join(lines)
+    return _finish(buf)
 
 
 def _generate_down_code(diff: Dict[str, Any], from_schema: Dict[str, Any], collection: str) -> str:
     """Generate the down() method code (rollback) based on schema diff."""
-    lines: List[str] = []
-    schema = get_schema_block(from_schema)
-    properties = schema.get("properties", {}) if isinstance(schema, dict) else {}
-    
     added = diff.get("added_fields", [])
     removed = diff.get("removed_fields", [])
     changed = diff.get("changed_fields", [])
     
     if not added and not removed and not changed:
-        lines.append("        # No changes to rollback")
-        lines.append("        pass")
-        return "\n".join(lines)
+        return "        # No changes to rollback\n        pass"
     
-    lines.append(f"        coll = self.db['{collection}']")
-    lines.append("")
+    buf = io.StringIO()
+    write = buf.write
+    write(_COLL_HEADER % {"collection": collection})
     
     # Reverse: remove added fields
     for field in added:
-        lines.append(f"        # Remove field '{field}' (was added in up)")
-        lines.append(f"        await coll.update_many(")
-        lines.append(f"            {{'{field}': {{'$exists': True}}}},")
-        lines.append(f"            {{'$unset': {{'{field}': ''}}}}")
-        lines.append(f"        )")
-        lines.append("")
+        write(_UNSET_TEMPLATE % {"field": field})
     
     # Reverse: restore removed fields (commented - needs manual data)
     for field in removed:
-        lines.append(f"        # Restore field '{field}' - requires backup data")
-        lines.append(f"        # TODO: Implement data restoration for '{field}'")
-        lines.append(f"        pass")
-        lines.append("")
+        write(_RESTORE_TEMPLATE % {"field": field})
     
     # Reverse: convert types back
     for change in changed:
         field = change.get("field", "unknown")
-        from_def = change.get("from", {})
-        from_type = from_def.get("bsonType") if isinstance(from_def, dict) else None
-        to_def = change.get("to", {})
-        to_type = to_def.get("bsonType") if isinstance(to_def, dict) else None
+        from_def = _as_dict(change.get("from"))
+        from_type = from_def.get("bsonType")
+        to_def = _as_dict(change.get("to"))
+        to_type = to_def.get("bsonType")
         
         if not from_type:
             continue
@@ -275,123 +433,49 @@ def _generate_down_code(diff: Dict[str, Any], from_schema: Dict[str, Any], colle
         if _normalize_types(from_def) == _normalize_types(to_def):
             if _array_items_changed(from_def, to_def):
                 continue
-            lines.append(f"        # '{field}' type unchanged; no rollback needed")
-            lines.append("")
+            write(_NOTE_TEMPLATE % {"note": f"'{field}' type unchanged; no rollback needed"})
             continue
 
         if isinstance(from_type, list):
-            lines.append(f"        # '{field}' reverted to union {from_type}; manual rollback required")
-            lines.append("")
+            write(_NOTE_TEMPLATE % {"note": f"'{field}' reverted to union {from_type}; manual rollback required"})
             continue
 
         if from_type == "array" and to_type != "array":
-            lines.append(f"        # Wrap '{field}' into array (rollback)")
-            lines.append(f"        await coll.update_many(")
-            lines.append(f"            {{'{field}': {{'$exists': True}}}},")
-            lines.append(f"            [{{")
-            lines.append(f"                '$set': {{")
-            lines.append(f"                    '{field}': {{")
-            lines.append(f"                        '$cond': [")
-            lines.append(f"                            {{'$isArray': '${field}'}},")
-            lines.append(f"                            '${field}',")
-            lines.append(f"                            ['${field}']")
-            lines.append(f"                        ]")
-            lines.append(f"                    }}")
-            lines.append(f"                }}")
-            lines.append(f"            }}]")
-            lines.append(f"        )")
-            lines.append("")
+            write(_WRAP_TEMPLATE % {"comment": f"Wrap '{field}' into array (rollback)", "field": field})
             continue
 
         if from_type != "array" and to_type == "array":
-            lines.append(f"        # Unwrap '{field}' from array (rollback)")
-            lines.append(f"        await coll.update_many(")
-            lines.append(f"            {{'{field}': {{'$exists': True}}}},")
-            lines.append(f"            [{{")
-            lines.append(f"                '$set': {{")
-            lines.append(f"                    '{field}': {{")
-            lines.append(f"                        '$cond': [")
-            lines.append(f"                            {{'$isArray': '${field}'}},")
-            lines.append(f"                            {{'$arrayElemAt': ['${field}', 0]}},")
-            lines.append(f"                            '${field}'")
-            lines.append(f"                        ]")
-            lines.append(f"                    }}")
-            lines.append(f"                }}")
-            lines.append(f"            }}]")
-            lines.append(f"        )")
-            lines.append("")
+            write(_UNWRAP_TEMPLATE % {"comment": f"Unwrap '{field}' from array (rollback)", "field": field})
             continue
 
-        mongo_type = _bson_to_mongo_convert_type(from_type)
-        lines.append(f"        # Revert '{field}' to {from_type}")
-        lines.append(f"        await coll.update_many(")
-        lines.append(f"            {{'{field}': {{'$exists': True}}}},")
-        lines.append(f"            [{{")
-        lines.append(f"                '$set': {{")
-        lines.append(f"                    '{field}': {{")
-        lines.append(f"                        '$convert': {{")
-        lines.append(f"                            'input': '${field}',")
-        lines.append(f"                            'to': '{mongo_type}',")
-        lines.append(f"                            'onError': '${field}',")
-        lines.append(f"                            'onNull': None")
-        lines.append(f"                        }}")
-        lines.append(f"                    }}")
-        lines.append(f"                }}")
-        lines.append(f"            }}]")
-        lines.append(f"        )")
-        lines.append("")
+        write(_CONVERT_TEMPLATE % {
+            "comment": f"Revert '{field}' to {from_type}",
+            "field": field,
+            "mongo_type": _BSON_CONVERT_TYPES.get(from_type, "string"),
+        })
     
-    return "\n".join(lines)
+    return _finish(buf)
 
 
-def _default_for_bson_type(bson_type: str) -> str:
-    """Return a Python repr of a sensible default for a BSON type."""
-    defaults = {
-        "string": '""',
-        "int": "0",
-        "double": "0.0",
-        "bool": "False",
-        "array": "[]",
-        "object": "{}",
-        "date": "datetime.utcnow()",
-        "null": "None",
-    }
-    return defaults.get(bson_type, "None")
-
-
-def _bson_to_mongo_convert_type(bson_type: str) -> str:
-    """Map BSON type names to MongoDB $convert type values."""
-    mapping = {
-        "string": "string",
-        "int": "int",
-        "double": "double",
-        "bool": "bool",
-        "objectId": "objectId",
-        "date": "date",
-        "long": "long",
-        "decimal": "decimal",
-    }
-    return mapping.get(bson_type, "string")
-
-
-def _normalize_types(definition: Dict[str, Any]) -> Set[str]:
+def _normalize_types(definition: Dict[str, Any]) -> FrozenSet[str]:
     if not isinstance(definition, dict):
-        return set()
+        return _NO_TYPES
     bson_type = definition.get("bsonType")
     if isinstance(bson_type, list):
-        return {t for t in bson_type if isinstance(t, str)}
+        # Sorted so unions listed in any order share one cache entry.
+        return _type_set(tuple(sorted(t for t in bson_type if isinstance(t, str))))
     if isinstance(bson_type, str):
-        return {bson_type}
-    return set()
+        return _type_set((bson_type,))
+    return _NO_TYPES
+
+
+@functools.lru_cache(maxsize=512)
+def _type_set(bson_types: Tuple[str, ...]) -> FrozenSet[str]:
+    return frozenset(bson_types)
 
 
 def _get_items_bson_type(field_def: Dict[str, Any]) -> Any:
-    if not isinstance(field_def, dict):
-        return None
-    items = field_def.get("items")
-    if isinstance(items, dict):
-        return items.get("bsonType")
-    return None
+    return _as_dict(_as_dict(field_def).get("items")).get("bsonType")
 
 
 def generate_migration_file(
@@ -399,6 +483,7 @@ def generate_migration_file(
     to_schema: Dict[str, Any],
     collection: str,
     out_path: Path,
+    diff: Optional[Dict[str, Any]] = None,
 ) -> Path:
     """Generate an executable migration file from schema diff.
     
@@ -407,12 +492,15 @@ def generate_migration_file(
         to_schema: Target schema (desired state).
         collection: Name of the MongoDB collection.
         out_path: Path to write the migration file.
+        diff: Precomputed ``diff_schemas(from_schema, to_schema)``, for
+            callers that already diffed the pair.
         
     Returns:
         Path to the generated migration file.
     """
-    diff = diff_schemas(from_schema, to_schema)
-    generated_at = datetime.utcnow().isoformat()
+    if diff is None:
+        diff = diff_schemas(from_schema, to_schema)
+    generated_at = datetime.now(timezone.utc).isoformat()
     
     up_code = _generate_up_code(diff, to_schema, collection, from_schema)
     down_code = _generate_down_code(diff, from_schema, collection)
@@ -426,60 +514,48 @@ def generate_migration_file(
         "changed_fields": [c.get("field") for c in diff.get("changed_fields", [])],
     }
 
-    content = f'''"""
-Migration: {collection} schema change
-Generated at: {generated_at}
-
-Summary:
-  Added fields: {len(diff.get("added_fields", []))}
-  Removed fields: {len(diff.get("removed_fields", []))}
-  Changed fields: {len(diff.get("changed_fields", []))}
-
-Usage:
-    from motor.motor_asyncio import AsyncIOMotorClient
-    
-    client = AsyncIOMotorClient("mongodb://localhost:27017")
-    migration = Migration(client, "your_database")
-    await migration.up()  # Apply migration
-    await migration.down()  # Rollback (if needed)
-"""
-
-from datetime import datetime
-from motor.motor_asyncio import AsyncIOMotorClient
-
-
-class Migration:
-    """Schema migration for {collection} collection."""
-    
-    def __init__(self, client: AsyncIOMotorClient, database: str):
-        self.client = client
-        self.db = client[database]
-
-    async def up(self):
-        \"\"\"Apply the forward migration.\"\"\"
-{up_code}
-
-    async def down(self):
-        \"\"\"Rollback the migration.\"\"\"
-{down_code}
-
-
-__metadata__ = {repr(meta)}
-'''
+    content = _MIGRATION_TEMPLATE % {
+        "collection": collection,
+        "generated_at": generated_at,
+        "n_added": len(meta["added_fields"]),
+        "n_removed": len(meta["removed_fields"]),
+        "n_changed": len(meta["changed_fields"]),
+        "up_code": up_code,
+        "down_code": down_code,
+        "meta": meta,
+    }
 
     out_path.parent.mkdir(parents=True, exist_ok=True)
-    out_path.write_text(content)
+    _write_atomic(out_path, content.encode("utf-8"))
     return out_path
 
 
-def generate_migration_plan(from_schema: Dict[str, Any], to_schema: Dict[str, Any]) -> Dict[str, Any]:
-    diff = diff_schemas(from_schema, to_schema)
-    source_schema = get_schema_block(from_schema)
-    target_schema = get_schema_block(to_schema)
-    source_props = source_schema.get("properties", {}) if isinstance(source_schema, dict) else {}
-    target_props = target_schema.get("properties", {}) if isinstance(target_schema, dict) else {}
-    source_required = set(source_schema.get("required", [])) if isinstance(source_schema, dict) else set()
-    target_required = set(target_schema.get("required", [])) if isinstance(target_schema, dict) else set()
+def _write_atomic(path: Path, data: bytes) -> None:
+    """Write data to a sibling temp file, then rename it over path.
+
+    Readers never see a half-written migration, and the per-process temp name
+    keeps parallel db migrate workers from clobbering each other.
+    """
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+def generate_migration_plan(
+    from_schema: Dict[str, Any],
+    to_schema: Dict[str, Any],
+    diff: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    if diff is None:
+        diff = diff_schemas(from_schema, to_schema)
+    source_props, source_required = _schema_view(from_schema)
+    target_props, target_required = _schema_view(to_schema)
     steps = []
     for field in diff.get("added_fields", []):
         steps.append({"action": "add_field", "field": field, "details": {}})
@@ -487,8 +563,8 @@ def generate_migration_plan(from_schema: Dict[str, Any], to_schema: Dict[str, An
         steps.append({"action": "remove_field", "field": field, "details": {}})
     for change in diff.get("changed_fields", []):
         field = change["field"]
-        from_def = change.get("from", {}) if isinstance(change.get("from"), dict) else {}
-        to_def = change.get("to", {}) if isinstance(change.get("to"), dict) else {}
+        from_def = _as_dict(change.get("from"))
+        to_def = _as_dict(change.get("to"))
         from_types = _normalize_types(from_def)
         to_types = _normalize_types(to_def)
 
@@ -519,36 +595,39 @@ def generate_migration_plan(from_schema: Dict[str, Any], to_schema: Dict[str, An
 
         steps.append({"action": "review_type_change", "field": field, "details": {"from": from_def, "to": to_def}})
 
-    existing = {step.get("field") for step in steps}
+    # One walk over the target finds item-type and nullability changes; their
+    # steps are still emitted after the required-field steps, in that order.
+    existing = {step["field"] for step in steps}
+    item_steps: List[Dict[str, Any]] = []
+    null_steps: List[Dict[str, Any]] = []
     for field, to_def in target_props.items():
-        if field in existing:
+        source_def = source_props.get(field)
+        if source_def is None:
+            # New fields have no items or nullability to compare against.
             continue
-        from_def = source_props.get(field, {}) if isinstance(source_props.get(field), dict) else {}
-        if _array_items_changed(from_def, to_def):
-            steps.append({
+        if field not in existing and _array_items_changed(source_def, to_def):
+            item_steps.append({
                 "action": "convert_array_items",
                 "field": field,
-                "details": {"from": from_def, "to": to_def},
+                "details": {"from": source_def, "to": to_def},
             })
+        if source_def.get("nullable") is True and to_def.get("nullable") is False:
+            default = to_def.get("default")
+            if default is not None:
+                null_steps.append({"action": "fill_nulls", "field": field, "details": {"default": default}})
+            else:
+                null_steps.append({"action": "review_nulls", "field": field, "details": {}})
+    steps.extend(item_steps)
 
     # Required fields added
     for field in sorted(target_required - source_required):
-        field_def = target_props.get(field, {}) if isinstance(target_props.get(field), dict) else {}
-        if field_def.get("default") is not None:
-            steps.append({"action": "fill_missing", "field": field, "details": {"default": field_def.get("default")}})
+        default = target_props.get(field, {}).get("default")
+        if default is not None:
+            steps.append({"action": "fill_missing", "field": field, "details": {"default": default}})
         else:
             steps.append({"action": "review_required", "field": field, "details": {}})
 
-    # Nullable -> non-nullable changes
-    for field, to_def in target_props.items():
-        if not isinstance(to_def, dict):
-            continue
-        from_def = source_props.get(field, {}) if isinstance(source_props.get(field), dict) else {}
-        if from_def.get("nullable") is True and to_def.get("nullable") is False:
-            if to_def.get("default") is not None:
-                steps.append({"action": "fill_nulls", "field": field, "details": {"default": to_def.get("default")}})
-            else:
-                steps.append({"action": "review_nulls", "field": field, "details": {}})
+    steps.extend(null_steps)
     return {
         "strategy": "eager",
         "batch_size": 1000,
@@ -567,241 +646,306 @@ async def apply_migration_plan(
     dry_run: bool = False,
     rate_limit_ms: int = 0,
     resume_from: Any = None,
+    concurrent_steps: bool = False,
+    fuse_steps: bool = False,
 ) -> Dict[str, Any]:
+    """Apply a migration plan's steps to a collection.
+
+    With ``concurrent_steps``, steps that touch disjoint fields run
+    concurrently; steps sharing a field, a parent path or a rename's target
+    still run in plan order. Results are always reported in plan order.
+
+    With ``fuse_steps``, an unbatched run (no resume point, throttling or dry
+    run) sends every step as one ordered ``bulk_write``. The server reports
+    only a combined count, so fused steps carry ``updated: None`` and the
+    summary holds the total.
+    """
     coll = client[database][collection]
     schema = get_schema_block(to_schema)
-    properties = schema.get("properties", {}) if isinstance(schema, dict) else {}
+    # Drop malformed entries once so each step is a plain lookup.
+    field_defs = _field_defs(schema)
 
     batch_size = int(plan.get("batch_size", 1000))
     summary = {"updated": 0, "skipped": 0, "errors": 0}
-    step_results: List[Dict[str, Any]] = []
 
     if plan.get("strategy") == "lazy":
         return {"summary": summary, "steps": [], "dry_run": dry_run, "strategy": "lazy"}
 
     resume_value = _parse_resume_id(resume_from)
 
+    steps: List[Dict[str, Any]] = []
     for step in plan.get("steps", []):
-        action = step.get("action")
-        field = step.get("field")
-        if not field or not action:
+        if not step.get("field") or not step.get("action"):
             summary["skipped"] += 1
             continue
-
-        if action == "remove_field" and not allow_remove:
-            step_results.append({"action": action, "field": field, "skipped": True})
+        steps.append(step)
+
+    if fuse_steps and resume_value is None and rate_limit_ms <= 0 and not dry_run:
+        fused = _FusedRunner()
+        step_results = [
+            await _execute_step(fused, step, field_defs, allow_remove) for step in steps
+        ]
+        if fused.ops:
+            summary["updated"] += await fused.flush(coll)
+        for result in step_results:
+            if result.get("skipped"):
+                summary["skipped"] += 1
+            else:
+                result["updated"] = None
+        return {"summary": summary, "steps": step_results, "dry_run": dry_run}
+
+    runner = _StepRunner(coll, batch_size, dry_run, rate_limit_ms, resume_value)
+
+    async def _run_chain(chain: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return [await _execute_step(runner, step, field_defs, allow_remove) for step in chain]
+
+    if concurrent_steps:
+        chains = _group_steps_by_field(steps)
+        chain_results = await asyncio.gather(*(_run_chain([steps[i] for i in chain]) for chain in chains))
+        ordered: Dict[int, Dict[str, Any]] = {}
+        for chain, results in zip(chains, chain_results):
+            ordered.update(zip(chain, results))
+        step_results = [ordered[i] for i in range(len(steps))]
+    else:
+        step_results = await _run_chain(steps)
+
+    for result in step_results:
+        if result.get("skipped"):
             summary["skipped"] += 1
-            continue
+        else:
+            summary["updated"] += result["updated"]
 
-        if action == "add_field":
-            default = _get_default(properties, field)
-            if default is None:
-                step_results.append({"action": action, "field": field, "skipped": True})
-                summary["skipped"] += 1
-                continue
-            updated, last_id = await _batched_update(
-                coll,
-                {field: {"$exists": False}},
-                {"$set": {field: default}},
-                batch_size,
-                dry_run,
-                rate_limit_ms,
-                resume_value,
-            )
-            step_results.append(
-                {"action": action, "field": field, "updated": updated, "last_id": last_id}
-            )
-            summary["updated"] += updated
-            continue
+    return {"summary": summary, "steps": step_results, "dry_run": dry_run}
 
-        if action == "fill_missing":
-            default = _get_default_value(properties, field)
-            if default is None:
-                step_results.append({"action": action, "field": field, "skipped": True})
-                summary["skipped"] += 1
-                continue
-            updated, last_id = await _batched_update(
-                coll,
-                {"$or": [{field: {"$exists": False}}, {field: None}]},
-                {"$set": {field: default}},
-                batch_size,
-                dry_run,
-                rate_limit_ms,
-                resume_value,
-            )
-            step_results.append({"action": action, "field": field, "updated": updated, "last_id": last_id})
-            summary["updated"] += updated
-            continue
 
-        if action == "fill_nulls":
-            default = _get_default_value(properties, field)
-            if default is None:
-                step_results.append({"action": action, "field": field, "skipped": True})
-                summary["skipped"] += 1
-                continue
-            updated, last_id = await _batched_update(
-                coll,
-                {field: None},
-                {"$set": {field: default}},
-                batch_size,
-                dry_run,
-                rate_limit_ms,
-                resume_value,
-            )
-            step_results.append({"action": action, "field": field, "updated": updated, "last_id": last_id})
-            summary["updated"] += updated
-            continue
+def _group_steps_by_field(steps: List[Dict[str, Any]]) -> List[List[int]]:
+    """Partition step indexes into ordered chains that share no field names.
 
-        if action == "remove_field":
-            updated, last_id = await _batched_update(
-                coll,
-                {field: {"$exists": True}},
-                {"$unset": {field: ""}},
-                batch_size,
-                dry_run,
-                rate_limit_ms,
-                resume_value,
-            )
-            step_results.append(
-                {"action": action, "field": field, "updated": updated, "last_id": last_id}
-            )
-            summary["updated"] += updated
-            continue
+    Fields overlap when they share a top-level segment; a rename also claims
+    its target name.
+    """
+    groups: Dict[int, List[int]] = {}
+    owner: Dict[str, int] = {}
+    for index, step in enumerate(steps):
+        names = _step_names(step)
+        gids = sorted({owner[name] for name in names if name in owner})
+        gid = gids[0] if gids else index
+        members = groups.setdefault(gid, [])
+        for other in gids[1:]:
+            merged = groups.pop(other)
+            members.extend(merged)
+            for member in merged:
+                for name in _step_names(steps[member]):
+                    owner[name] = gid
+        members.append(index)
+        members.sort()
+        for name in names:
+            owner[name] = gid
+    return list(groups.values())
+
+
+def _step_names(step: Dict[str, Any]) -> List[str]:
+    # Keyed by top-level segment so a parent and its dotted children
+    # ("address", "address.city") always share a chain.
+    names = [step["field"].split(".", 1)[0]]
+    if step.get("action") == "rename_field":
+        new_name = _as_dict(step.get("details")).get("to")
+        if new_name:
+            names.append(new_name.split(".", 1)[0])
+    return names
+
+
+class _Runner(Protocol):
+    """What a step handler needs to issue its update."""
+
+    async def update(self, query: Dict[str, Any], update: Any) -> tuple[int, Any]: ...
+
+    async def convert(self, field: str, to_type: str) -> tuple[int, Any]: ...
+
+
+class _StepRunner:
+    """Runs a step's update with the plan's batching and resume settings."""
+
+    __slots__ = ("coll", "batch_size", "dry_run", "rate_limit_ms", "resume_value")
+
+    def __init__(
+        self, coll, batch_size: int, dry_run: bool, rate_limit_ms: int, resume_value: Any
+    ) -> None:
+        self.coll = coll
+        self.batch_size = batch_size
+        self.dry_run = dry_run
+        self.rate_limit_ms = rate_limit_ms
+        self.resume_value = resume_value
+
+    async def update(self, query: Dict[str, Any], update: Any) -> tuple[int, Any]:
+        return await _batched_update(
+            self.coll,
+            query,
+            update,
+            self.batch_size,
+            self.dry_run,
+            self.rate_limit_ms,
+            self.resume_value,
+        )
 
-        if action == "convert_type":
-            to_type = _get_bson_type(properties, field)
-            to_type = _primary_bson_type(to_type)
-            if not to_type:
-                step_results.append({"action": action, "field": field, "skipped": True})
-                summary["skipped"] += 1
-                continue
-            if to_type == "null":
-                updated, last_id = await _batched_update(
-                    coll,
-                    {field: {"$exists": True}},
-                    {"$set": {field: None}},
-                    batch_size,
-                    dry_run,
-                    rate_limit_ms,
-                    resume_value,
-                )
-                step_results.append(
-                    {"action": action, "field": field, "updated": updated, "last_id": last_id}
-                )
-                summary["updated"] += updated
-                continue
-            updated, last_id = await _batched_convert(
-                coll,
-                field,
-                to_type,
-                batch_size,
-                dry_run,
-                rate_limit_ms,
-                resume_value,
-            )
-            step_results.append(
-                {"action": action, "field": field, "updated": updated, "last_id": last_id}
-            )
-            summary["updated"] += updated
-            continue
+    async def convert(self, field: str, to_type: str) -> tuple[int, Any]:
+        return await _batched_convert(
+            self.coll,
+            field,
+            to_type,
+            self.batch_size,
+            self.dry_run,
+            self.rate_limit_ms,
+            self.resume_value,
+        )
 
-        if action == "wrap_in_array":
-            updated, last_id = await _batched_update(
-                coll,
-                {field: {"$exists": True}},
-                _wrap_in_array_pipeline(field),
-                batch_size,
-                dry_run,
-                rate_limit_ms,
-                resume_value,
-            )
-            step_results.append(
-                {"action": action, "field": field, "updated": updated, "last_id": last_id}
-            )
-            summary["updated"] += updated
-            continue
 
-        if action == "unwrap_array":
-            updated, last_id = await _batched_update(
-                coll,
-                {field: {"$exists": True}},
-                _unwrap_array_pipeline(field),
-                batch_size,
-                dry_run,
-                rate_limit_ms,
-                resume_value,
-            )
-            step_results.append(
-                {"action": action, "field": field, "updated": updated, "last_id": last_id}
-            )
-            summary["updated"] += updated
-            continue
+class _FusedRunner:
+    """Collects each step's update so the whole plan goes out in one bulk_write."""
 
-        if action == "convert_array_items":
-            to_item = _primary_bson_type(_get_items_bson_type(properties.get(field, {})))
-            if not to_item:
-                step_results.append({"action": action, "field": field, "skipped": True})
-                summary["skipped"] += 1
-                continue
-            updated, last_id = await _batched_update(
-                coll,
-                {field: {"$exists": True}},
-                _array_items_convert_pipeline(field, to_item),
-                batch_size,
-                dry_run,
-                rate_limit_ms,
-                resume_value,
-            )
-            step_results.append(
-                {"action": action, "field": field, "updated": updated, "last_id": last_id}
-            )
-            summary["updated"] += updated
-            continue
+    __slots__ = ("ops",)
 
-        if action == "rename_field":
-            new_name = step.get("details", {}).get("to")
-            if not new_name:
-                step_results.append({"action": action, "field": field, "skipped": True})
-                summary["skipped"] += 1
-                continue
-            updated, last_id = await _batched_update(
-                coll,
-                {field: {"$exists": True}},
-                {"$rename": {field: new_name}},
-                batch_size,
-                dry_run,
-                rate_limit_ms,
-                resume_value,
-            )
-            step_results.append(
-                {"action": action, "field": field, "updated": updated, "last_id": last_id}
-            )
-            summary["updated"] += updated
-            continue
+    def __init__(self) -> None:
+        self.ops: List[Tuple[Dict[str, Any], Any]] = []
 
-        if action in {"expand_type", "review_type_change", "review_required", "review_nulls"}:
-            step_results.append({"action": action, "field": field, "skipped": True})
-            summary["skipped"] += 1
-            continue
+    async def update(self, query: Dict[str, Any], update: Any) -> tuple[int, Any]:
+        self.ops.append((query, update))
+        return 0, None
 
-        step_results.append({"action": action, "field": field, "skipped": True})
-        summary["skipped"] += 1
+    async def convert(self, field: str, to_type: str) -> tuple[int, Any]:
+        return await self.update({field: {"$exists": True}}, _convert_pipeline(field, to_type))
 
-    return {"summary": summary, "steps": step_results, "dry_run": dry_run}
+    async def flush(self, coll) -> int:
+        from pymongo import UpdateMany
+
+        # Ordered, so steps on the same field still apply in plan order.
+        result = await coll.bulk_write(
+            [UpdateMany(query, update) for query, update in self.ops], ordered=True
+        )
+        return result.matched_count
 
 
-def _get_default(properties: Dict[str, Any], field: str) -> Any:
-    field_def = properties.get(field)
-    if isinstance(field_def, dict):
-        return field_def.get("default")
-    return None
+# Each handler returns (updated, last_id), or None when the step is skipped.
+StepOutcome = Optional[Tuple[int, Any]]
 
-def _get_default_value(properties: Dict[str, Any], field: str) -> Any:
-    field_def = properties.get(field)
-    if isinstance(field_def, dict) and field_def.get("default") is not None:
-        return field_def.get("default")
-    bson_type = _get_bson_type(properties, field)
-    bson_type = _primary_bson_type(bson_type)
+
+async def _add_field(
+    runner: _Runner, field: str, field_def: Dict[str, Any], step: Dict[str, Any]
+) -> StepOutcome:
+    default = field_def.get("default")
+    if default is None:
+        return None
+    return await runner.update({field: {"$exists": False}}, {"$set": {field: default}})
+
+
+async def _fill_missing(
+    runner: _Runner, field: str, field_def: Dict[str, Any], step: Dict[str, Any]
+) -> StepOutcome:
+    default = _get_default_value(field_def)
+    if default is None:
+        return None
+    query = {"$or": [{field: {"$exists": False}}, {field: None}]}
+    return await runner.update(query, {"$set": {field: default}})
+
+
+async def _fill_nulls(
+    runner: _Runner, field: str, field_def: Dict[str, Any], step: Dict[str, Any]
+) -> StepOutcome:
+    default = _get_default_value(field_def)
+    if default is None:
+        return None
+    return await runner.update({field: None}, {"$set": {field: default}})
+
+
+async def _remove_field(
+    runner: _Runner, field: str, field_def: Dict[str, Any], step: Dict[str, Any]
+) -> StepOutcome:
+    return await runner.update({field: {"$exists": True}}, {"$unset": {field: ""}})
+
+
+async def _convert_type(
+    runner: _Runner, field: str, field_def: Dict[str, Any], step: Dict[str, Any]
+) -> StepOutcome:
+    to_type = _primary_bson_type(field_def.get("bsonType"))
+    if not to_type:
+        return None
+    if to_type == "null":
+        return await runner.update({field: {"$exists": True}}, {"$set": {field: None}})
+    return await runner.convert(field, to_type)
+
+
+async def _wrap_in_array(
+    runner: _Runner, field: str, field_def: Dict[str, Any], step: Dict[str, Any]
+) -> StepOutcome:
+    return await runner.update({field: {"$exists": True}}, _wrap_in_array_pipeline(field))
+
+
+async def _unwrap_array(
+    runner: _Runner, field: str, field_def: Dict[str, Any], step: Dict[str, Any]
+) -> StepOutcome:
+    return await runner.update({field: {"$exists": True}}, _unwrap_array_pipeline(field))
+
+
+async def _convert_array_items(
+    runner: _Runner, field: str, field_def: Dict[str, Any], step: Dict[str, Any]
+) -> StepOutcome:
+    to_item = _primary_bson_type(_get_items_bson_type(field_def))
+    if not to_item:
+        return None
+    pipeline = _array_items_convert_pipeline(field, to_item)
+    return await runner.update({field: {"$exists": True}}, pipeline)
+
+
+async def _rename_field(
+    runner: _Runner, field: str, field_def: Dict[str, Any], step: Dict[str, Any]
+) -> StepOutcome:
+    new_name = step.get("details", {}).get("to")
+    if not new_name:
+        return None
+    return await runner.update({field: {"$exists": True}}, {"$rename": {field: new_name}})
+
+
+# expand_type and the review_* actions are advisory and have no handler.
+_STEP_HANDLERS: Dict[
+    str, Callable[[_Runner, str, Dict[str, Any], Dict[str, Any]], Awaitable[StepOutcome]]
+] = {
+    "add_field": _add_field,
+    "fill_missing": _fill_missing,
+    "fill_nulls": _fill_nulls,
+    "remove_field": _remove_field,
+    "convert_type": _convert_type,
+    "wrap_in_array": _wrap_in_array,
+    "unwrap_array": _unwrap_array,
+    "convert_array_items": _convert_array_items,
+    "rename_field": _rename_field,
+}
+
+
+async def _execute_step(
+    runner: _Runner,
+    step: Dict[str, Any],
+    field_defs: Dict[str, Dict[str, Any]],
+    allow_remove: bool,
+) -> Dict[str, Any]:
+    """Run one plan step and return its result entry."""
+    action = step["action"]
+    field = step["field"]
+    handler = _STEP_HANDLERS.get(action)
+    if handler is None or (action == "remove_field" and not allow_remove):
+        return {"action": action, "field": field, "skipped": True}
+
+    outcome = await handler(runner, field, field_defs.get(field, {}), step)
+    if outcome is None:
+        return {"action": action, "field": field, "skipped": True}
+    updated, last_id = outcome
+    return {"action": action, "field": field, "updated": updated, "last_id": last_id}
+
+
+def _get_default_value(field_def: Dict[str, Any]) -> Any:
+    default = field_def.get("default")
+    if default is not None:
+        return default
+    bson_type = _primary_bson_type(field_def.get("bsonType"))
     if not bson_type:
         return None
     return _default_value_for_bson_type(bson_type)
@@ -815,19 +959,12 @@ def _default_value_for_bson_type(bson_type: str) -> Any:
         "bool": False,
         "array": [],
         "object": {},
-        "date": datetime.utcnow(),
+        "date": datetime.now(timezone.utc),
         "null": None,
     }
     return defaults.get(bson_type)
 
 
-def _get_bson_type(properties: Dict[str, Any], field: str) -> Any:
-    field_def = properties.get(field)
-    if isinstance(field_def, dict):
-        return field_def.get("bsonType")
-    return None
-
-
 async def _batched_update(
     coll,
     query: Dict[str, Any],
@@ -837,28 +974,29 @@ async def _batched_update(
     rate_limit_ms: int,
     resume_from: Any = None,
 ) -> tuple[int, Any]:
+    # Without a resume point or throttling there is nothing to checkpoint
+    # between batches, so let the server apply the update in one round trip.
+    if resume_from is None and rate_limit_ms <= 0 and not dry_run:
+        result = await coll.update_many(query, update)
+        return result.matched_count, None
+
     updated = 0
     last_id = None
-    if resume_from is not None:
-        query = {**query, "_id": {"$gt": resume_from}}
-    cursor = coll.find(query, projection=["_id"]).batch_size(batch_size)
-    batch_ids: List[Any] = []
-
-    async for doc in cursor:
-        last_id = doc["_id"]
-        batch_ids.append(doc["_id"])
-        if len(batch_ids) >= batch_size:
-            if not dry_run:
-                await coll.update_many({"_id": {"$in": batch_ids}}, update)
-            updated += len(batch_ids)
-            batch_ids = []
-            if rate_limit_ms > 0:
-                await _sleep_ms(rate_limit_ms)
-
-    if batch_ids:
+    pending: List[List[Any]] = []
+    pages_per_write = 1 if rate_limit_ms > 0 else PAGES_PER_BULK_WRITE
+    async for batch_ids in _id_batches(coll, query, batch_size, resume_from):
+        last_id = batch_ids[-1]
         if not dry_run:
-            await coll.update_many({"_id": {"$in": batch_ids}}, update)
+            pending.append(batch_ids)
+            if len(pending) >= pages_per_write:
+                await _write_pages(coll, pending, update)
+                pending = []
         updated += len(batch_ids)
+        if rate_limit_ms > 0:
+            await _sleep_ms(rate_limit_ms)
+
+    if pending:
+        await _write_pages(coll, pending, update)
 
     return updated, last_id
 
@@ -872,54 +1010,73 @@ async def _batched_convert(
     rate_limit_ms: int,
     resume_from: Any = None,
 ) -> tuple[int, Any]:
-    updated = 0
-    last_id = None
     query = {field: {"$exists": True}}
-    if resume_from is not None:
-        query = {**query, "_id": {"$gt": resume_from}}
-    cursor = coll.find(query, projection=["_id"]).batch_size(batch_size)
-    ops: List[UpdateOne] = []
+    pipeline = _convert_pipeline(field, to_type)
 
-    async for doc in cursor:
-        last_id = doc["_id"]
+    # The pipeline is the same for every document, so without a resume point
+    # or throttling the server can convert the whole collection in one call.
+    if resume_from is None and rate_limit_ms <= 0 and not dry_run:
+        result = await coll.update_many(query, pipeline)
+        return result.modified_count, None
+
+    updated = 0
+    last_id = None
+    pending: List[List[Any]] = []
+    pages_per_write = 1 if rate_limit_ms > 0 else PAGES_PER_BULK_WRITE
+    async for batch_ids in _id_batches(coll, query, batch_size, resume_from):
+        last_id = batch_ids[-1]
         if dry_run:
-            updated += 1
+            updated += len(batch_ids)
             continue
 
-        ops.append(
-            UpdateOne(
-                {"_id": doc["_id"]},
-                [
-                    {
-                        "$set": {
-                            field: {
-                                "$convert": {
-                                    "input": f"${field}",
-                                    "to": to_type,
-                                    "onError": f"${field}",
-                                    "onNull": None,
-                                }
-                            }
-                        }
-                    }
-                ],
-            )
-        )
-
-        if len(ops) >= batch_size:
-            result = await coll.bulk_write(ops, ordered=False)
+        pending.append(batch_ids)
+        if len(pending) >= pages_per_write:
+            result = await _write_pages(coll, pending, pipeline)
             updated += result.modified_count
-            ops = []
-            if rate_limit_ms > 0:
-                await _sleep_ms(rate_limit_ms)
+            pending = []
+        if rate_limit_ms > 0:
+            await _sleep_ms(rate_limit_ms)
 
-    if ops and not dry_run:
-        result = await coll.bulk_write(ops, ordered=False)
+    if pending:
+        result = await _write_pages(coll, pending, pipeline)
         updated += result.modified_count
 
     return updated, last_id
 
 
+async def _write_pages(coll, pages: List[List[Any]], update: Any) -> Any:
+    """Apply update to each page of ids with one unordered bulk write."""
+    from pymongo import UpdateMany
+
+    ops = [UpdateMany({"_id": {"$in": batch_ids}}, update) for batch_ids in pages]
+    return await coll.bulk_write(ops, ordered=False)
+
+
+async def _id_batches(
+    coll,
+    query: Dict[str, Any],
+    batch_size: int,
+    after: Any = None,
+) -> AsyncIterator[List[Any]]:
+    """Yield matching ``_id`` values in ascending pages of at most batch_size.
+
+    Each page is its own short ``_id``-range query instead of one long-lived
+    cursor, so the last id yielded is always a valid resume point.
+    """
+    size = max(batch_size, 1)
+    while True:
+        page_query = query if after is None else {**query, "_id": {"$gt": after}}
+        cursor = coll.find(page_query, projection=["_id"]).sort("_id", 1).limit(size)
+        docs = await cursor.to_list(length=size)
+        if not docs:
+            return
+        batch_ids = [doc["_id"] for doc in docs]
+        yield batch_ids
+        if len(batch_ids) < size:
+            return
+        after = batch_ids[-1]
+
+
 def _primary_bson_type(bson_type: Any) -> str | None:
     if isinstance(bson_type, list):
         for t in bson_type:
@@ -973,8 +1130,25 @@ def _unwrap_array_pipeline(field: str) -> List[Dict[str, Any]]:
     ]
 
 
+def _convert_pipeline(field: str, to_type: str) -> List[Dict[str, Any]]:
+    return [
+        {
+            "$set": {
+                field: {
+                    "$convert": {
+                        "input": f"${field}",
+                        "to": to_type,
+                        "onError": f"${field}",
+                        "onNull": None,
+                    }
+                }
+            }
+        }
+    ]
+
+
 def _array_items_convert_pipeline(field: str, to_item_type: str) -> List[Dict[str, Any]]:
-    mongo_type = _bson_to_mongo_convert_type(to_item_type)
+    mongo_type = _BSON_CONVERT_TYPES.get(to_item_type, "string")
     return [
         {
             "$set": {
@@ -1004,13 +1178,13 @@ def _array_items_convert_pipeline(field: str, to_item_type: str) -> List[Dict[st
 
 
 async def _sleep_ms(ms: int) -> None:
-    import asyncio
-
     await asyncio.sleep(ms / 1000)
 
 
 def _parse_resume_id(value: Any) -> Any:
     if isinstance(value, str):
+        from bson import ObjectId
+
         try:
             return ObjectId(value)
         except Exception:
@@ -3,7 +3,12 @@
 from __future__ import annotations
 
 import json
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
 
 from rich.console import Console
 from rich.json import JSON
@@ -13,10 +18,39 @@ from rich.text import Text
 
 console = Console()
 
+# Reused by the stdlib fallback so compact dumps match orjson's byte layout.
+_COMPACT_SEPARATORS = (",", ":")
+_encode_compact = json.JSONEncoder(separators=_COMPACT_SEPARATORS, ensure_ascii=False).encode
+
+
+def dumps_json(
+    payload: Any,
+    indent: bool = True,
+    default: Optional[Callable[[Any], Any]] = None,
+) -> bytes:
+    """Serialize a payload to UTF-8 JSON bytes, using orjson when available."""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(payload, option=option, default=default)
+    if indent:
+        return json.dumps(payload, indent=2, default=default).encode("utf-8")
+    if default is None:
+        return _encode_compact(payload).encode("utf-8")
+    return json.dumps(
+        payload, separators=_COMPACT_SEPARATORS, ensure_ascii=False, default=default
+    ).encode("utf-8")
+
+
+def loads_json(data: bytes) -> Any:
+    """Parse JSON from raw bytes, using orjson when available."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
 
 def print_json(payload: Dict[str, Any]) -> None:
     """Print a JSON payload with syntax highlighting."""
-    console.print(JSON(json.dumps(payload, indent=2)))
+    console.print(JSON(dumps_json(payload).decode("utf-8")))
 
 
 def print_schema_table(schema: Dict[str, Any]) -> None:
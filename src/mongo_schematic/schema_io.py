@@ -1,18 +1,38 @@
 from __future__ import annotations
 
+import os
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, List
 
 import yaml
 
+# libyaml's C loader parses several times faster than the pure-Python one.
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
 
 def load_schema(path: Path) -> Dict[str, Any]:
-    data = yaml.safe_load(path.read_text())
+    data = yaml.load(path.read_bytes(), Loader=_YAML_LOADER)
     if not data:
         return {}
     return data
 
 
+def list_schema_files(directory: Path) -> List[Path]:
+    """Return the .yml and .yaml files in a directory, sorted, from one scan.
+
+    A missing directory (or a path that is not a directory) has no schemas.
+    """
+    try:
+        with os.scandir(directory) as entries:
+            return sorted(
+                Path(entry.path)
+                for entry in entries
+                if entry.name.endswith((".yml", ".yaml")) and entry.is_file()
+            )
+    except (FileNotFoundError, NotADirectoryError):
+        return []
+
+
 def write_schema(path: Path, payload: Dict[str, Any]) -> Path:
     path.parent.mkdir(parents=True, exist_ok=True)
     path.write_text(yaml.safe_dump(payload, sort_keys=False))
@@ -7,11 +7,31 @@ from decimal import Decimal
 from bson import Binary, Code, DBRef, Int64, MaxKey, MinKey, ObjectId, Regex, Timestamp
 
 
+# Exact-type lookup for the common decoded BSON values. Subclasses (e.g. Int64,
+# bool vs int) are not keys here and fall through to the isinstance cascade.
+_EXACT_TYPES = {
+    str: "string",
+    int: "int",
+    float: "double",
+    bool: "bool",
+    dict: "object",
+    list: "array",
+    datetime: "date",
+    ObjectId: "objectId",
+    type(None): "null",
+}
+
+
 def detect_type(value) -> str:
     """Detect the BSON type of a Python value.
     
     Returns the MongoDB bsonType alias string for the value.
     """
+    # Fast path: most sampled values are plain scalars, dicts or lists.
+    exact = _EXACT_TYPES.get(type(value))
+    if exact is not None:
+        return exact
+
     # Check None first
     if value is None:
         return "null"
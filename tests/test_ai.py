@@ -0,0 +1,305 @@
+"""Tests for Gemini response parsing helpers."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from mongo_schematic import ai
+from mongo_schematic.ai import (
+    _CircuitBreaker,
+    _JsonStreamScanner,
+    _extract_json_from_text,
+    _normalize_recommendations,
+    _parse_json_safe,
+    _retry_api_call,
+    _stream_json_text,
+)
+from mongo_schematic.exceptions import AIError, CircuitBreakerOpenError
+
+
+class TestExtractJsonFromText:
+    """Tests for _extract_json_from_text function."""
+
+    def test_json_fence(self):
+        """Content of a ```json fence should be extracted."""
+        text = 'Here you go:\n```json\n[{"title": "a"}]\n```\nDone.'
+        assert _extract_json_from_text(text) == '[{"title": "a"}]'
+
+    def test_plain_fence(self):
+        """Content of an untagged fence should be extracted."""
+        text = '```\n{"strategy": "eager"}\n```'
+        assert _extract_json_from_text(text) == '{"strategy": "eager"}'
+
+    def test_first_fence_wins(self):
+        """Only the first fenced block should be returned."""
+        text = '```json\n[1]\n```\n```json\n[2]\n```'
+        assert _extract_json_from_text(text) == "[1]"
+
+    def test_bare_json(self):
+        """Bare JSON with surrounding whitespace should be returned stripped."""
+        assert _extract_json_from_text('  {"a": 1}\n') == '{"a": 1}'
+
+    def test_unterminated_fence(self):
+        """An unterminated fence should not yield a result."""
+        assert _extract_json_from_text('```json\n[{"title": "a"}]') is None
+
+    def test_no_json(self):
+        """Prose without JSON should return None."""
+        assert _extract_json_from_text("No recommendations today.") is None
+
+
+class TestParseJsonSafe:
+    """Tests for _parse_json_safe function."""
+
+    def test_valid_json(self):
+        """Valid JSON should parse directly."""
+        assert _parse_json_safe('[{"title": "a"}]', []) == [{"title": "a"}]
+
+    def test_fenced_json(self):
+        """Fenced JSON should parse via extraction."""
+        assert _parse_json_safe('```json\n{"a": 1}\n```', {}) == {"a": 1}
+
+    @pytest.mark.parametrize("text", ["", "not json", "```json\n{broken\n```"])
+    def test_invalid_returns_default(self, text):
+        """Unparseable input should return the default."""
+        assert _parse_json_safe(text, {"default": True}) == {"default": True}
+
+
+class TestNormalizeRecommendations:
+    """Tests for _normalize_recommendations function."""
+
+    def test_fills_defaults(self):
+        """Missing fields should be filled with defaults."""
+        result = _normalize_recommendations([{"title": "Add index"}])
+        assert result == [{
+            "type": "AI_RECOMMENDATION",
+            "title": "Add index",
+            "description": "",
+            "priority": "medium",
+        }]
+
+    def test_drops_invalid_entries(self):
+        """Entries without a title or that are not objects should be dropped."""
+        result = _normalize_recommendations([{"description": "x"}, "text", {"title": "ok"}])
+        assert [r["title"] for r in result] == ["ok"]
+
+    def test_non_list(self):
+        """Non-list input should produce no recommendations."""
+        assert _normalize_recommendations({"title": "x"}) == []
+
+
+@pytest.fixture
+def fresh_breaker(monkeypatch):
+    breaker = _CircuitBreaker(failure_threshold=3, reset_timeout=60)
+    monkeypatch.setattr(ai, "_breaker", breaker)
+    return breaker
+
+
+@pytest.mark.usefixtures("fresh_breaker")
+class TestRetryApiCall:
+    """Tests for _retry_api_call function."""
+
+    def test_retries_until_success(self):
+        """Failed attempts should be retried."""
+        calls = []
+
+        async def flaky():
+            calls.append(1)
+            if len(calls) < 2:
+                raise RuntimeError("boom")
+            return "ok"
+
+        assert asyncio.run(_retry_api_call(flaky, delay=0)) == "ok"
+        assert len(calls) == 2
+
+    def test_timeout_is_retried(self):
+        """A timed-out attempt should be retried like any other failure."""
+        calls = []
+
+        async def slow_then_fast():
+            calls.append(1)
+            if len(calls) == 1:
+                await asyncio.sleep(1)
+            return "ok"
+
+        assert asyncio.run(_retry_api_call(slow_then_fast, delay=0, timeout=0.01)) == "ok"
+        assert len(calls) == 2
+
+    def test_raises_after_exhausting_retries(self):
+        """Timeouts on every attempt should surface as AIError."""
+
+        async def hang():
+            await asyncio.sleep(1)
+
+        with pytest.raises(AIError):
+            asyncio.run(_retry_api_call(hang, max_retries=1, delay=0, timeout=0.01))
+
+
+class TestCircuitBreaker:
+    """Tests for the Gemini circuit breaker."""
+
+    def test_opens_after_threshold(self):
+        """The breaker should open after consecutive failures."""
+        breaker = _CircuitBreaker(failure_threshold=2)
+        breaker.record_failure()
+        assert not breaker.is_open()
+        breaker.record_failure()
+        assert breaker.is_open()
+
+    def test_half_open_after_cooldown(self, monkeypatch):
+        """The breaker should allow a trial call once the cooldown elapses."""
+        now = [0.0]
+        monkeypatch.setattr(ai.time, "monotonic", lambda: now[0])
+        breaker = _CircuitBreaker(failure_threshold=1, reset_timeout=60)
+        breaker.record_failure()
+        assert breaker.is_open()
+        now[0] = 61.0
+        assert not breaker.is_open()
+
+    def test_reset(self):
+        """A reset should close the breaker and clear the failure count."""
+        breaker = _CircuitBreaker(failure_threshold=1)
+        breaker.record_failure()
+        breaker.reset()
+        assert not breaker.is_open()
+        assert breaker.consecutive_failures == 0
+
+    def test_open_breaker_fails_fast(self, fresh_breaker):
+        """Calls should not be attempted while the breaker is open."""
+        calls = []
+
+        async def failing():
+            calls.append(1)
+            raise RuntimeError("down")
+
+        with pytest.raises(RuntimeError):
+            asyncio.run(_retry_api_call(failing, max_retries=2, delay=0))
+        assert fresh_breaker.is_open()
+
+        with pytest.raises(CircuitBreakerOpenError):
+            asyncio.run(_retry_api_call(failing, max_retries=2, delay=0))
+        assert len(calls) == 3
+
+    def test_success_resets_failures(self, fresh_breaker):
+        """A successful call should reset the failure count."""
+        fresh_breaker.record_failure()
+
+        async def ok():
+            return "ok"
+
+        asyncio.run(_retry_api_call(ok))
+        assert fresh_breaker.consecutive_failures == 0
+
+
+class TestJsonStreamScanner:
+    """Tests for _JsonStreamScanner."""
+
+    def _feed_all(self, chunks):
+        scanner = _JsonStreamScanner()
+        for chunk in chunks:
+            result = scanner.feed(chunk)
+            if result is not None:
+                return result
+        return None
+
+    def test_complete_across_chunks(self):
+        """A value split across chunks should be returned once it closes."""
+        assert self._feed_all(['[{"ti', 'tle": "a"}', ', {"title": "b"}]']) == (
+            '[{"title": "a"}, {"title": "b"}]'
+        )
+
+    def test_skips_leading_fence(self):
+        """Text before the first bracket should be ignored."""
+        assert self._feed_all(["```json\n", '{"a": 1}', "\n```"]) == '{"a": 1}'
+
+    def test_brackets_inside_strings(self):
+        """Brackets and escaped quotes inside strings should not affect depth."""
+        text = '[{"title": "use ] and \\" [ here"}]'
+        assert self._feed_all([text[:12], text[12:]]) == text
+
+    def test_incomplete(self):
+        """An unclosed value should not be reported as complete."""
+        assert self._feed_all(['[{"title": "a"}']) is None
+
+    def test_skips_bracketed_prose(self):
+        """A bracketed aside that is not JSON should not end the scan."""
+        chunks = ["Use 3 [or more] indexes", ' like [{"title": "a"}]', " done"]
+        assert self._feed_all(chunks) == '[{"title": "a"}]'
+
+    def test_retries_inside_failed_candidate(self):
+        """JSON nested in an unparseable bracketed span should still be found."""
+        assert self._feed_all(['see (x [1, 2', "] y"]) == "[1, 2]"
+        assert self._feed_all(["{note: [1, 2]}"]) == "[1, 2]"
+
+
+class TestStreamJsonText:
+    """Tests for _stream_json_text function."""
+
+    class _Chunk:
+        def __init__(self, text):
+            self.text = text
+
+    class _Model:
+        def __init__(self, chunks):
+            self.chunks = chunks
+            self.consumed = 0
+            self.generation_config = None
+
+        async def generate_content_async(self, prompt, generation_config=None, stream=False):
+            assert stream is True
+            self.generation_config = generation_config
+            model = self
+
+            async def gen():
+                for text in model.chunks:
+                    model.consumed += 1
+                    yield TestStreamJsonText._Chunk(text)
+
+            return gen()
+
+    def test_stops_when_value_closes(self):
+        """Streaming should stop once the top-level value is complete."""
+        model = self._Model(["[1, ", "2]", " trailing", " text"])
+        assert asyncio.run(_stream_json_text(model, "prompt")) == "[1, 2]"
+        assert model.consumed == 2
+
+    def test_bracketed_prose_before_json(self):
+        """A bracketed aside should not cut the stream short."""
+        model = self._Model(["Use 3 [or more] indexes:", " [1, ", "2]", " trailing"])
+        assert asyncio.run(_stream_json_text(model, "prompt")) == "[1, 2]"
+        assert model.consumed == 3
+
+    def test_falls_back_to_full_text(self):
+        """Without a complete value the whole response should be returned."""
+        model = self._Model(["no ", "json"])
+        assert asyncio.run(_stream_json_text(model, "prompt")) == "no json"
+
+    def test_passes_generation_config(self):
+        """The JSON-mode generation config should be forwarded to the model."""
+        model = self._Model(["[]"])
+        config = ai._RECS_GENERATION_CONFIG
+        asyncio.run(_stream_json_text(model, "prompt", config))
+        assert model.generation_config["response_mime_type"] == "application/json"
+        assert model.generation_config["response_schema"] is ai.RECOMMENDATIONS_SCHEMA
+
+
+class TestGetModel:
+    """Tests for _get_model function."""
+
+    def test_configures_once_per_key(self, monkeypatch):
+        """The Gemini client should be configured once per distinct API key."""
+        import google.generativeai as genai
+
+        configured = []
+        monkeypatch.setattr(genai, "configure", lambda api_key: configured.append(api_key))
+        monkeypatch.setattr(genai, "GenerativeModel", lambda name: object())
+        ai._get_model.cache_clear()
+        try:
+            first = ai._get_model("key-a")
+            assert ai._get_model("key-a") is first
+            ai._get_model("key-b")
+            assert configured == ["key-a", "key-b"]
+        finally:
+            ai._get_model.cache_clear()
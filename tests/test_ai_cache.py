@@ -0,0 +1,72 @@
+"""Tests for the Gemini response cache."""
+
+from __future__ import annotations
+
+import pytest
+
+from mongo_schematic import ai_cache
+from mongo_schematic.ai_cache import MemoryTTLCache, make_cache_key
+
+
+class TestMakeCacheKey:
+    """Tests for make_cache_key function."""
+
+    def test_key_order_independent(self):
+        """Keys should not depend on dict insertion order."""
+        assert make_cache_key({"a": 1, "b": 2}) == make_cache_key({"b": 2, "a": 1})
+
+    def test_different_payloads(self):
+        """Different payloads should produce different keys."""
+        assert make_cache_key({"a": 1}) != make_cache_key({"a": 2})
+
+
+class TestMemoryTTLCache:
+    """Tests for MemoryTTLCache."""
+
+    def test_hit_and_miss_counters(self):
+        """Hits and misses should be counted."""
+        cache = MemoryTTLCache()
+        assert cache.get("k") is None
+        cache.set("k", [1])
+        assert cache.get("k") == [1]
+
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["size"] == 1
+
+    def test_expired_entry(self, monkeypatch):
+        """Entries past their TTL should be treated as misses."""
+        now = [100.0]
+        monkeypatch.setattr(ai_cache.time, "monotonic", lambda: now[0])
+        cache = MemoryTTLCache(default_ttl=10)
+        cache.set("k", "v")
+
+        now[0] = 105.0
+        assert cache.get("k") == "v"
+        now[0] = 111.0
+        assert cache.get("k") is None
+        assert len(cache) == 0
+
+    def test_lru_eviction(self):
+        """Least recently used entries should be evicted when full."""
+        cache = MemoryTTLCache(max_entries=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+        assert cache.evictions == 1
+
+    def test_clear(self):
+        """clear should drop entries and reset counters."""
+        cache = MemoryTTLCache()
+        cache.set("a", 1)
+        cache.get("a")
+        cache.clear()
+
+        assert len(cache) == 0
+        assert cache.stats() == {"hits": 0, "misses": 0, "evictions": 0, "size": 0}
@@ -0,0 +1,372 @@
+"""Tests for schema analysis functionality."""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from mongo_schematic.analyze import (
+    _convergence_snapshot,
+    _has_converged,
+    analyze_collection,
+    _confidence_score,
+    _detect_anomalies,
+    FieldTable,
+    _field_metrics,
+    _generate_schema,
+    _process_document,
+    _table_from_field_groups,
+)
+
+
+class _FakeCursor:
+    def __init__(self, docs):
+        self.docs = list(docs)
+        self.consumed = 0
+        self.closed = False
+
+    def limit(self, n):
+        self.docs = self.docs[:n]
+        return self
+
+    def batch_size(self, n):
+        return self
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self.consumed >= len(self.docs):
+            raise StopAsyncIteration
+        doc = self.docs[self.consumed]
+        self.consumed += 1
+        return doc
+
+    async def close(self):
+        self.closed = True
+
+    async def to_list(self, length=None):
+        return self.docs[:length]
+
+
+class _FakeCollection:
+    def __init__(self, docs):
+        self.docs = docs
+        self.cursor = None
+
+    async def count_documents(self, query):
+        self.counted_exactly = True
+        return len(self.docs)
+
+    async def estimated_document_count(self):
+        self.counted_exactly = False
+        return len(self.docs)
+
+    def find(self, *args, **kwargs):
+        self.cursor = _FakeCursor(self.docs)
+        return self.cursor
+
+    def aggregate(self, pipeline, **kwargs):
+        self.pipeline = pipeline
+        if any("$facet" in stage for stage in pipeline):
+            self.cursor = _FakeCursor([self.facet_result])
+            return self.cursor
+        size = pipeline[0]["$sample"]["size"]
+        self.cursor = _FakeCursor(self.docs[:size])
+        return self.cursor
+
+
+def _fake_client(docs):
+    coll = _FakeCollection(docs)
+    return {"db": {"coll": coll}}, coll
+
+
+def _collect(docs):
+    table = FieldTable()
+    for doc in docs:
+        _process_document(doc, table, prefix="")
+    return table
+
+
+def _field(table, path):
+    i = table.path_to_id[path]
+    return {
+        "count": table.count[i],
+        "null_count": table.null_count[i],
+        "types": dict(table.types[i]),
+        "sample_values": table.sample_values[i],
+    }
+
+
+class TestProcessDocument:
+    """Tests for _process_document function."""
+
+    def test_skips_top_level_id(self):
+        """Top-level _id should not be tracked."""
+        stats = _collect([{"_id": 1, "name": "a"}])
+        assert "_id" not in stats
+        assert _field(stats, "name")["count"] == 1
+
+    def test_counts_types_and_nulls(self):
+        """Type counts and null counts should be tracked per field."""
+        stats = _collect([{"age": 1}, {"age": "2"}, {"age": None}])
+        assert _field(stats, "age")["count"] == 3
+        assert _field(stats, "age")["null_count"] == 1
+        assert _field(stats, "age")["types"] == {"int": 1, "string": 1}
+
+    def test_nested_paths(self):
+        """Nested objects and arrays of objects should produce dotted paths."""
+        stats = _collect([{"address": {"city": "x"}, "tags": [{"k": 1}, {"k": 2}]}])
+        assert _field(stats, "address.city")["count"] == 1
+        assert _field(stats, "tags[].k")["count"] == 2
+
+    def test_mixed_array_objects_walked(self):
+        """Objects in an array should be walked even when the first element is a scalar."""
+        stats = _collect([{"mixed": [1, {"k": 1}]}])
+        assert _field(stats, "mixed[].k")["count"] == 1
+
+    def test_sample_values_deduplicated(self):
+        """Repeated values should only be sampled once."""
+        stats = _collect([{"name": "a"}, {"name": "a"}, {"name": "b"}])
+        assert _field(stats, "name")["sample_values"] == ["a", "b"]
+
+    def test_sample_values_capped(self):
+        """At most five sample values should be kept."""
+        stats = _collect([{"n": i} for i in range(10)])
+        assert len(_field(stats, "n")["sample_values"]) == 5
+
+    def test_unhashable_values_sampled(self):
+        """Object and array values should be sampled and deduplicated by their text."""
+        stats = _collect([{"meta": {"a": 1}}, {"meta": {"a": 1}}, {"items": [1, 2]}])
+        assert _field(stats, "meta")["count"] == 2
+        assert _field(stats, "meta")["sample_values"] == ["{'a': 1}"]
+        assert _field(stats, "items")["sample_values"] == ["[1, 2]"]
+
+    def test_equal_values_of_different_types_sampled(self):
+        """True, 1 and 1.0 should each be kept as a distinct sample."""
+        stats = _collect([{"v": True}, {"v": 1}, {"v": 1.0}, {"v": 1}])
+        assert _field(stats, "v")["sample_values"] == ["True", "1", "1.0"]
+
+    def test_max_depth(self):
+        """Recursion should stop at max_depth."""
+        stats = FieldTable()
+        _process_document({"a": {"b": {"c": 1}}}, stats, prefix="", max_depth=2)
+        assert "a.b" in stats
+        assert "a.b.c" not in stats
+
+
+class TestGenerateSchema:
+    """Tests for _generate_schema function."""
+
+    def test_required_and_nullable(self):
+        """High-presence non-null fields should be required."""
+        stats = _collect([{"name": "a", "nick": None}, {"name": "b"}])
+        schema = _generate_schema(stats, total_docs=2)
+
+        assert schema["properties"]["name"] == {"bsonType": "string", "presence": 1.0, "nullable": False}
+        assert schema["required"] == ["name"]
+        assert "nick" not in schema["properties"]
+
+    def test_union_types_sorted_by_frequency(self):
+        """Mixed types should become a list ordered by frequency."""
+        stats = _collect([{"v": 1}, {"v": 2}, {"v": "x"}])
+        schema = _generate_schema(stats, total_docs=3)
+        assert schema["properties"]["v"]["bsonType"] == ["int", "string"]
+
+    def test_nested_paths_excluded(self):
+        """Only top-level fields should appear in properties."""
+        stats = _collect([{"address": {"city": "x"}}])
+        schema = _generate_schema(stats, total_docs=1)
+        assert list(schema["properties"]) == ["address"]
+
+
+class TestDetectAnomalies:
+    """Tests for _detect_anomalies function."""
+
+    def test_multiple_types(self):
+        """Fields with mixed types should be flagged."""
+        stats = _collect([{"v": 1}, {"v": "x"}])
+        anomalies = _detect_anomalies(stats, total_docs=2)
+        assert {"type": "MULTIPLE_TYPES", "field": "v", "details": {"int": 1, "string": 1}} in anomalies
+
+    def test_low_presence(self):
+        """Rare fields should be flagged."""
+        stats = _collect([{"rare": 1}] + [{"other": 1}] * 29)
+        anomalies = _detect_anomalies(stats, total_docs=30)
+        assert any(a["type"] == "LOW_PRESENCE" and a["field"] == "rare" for a in anomalies)
+
+    def test_high_null_rate(self):
+        """Frequently null fields should be flagged."""
+        stats = _collect([{"v": None}, {"v": None}, {"v": 1}])
+        anomalies = _detect_anomalies(stats, total_docs=3)
+        assert any(a["type"] == "HIGH_NULL_RATE" and a["field"] == "v" for a in anomalies)
+
+
+class TestConfidenceScore:
+    """Tests for _confidence_score function."""
+
+    def test_empty(self):
+        """No stats should give zero confidence."""
+        assert _confidence_score(FieldTable(), 0) == 0.0
+
+    def test_consistent_data(self):
+        """Consistently typed, always-present fields should give full confidence."""
+        stats = _collect([{"name": "a"}, {"name": "b"}])
+        assert _confidence_score(stats, total_docs=2) == pytest.approx(1.0)
+
+
+class TestFieldMetrics:
+    """Tests for _field_metrics function."""
+
+    def test_metrics(self):
+        """Presence, null rate and type share should be computed per field."""
+        stats = _collect([{"v": 1}, {"v": "x"}, {"v": None}, {"w": 1}])
+        metrics = _field_metrics(stats, total_docs=4)
+
+        presence, null_rate, type_share = metrics[stats.path_to_id["v"]]
+        assert presence == pytest.approx(0.75)
+        assert null_rate == pytest.approx(1 / 3)
+        assert type_share == pytest.approx(1 / 3)
+
+    def test_all_null_field(self):
+        """Fields that were only null should have no type share."""
+        stats = _collect([{"v": None}])
+        assert _field_metrics(stats, total_docs=1) == [(1.0, 1.0, None)]
+
+
+class TestAnalyzeCollection:
+    """Tests for analyze_collection function."""
+
+    def test_empty_collection(self):
+        """An empty collection should produce an empty schema."""
+        client, _ = _fake_client([])
+        result = asyncio.run(analyze_collection(client, "db", "coll"))
+        assert result["sampled_documents"] == 0
+        assert result["schema"] == {}
+
+    def test_presence_relative_to_sample(self):
+        """Presence should be relative to sampled documents, not the collection size."""
+        client, _ = _fake_client([{"name": "a"}] * 50)
+        result = asyncio.run(analyze_collection(client, "db", "coll", sample_size=10))
+
+        assert result["total_documents"] == 50
+        assert result["sampled_documents"] == 10
+        assert result["schema"]["properties"]["name"]["presence"] == 1.0
+        assert result["schema"]["required"] == ["name"]
+
+    def test_early_stop_on_homogeneous_data(self):
+        """Sampling should stop once field ratios converge."""
+        client, coll = _fake_client([{"name": "a", "age": 1}] * 5000)
+        result = asyncio.run(analyze_collection(client, "db", "coll", sample_size=4000))
+
+        assert result["sampled_documents"] == 1000
+        assert coll.cursor.closed
+
+    def test_full_scan_ignores_early_stop(self):
+        """A collection within the sample size should be read to the end."""
+        docs = [{"name": "a"}] * 2000 + [{"name": "a", "late": 1}] * 100
+        client, coll = _fake_client(docs)
+        result = asyncio.run(analyze_collection(client, "db", "coll"))
+
+        assert result["sampled_documents"] == 2100
+        assert "late" in result["schema"]["properties"]
+        assert not coll.cursor.closed
+
+    def test_analyzed_at_is_utc(self):
+        """The analysis timestamp should be timezone-aware UTC."""
+        client, _ = _fake_client([{"name": "a"}])
+        result = asyncio.run(analyze_collection(client, "db", "coll"))
+        assert datetime.fromisoformat(result["analyzed_at"]).utcoffset().total_seconds() == 0
+
+    def test_estimated_count_by_default(self):
+        """The collection size should come from metadata unless exact_count is set."""
+        client, coll = _fake_client([{"name": "a"}])
+        asyncio.run(analyze_collection(client, "db", "coll"))
+        assert coll.counted_exactly is False
+
+        asyncio.run(analyze_collection(client, "db", "coll", exact_count=True))
+        assert coll.counted_exactly is True
+
+    def test_early_stop_disabled(self):
+        """Disabling early stop should process the full sample."""
+        client, _ = _fake_client([{"name": "a"}] * 2000)
+        result = asyncio.run(analyze_collection(client, "db", "coll", early_stop=False))
+        assert result["sampled_documents"] == 2000
+
+    def test_no_early_stop_while_fields_appear(self):
+        """New fields in a window should prevent early stopping."""
+        docs = [{"name": "a"}] * 500 + [{"name": "a", "extra": 1}] * 500 + [{"name": "a"}] * 1001
+        client, _ = _fake_client(docs)
+        result = asyncio.run(analyze_collection(client, "db", "coll", sample_size=2000))
+        assert result["sampled_documents"] == 2000
+
+
+class TestConvergence:
+    """Tests for the early-stop convergence helpers."""
+
+    def test_snapshot(self):
+        """Snapshots should capture presence and type share."""
+        stats = _collect([{"v": 1}, {"v": "x"}, {"w": None}, {"w": None}])
+        assert _convergence_snapshot(stats, 4) == [(0.5, 0.5), (0.5, None)]
+
+    def test_converged(self):
+        """Small changes should count as converged."""
+        assert _has_converged([(1.0, 0.9)], [(1.0, 0.901)], 0.005)
+
+    def test_not_converged_on_shift(self):
+        """Shifts at or above epsilon should not count as converged."""
+        assert not _has_converged([(1.0, 0.9)], [(1.0, 0.95)], 0.005)
+
+    def test_not_converged_on_new_field(self):
+        """A newly seen field should not count as converged."""
+        assert not _has_converged([(1.0, 1.0)], [(1.0, 1.0), (0.1, 1.0)], 0.005)
+
+
+class TestFieldTable:
+    """Tests for FieldTable."""
+
+    def test_intern_is_stable(self):
+        """Interning the same path twice should return the same id."""
+        table = FieldTable()
+        first = table.intern("name")
+        second = table.intern("age")
+        assert table.intern("name") == first
+        assert (first, second) == (0, 1)
+        assert table.id_to_path == ["name", "age"]
+        assert len(table) == 2
+        assert "age" in table
+
+
+class TestServerSideStats:
+    """Tests for the server-side top-level field aggregation."""
+
+    GROUPS = [
+        {"_id": {"k": "name", "t": "string"}, "c": 4},
+        {"_id": {"k": "age", "t": "int"}, "c": 3},
+        {"_id": {"k": "age", "t": "null"}, "c": 1},
+        {"_id": {"k": "score", "t": "double"}, "c": 1},
+        {"_id": {"k": "score", "t": "int"}, "c": 1},
+    ]
+
+    def test_table_from_groups(self):
+        """Group results should populate counts, nulls and types."""
+        table = _table_from_field_groups(self.GROUPS)
+        assert _field(table, "age")["count"] == 4
+        assert _field(table, "age")["null_count"] == 1
+        assert _field(table, "age")["types"] == {"int": 3}
+        assert _field(table, "score")["types"] == {"double": 1, "int": 1}
+
+    def test_shallow_analysis(self):
+        """deep_analysis=False should build the schema from aggregated stats."""
+        client, coll = _fake_client([{}] * 4)
+        coll.facet_result = {"sampled": [{"n": 4}], "fields": self.GROUPS}
+        result = asyncio.run(analyze_collection(client, "db", "coll", deep_analysis=False))
+
+        assert result["sampled_documents"] == 4
+        props = result["schema"]["properties"]
+        assert props["name"] == {"bsonType": "string", "presence": 1.0, "nullable": False}
+        assert props["age"]["nullable"] is True
+        assert props["score"]["presence"] == 0.5
+        assert coll.pipeline[0] == {"$limit": 4}
@@ -0,0 +1,326 @@
+"""Tests for CLI helpers."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from mongo_schematic.cli import _map_collections
+
+
+class TestMapCollections:
+    """Tests for _map_collections function."""
+
+    def test_results_follow_input_order(self):
+        """Results should be keyed in input order regardless of completion order."""
+        delays = {"a": 0.03, "b": 0.0, "c": 0.01}
+
+        async def worker(name):
+            await asyncio.sleep(delays[name])
+            return name.upper()
+
+        result = asyncio.run(_map_collections(["a", "b", "c"], worker, "Done"))
+        assert list(result.items()) == [("a", "A"), ("b", "B"), ("c", "C")]
+
+    def test_concurrency_is_bounded(self):
+        """No more than limit workers should run at once."""
+        running = 0
+        peak = 0
+
+        async def worker(name):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return name
+
+        names = [f"c{i}" for i in range(10)]
+        asyncio.run(_map_collections(names, worker, "Done", limit=3))
+        assert peak == 3
+
+    def test_failure_cancels_remaining_workers(self):
+        """A failing worker should cancel the others before the error propagates."""
+        finished = []
+
+        async def worker(name):
+            if name == "bad":
+                raise RuntimeError("boom")
+            await asyncio.sleep(0.05)
+            finished.append(name)
+            return name
+
+        async def run():
+            with pytest.raises(RuntimeError):
+                await _map_collections(["a", "bad", "b"], worker, "Done")
+            await asyncio.sleep(0.1)
+
+        asyncio.run(run())
+        assert finished == []
+
+
+class TestPostWebhookAsync:
+    """Tests for _post_webhook_async function."""
+
+    def test_runs_off_the_event_loop(self, monkeypatch):
+        """The blocking POST should run in a worker thread."""
+        import threading
+
+        from mongo_schematic import cli
+
+        calls = []
+        monkeypatch.setattr(
+            cli, "_post_webhook",
+            lambda url, payload: calls.append((url, payload, threading.current_thread())),
+        )
+        asyncio.run(cli._post_webhook_async("http://hook", {"a": 1}))
+        assert calls[0][:2] == ("http://hook", {"a": 1})
+        assert calls[0][2] is not threading.main_thread()
+
+    def test_failure_does_not_raise(self, monkeypatch):
+        """A failed delivery should be reported, not crash the monitor."""
+        from mongo_schematic import cli
+
+        def boom(url, payload):
+            raise OSError("unreachable")
+
+        monkeypatch.setattr(cli, "_post_webhook", boom)
+        asyncio.run(cli._post_webhook_async("http://hook", {}))
+
+
+class TestLoadSchema:
+    """Tests for the cached _load_schema helper."""
+
+    def test_parses_each_file_once(self, tmp_path, monkeypatch):
+        """Equivalent paths to the same file should share one parse."""
+        from mongo_schematic import cli, schema_io
+
+        path = tmp_path / "users.yml"
+        path.write_text("schema:\n  properties: {}\n")
+
+        calls = []
+        original = schema_io.load_schema
+        monkeypatch.setattr(schema_io, "load_schema", lambda p: calls.append(p) or original(p))
+        cli._load_schema_cached.cache_clear()
+        try:
+            first = cli._load_schema(path)
+            second = cli._load_schema(tmp_path / "." / "users.yml")
+            assert first is second
+            assert len(calls) == 1
+        finally:
+            cli._load_schema_cached.cache_clear()
+
+
+class TestRunAsync:
+    """Tests for _run_async function."""
+
+    def test_returns_coroutine_result(self):
+        """The coroutine's return value should be passed through."""
+        from mongo_schematic.cli import _run_async
+
+        async def compute():
+            await asyncio.sleep(0)
+            return 42
+
+        assert _run_async(compute()) == 42
+
+
+class TestMapCollectionsStreaming:
+    """Tests for _map_collections with an on_result callback."""
+
+    def test_results_are_streamed_not_retained(self):
+        """Each result should go to the callback and the returned dict stay empty."""
+        seen = []
+
+        async def worker(name):
+            return name.upper()
+
+        result = asyncio.run(
+            _map_collections(["a", "b"], worker, "Done", on_result=lambda n, r: seen.append((n, r)))
+        )
+        assert result == {}
+        assert sorted(seen) == [("a", "A"), ("b", "B")]
+
+
+class TestBuildMigration:
+    """Tests for _build_migration function."""
+
+    def _write(self, path, properties):
+        from mongo_schematic.schema_io import write_schema
+
+        write_schema(path, {"schema": {"properties": properties}})
+        return path
+
+    def test_unchanged_schemas_are_skipped(self, tmp_path):
+        """Identical schemas should produce no migration file."""
+        from mongo_schematic.cli import _build_migration
+
+        props = {"name": {"bsonType": "string"}}
+        src = self._write(tmp_path / "a" / "users.yml", props)
+        dst = self._write(tmp_path / "b" / "users.yml", props)
+        name, summary, path = _build_migration(src, dst, "users", tmp_path / "out")
+        assert name == "users"
+        assert path is None
+        assert summary["added"] == 0
+
+    def test_changed_schemas_write_migration(self, tmp_path):
+        """An added field should produce a migration file."""
+        from mongo_schematic.cli import _build_migration
+
+        src = self._write(tmp_path / "a" / "users.yml", {"name": {"bsonType": "string"}})
+        dst = self._write(
+            tmp_path / "b" / "users.yml",
+            {"name": {"bsonType": "string"}, "age": {"bsonType": "int"}},
+        )
+        out_dir = tmp_path / "out"
+        out_dir.mkdir()
+        _, summary, path = _build_migration(src, dst, "users", out_dir)
+        assert summary["added"] == 1
+        assert path == str(out_dir / "users_migration.py")
+        assert (out_dir / "users_migration.py").exists()
+
+    def test_diff_computed_once(self, tmp_path, monkeypatch):
+        """The migration file should reuse the diff computed for the summary."""
+        from mongo_schematic import migrate
+        from mongo_schematic.cli import _build_migration
+
+        def fail(*args, **kwargs):
+            raise AssertionError("diff_schemas called twice")
+
+        monkeypatch.setattr(migrate, "diff_schemas", fail)
+        src = self._write(tmp_path / "a" / "users.yml", {})
+        dst = self._write(tmp_path / "b" / "users.yml", {"age": {"bsonType": "int"}})
+        out_dir = tmp_path / "out"
+        out_dir.mkdir()
+        _, _, path = _build_migration(src, dst, "users", out_dir)
+        assert path is not None
+
+
+class TestResolveConn:
+    """Tests for _resolve_conn function."""
+
+    def test_explicit_values_skip_config(self, monkeypatch):
+        """Passing both uri and db should not load the config files."""
+        from mongo_schematic import cli
+
+        def fail():
+            raise AssertionError("config should not be loaded")
+
+        monkeypatch.setattr(cli, "_config", fail)
+        assert cli._resolve_conn("mongodb://h", "app") == ("mongodb://h", "app", None)
+
+    def test_missing_values_come_from_config(self, monkeypatch):
+        """Missing values should be filled from the runtime config."""
+        from mongo_schematic import cli
+        from mongo_schematic.config import RuntimeConfig
+
+        config = RuntimeConfig(mongodb_uri="mongodb://cfg", default_db="cfgdb", gemini_api_key="k")
+        monkeypatch.setattr(cli, "_config", lambda: config)
+        assert cli._resolve_conn(None, "app") == ("mongodb://cfg", "app", "k")
+        assert cli._resolve_conn("mongodb://h", None) == ("mongodb://h", "cfgdb", "k")
+
+
+class TestWriteJson:
+    """Tests for _write_json function."""
+
+    def test_creates_parents_and_writes_json(self, tmp_path):
+        """The file should be created with its parent directories."""
+        import json
+
+        from mongo_schematic.cli import _write_json
+
+        path = tmp_path / "nested" / "plan.json"
+        _write_json(path, {"steps": [{"action": "add_field"}]})
+        assert json.loads(path.read_text()) == {"steps": [{"action": "add_field"}]}
+
+
+class TestProgress:
+    """Tests for _progress function."""
+
+    def test_silent_when_piped(self, monkeypatch, capsys):
+        """Progress lines should not be written when stdout is not a TTY."""
+        from mongo_schematic import cli
+
+        monkeypatch.setattr(cli.sys.stdout, "isatty", lambda: False, raising=False)
+        cli._progress("Analyzed users")
+        assert capsys.readouterr().out == ""
+
+
+class TestSchemaIndex:
+    """Tests for _schema_index function."""
+
+    def test_maps_names_and_tracks_changes(self, tmp_path):
+        """New files should show up once the directory mtime changes."""
+        import os
+
+        from mongo_schematic import cli
+
+        (tmp_path / "users.yml").write_text("{}")
+        index = cli._schema_index(tmp_path)
+        assert dict(index) == {"users": tmp_path / "users.yml"}
+        assert cli._schema_index(tmp_path) is index
+
+        (tmp_path / "orders.yaml").write_text("{}")
+        stat = tmp_path.stat()
+        os.utime(tmp_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        assert set(cli._schema_index(tmp_path)) == {"users", "orders"}
+
+    def test_missing_directory_is_empty(self, tmp_path):
+        """A missing schema directory should map to an empty index."""
+        from mongo_schematic import cli
+
+        assert dict(cli._schema_index(tmp_path / "missing")) == {}
+
+
+class _FakeDatabase:
+    async def list_collection_names(self):
+        return ["users", "orders", "system.views"]
+
+
+class _FakeClient:
+    def __getitem__(self, name):
+        return _FakeDatabase()
+
+    def close(self):
+        pass
+
+
+class TestDbAnalyze:
+    """Tests for the db analyze command."""
+
+    def _invoke(self, monkeypatch, *args):
+        from typer.testing import CliRunner
+
+        from mongo_schematic import analyze, cli, db
+
+        async def fake_analyze(client, database, collection, sample_size):
+            return {"collection": collection, "anomalies": [], "recommendations": []}
+
+        monkeypatch.setattr(db, "get_motor_client", lambda uri, **kwargs: _FakeClient())
+        monkeypatch.setattr(analyze, "analyze_collection", fake_analyze)
+        return CliRunner().invoke(cli.app, ["db", "analyze", "--uri", "mongodb://x", "--db", "d", *args])
+
+    def test_jsonl_file_keeps_streamed_lines(self, tmp_path, monkeypatch):
+        """The JSON Lines file should hold one collection per line, not the summary."""
+        import json
+
+        out = tmp_path / "analysis.jsonl"
+        result = self._invoke(monkeypatch, "--format", "jsonl", "--out", str(out))
+
+        assert result.exit_code == 0, result.output
+        lines = [json.loads(line) for line in out.read_text().splitlines()]
+        assert sorted(line["collection"] for line in lines) == ["orders", "users"]
+        assert all(line["result"]["collection"] == line["collection"] for line in lines)
+
+    def test_ai_is_opt_in(self, monkeypatch):
+        """Gemini should not be called unless --ai is passed."""
+        from mongo_schematic import ai
+
+        async def fail(*args, **kwargs):
+            raise AssertionError("AI should be opt-in")
+
+        monkeypatch.setattr(ai, "generate_recommendations_batch", fail)
+        result = self._invoke(monkeypatch)
+
+        assert result.exit_code == 0, result.output
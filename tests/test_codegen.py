@@ -0,0 +1,184 @@
+"""Tests for code generation helpers."""
+
+from __future__ import annotations
+
+import pytest
+import yaml
+
+from mongo_schematic.codegen import generate_models_batch
+from mongo_schematic.codegen.ordering import required_set
+from mongo_schematic.codegen.pydantic import _sanitize_name, _to_pascal_case, generate_pydantic_code
+from mongo_schematic.codegen.typescript import generate_typescript_code
+
+
+def _write_schema(path, properties):
+    path.write_text(yaml.safe_dump({"schema": {"properties": properties, "required": []}}))
+
+
+class TestGenerateModelsBatch:
+    """Tests for generate_models_batch function."""
+
+    def test_one_file_per_schema(self, tmp_path):
+        """Each schema should produce a file named and classed after its collection."""
+        schema_dir = tmp_path / "schemas"
+        schema_dir.mkdir()
+        _write_schema(schema_dir / "users.v1.yml", {"name": {"bsonType": "string"}})
+        _write_schema(schema_dir / "order_items.yaml", {"qty": {"bsonType": "int"}})
+
+        paths = generate_models_batch(schema_dir, tmp_path / "out", "pydantic", max_workers=2)
+
+        assert [p.name for p in paths] == ["order_items.py", "users.py"]
+        assert "class OrderItems" in paths[0].read_text()
+        assert "class Users" in paths[1].read_text()
+
+    def test_fixed_name_typescript(self, tmp_path):
+        """The fixed strategy should reuse the given name and write .ts files."""
+        _write_schema(tmp_path / "users.yml", {"name": {"bsonType": "string"}})
+
+        (path,) = generate_models_batch(
+            tmp_path, tmp_path / "out", "TypeScript", name_strategy="fixed", name="Doc"
+        )
+
+        assert path.name == "users.ts"
+        assert "interface Doc" in path.read_text()
+
+    def test_unknown_type(self, tmp_path):
+        """An unsupported type should raise before any file is written."""
+        with pytest.raises(ValueError, match="Unknown type"):
+            generate_models_batch(tmp_path, tmp_path / "out", "java")
+        assert not (tmp_path / "out").exists()
+
+
+class TestNestedModels:
+    """Tests for nested object handling in the generators."""
+
+    SCHEMA = {
+        "schema": {
+            "properties": {
+                "address": {
+                    "bsonType": "object",
+                    "properties": {
+                        "geo": {"bsonType": "object", "properties": {"lat": {"bsonType": "double"}}},
+                    },
+                },
+            },
+            "required": ["address"],
+        }
+    }
+
+    def test_pydantic_nested_defined_before_parent(self):
+        """Nested models should be emitted before the models that reference them."""
+        code = generate_pydantic_code(self.SCHEMA, "User")
+        assert code.index("class UserAddressGeo(") < code.index("class UserAddress(")
+        assert code.index("class UserAddress(") < code.index("class User(")
+
+    def test_typescript_nested_defined_before_parent(self):
+        """Nested interfaces should be emitted before their parents."""
+        code = generate_typescript_code(self.SCHEMA, "User")
+        assert code.index("interface UserAddressGeo ") < code.index("interface UserAddress ")
+        assert code.index("interface UserAddress ") < code.index("interface User ")
+
+    def test_pydantic_empty_nested_model_precedes_parent(self):
+        """A nested model with no properties should still be defined before use."""
+        schema = {"schema": {"properties": {"meta": {"bsonType": "object", "properties": {}}}}}
+        code = generate_pydantic_code(schema, "Doc")
+        assert code.index("class DocMeta(") < code.index("class Doc(")
+
+
+class TestRequiredSet:
+    """Tests for required_set function."""
+
+    def test_interns_equal_lists(self):
+        """Equal required lists should share one frozenset."""
+        first = required_set(["a", "b"])
+        assert first == frozenset({"a", "b"})
+        assert required_set(["a", "b"]) is first
+
+
+class TestTypeMapping:
+    """Tests for BSON type mapping in the generators."""
+
+    SCHEMA = {
+        "schema": {
+            "properties": {
+                "age": {"bsonType": "int"},
+                "tag": {"bsonType": ["string", "null", "mystery"]},
+            },
+            "required": ["age"],
+        }
+    }
+
+    def test_pydantic_types(self):
+        """Scalar and union types should map to Python annotations."""
+        code = generate_pydantic_code(self.SCHEMA, "Doc")
+        assert "    age: int\n" in code + "\n"
+        assert "tag: Optional[Union[str, None, Any]] = None" in code
+
+    def test_typescript_types(self):
+        """Scalar and union types should map to TypeScript annotations."""
+        code = generate_typescript_code(self.SCHEMA, "Doc")
+        assert "  age: number;" in code
+        assert "  tag?: string | null | any;" in code
+
+    def test_bare_schema_block(self):
+        """A schema block without the file wrapper should generate the same fields."""
+        code = generate_typescript_code({"properties": {"n": {"bsonType": "int"}}, "required": ["n"]}, "Doc")
+        assert "  n: number;" in code
+
+
+class TestNameHelpers:
+    """Tests for the pydantic name helpers."""
+
+    def test_sanitize_name(self):
+        """Spaces and hyphens should become underscores."""
+        assert _sanitize_name("first name-x") == "first_name_x"
+
+    def test_to_pascal_case(self):
+        """snake, kebab and spaced names should become PascalCase."""
+        assert _to_pascal_case("order_line-item") == "OrderLineItem"
+        assert _to_pascal_case("order_line-item") == "OrderLineItem"
+        assert _to_pascal_case.cache_info().hits >= 1
+
+
+class TestSharedShapes:
+    """Tests for interning identical nested objects."""
+
+    ADDRESS = {"bsonType": "object", "properties": {"city": {"bsonType": "string"}}}
+    SCHEMA = {
+        "schema": {
+            "properties": {
+                "billing": dict(ADDRESS),
+                "shipping": dict(ADDRESS),
+                "meta": {"bsonType": "object", "properties": {"v": {"bsonType": "int"}}},
+            },
+            "required": ["billing", "shipping"],
+        }
+    }
+
+    def test_pydantic_reuses_model(self):
+        """Identical subdocuments should share one generated model."""
+        code = generate_pydantic_code(self.SCHEMA, "Order")
+        assert code.count("class OrderBilling(") == 1
+        assert "class OrderShipping(" not in code
+        assert "    shipping: OrderBilling" in code
+        assert "class OrderMeta(" in code
+
+    def test_typescript_reuses_interface(self):
+        """Identical subdocuments should share one generated interface."""
+        code = generate_typescript_code(self.SCHEMA, "Order")
+        assert "interface OrderShipping " not in code
+        assert "  shipping: OrderBilling;" in code
+        assert code.index("interface OrderBilling ") < code.index("interface Order ")
+
+    def test_colliding_names_emitted_once(self):
+        """Distinct shapes that map to the same model name should emit one class."""
+        schema = {
+            "schema": {
+                "properties": {
+                    "foo_bar": {"bsonType": "object", "properties": {"a": {"bsonType": "int"}}},
+                    "foo-bar": {"bsonType": "object", "properties": {"b": {"bsonType": "int"}}},
+                },
+            }
+        }
+        code = generate_pydantic_code(schema, "Doc")
+        assert code.count("class DocFooBar(") == 1
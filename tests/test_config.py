@@ -12,8 +12,11 @@ import yaml
 from mongo_schematic.config import (
     FileConfig,
     EnvConfig,
+    _get_env_config,
+    _parse_yaml_cached,
     load_file_config,
     load_runtime_config,
+    resolve_config_paths,
     write_default_config,
 )
 from mongo_schematic.exceptions import ConfigurationError
@@ -78,6 +81,19 @@ class TestLoadFileConfig:
             finally:
                 os.unlink(f.name)
 
+    def test_reparse_skipped_until_file_changes(self, tmp_path):
+        """Unchanged files should come from the cache; edits should be picked up."""
+        _parse_yaml_cached.cache_clear()
+        path = tmp_path / ".mschema.yml"
+        path.write_text("default_db: first\n")
+
+        assert load_file_config(path).default_db == "first"
+        assert load_file_config(path).default_db == "first"
+        assert _parse_yaml_cached.cache_info().hits == 1
+
+        path.write_text("default_db: second-value\n")
+        assert load_file_config(path).default_db == "second-value"
+
 
 class TestLoadRuntimeConfig:
     """Tests for load_runtime_config function."""
@@ -150,3 +166,59 @@ class TestWriteDefaultConfig:
                 assert "custom: value" in content
             finally:
                 os.unlink(f.name)
+
+
+class TestEnvConfig:
+    """Tests for the lazily built EnvConfig settings class."""
+
+    def test_reads_prefixed_env(self, monkeypatch):
+        """MSCHEMA_-prefixed variables should populate the settings."""
+        monkeypatch.setenv("MSCHEMA_DEFAULT_DB", "envdb")
+        assert EnvConfig().default_db == "envdb"
+
+    def test_instance_reused_until_env_changes(self, monkeypatch, tmp_path):
+        """load_runtime_config should reuse settings until MSCHEMA_* changes."""
+        monkeypatch.setenv("MSCHEMA_MONGODB_URI", "mongodb://env:27017")
+        monkeypatch.setenv("MSCHEMA_DEFAULT_DB", "first")
+        _get_env_config.cache_clear()
+        path = tmp_path / ".mschema.yml"
+
+        assert load_runtime_config(path).default_db == "first"
+        assert load_runtime_config(path).default_db == "first"
+        assert _get_env_config.cache_info().hits == 1
+
+        monkeypatch.setenv("MSCHEMA_DEFAULT_DB", "second")
+        assert load_runtime_config(path).default_db == "second"
+
+    def test_class_is_stable(self):
+        """Repeated attribute access should return the same class."""
+        from mongo_schematic import config
+
+        assert config.EnvConfig is EnvConfig
+        assert EnvConfig.__name__ == "EnvConfig"
+
+
+class TestResolveConfigPaths:
+    """Tests for resolve_config_paths function."""
+
+    def test_follows_current_directory(self, monkeypatch, tmp_path):
+        """Paths should track the working directory rather than import time."""
+        monkeypatch.chdir(tmp_path)
+        assert resolve_config_paths() == (tmp_path / ".mschema.yml", tmp_path / ".mschema.local.yml")
+
+        from mongo_schematic import config
+
+        assert config.DEFAULT_CONFIG_PATH == tmp_path / ".mschema.yml"
+
+    def test_runtime_config_uses_cwd_files(self, monkeypatch, tmp_path):
+        """load_runtime_config() should pick up config files after a chdir."""
+        monkeypatch.delenv("MSCHEMA_MONGODB_URI", raising=False)
+        monkeypatch.delenv("MSCHEMA_DEFAULT_DB", raising=False)
+        (tmp_path / ".mschema.yml").write_text("mongodb_uri: mongodb://file\ndefault_db: filedb\n")
+        (tmp_path / ".mschema.local.yml").write_text("default_db: localdb\n")
+        monkeypatch.chdir(tmp_path)
+
+        config = load_runtime_config()
+        assert config.mongodb_uri == "mongodb://file"
+        assert config.default_db == "localdb"
+
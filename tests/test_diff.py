@@ -115,18 +115,37 @@ class TestDiffSchemas:
         assert "a" in result["removed_fields"]
 
 
+    def test_same_object_is_empty_diff(self):
+        """Diffing a schema against itself should return a fresh empty diff."""
+        schema = {"schema": {"properties": {"a": {"bsonType": "string"}}}}
+        first = diff_schemas(schema, schema)
+        assert first["summary"] == {"added": 0, "removed": 0, "changed": 0}
+        first["changed_fields"].append("x")
+        assert diff_schemas(schema, schema)["changed_fields"] == []
+
+    def test_shared_field_definition_skipped(self):
+        """A field definition shared by both schemas should not be reported."""
+        shared = {"bsonType": "int"}
+        source = {"schema": {"properties": {"n": shared}}}
+        target = {"schema": {"properties": {"n": shared, "m": {"bsonType": "int"}}}}
+        result = diff_schemas(source, target)
+        assert result["changed_fields"] == []
+        assert result["added_fields"] == ["m"]
+
+
 class TestFieldSignature:
     """Tests for _field_signature helper."""
 
     def test_dict_field(self):
-        """Dict fields should extract signature keys."""
+        """Dict fields should reduce to a (bsonType, nullable, presence) tuple."""
         field = {"bsonType": "string", "nullable": True, "presence": 0.5, "extra": "ignored"}
-        sig = _field_signature(field)
+        assert _field_signature(field) == ("string", True, 0.5)
 
-        assert sig["bsonType"] == "string"
-        assert sig["nullable"] is True
-        assert sig["presence"] == 0.5
-        assert "extra" not in sig
+    def test_union_order_ignored(self):
+        """Union types should compare equal regardless of order."""
+        a = _field_signature({"bsonType": ["string", None]})
+        b = _field_signature({"bsonType": ["null", "string"]})
+        assert a == b
 
     def test_non_dict_field(self):
         """Non-dict fields should be returned as-is."""
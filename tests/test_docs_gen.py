@@ -0,0 +1,55 @@
+"""Tests for HTML documentation generation."""
+
+from __future__ import annotations
+
+import yaml
+
+from mongo_schematic.docs_gen import generate_docs
+
+
+def _write_schema(path, payload):
+    path.write_text(yaml.safe_dump(payload))
+
+
+class TestGenerateDocs:
+    """Tests for generate_docs function."""
+
+    def test_renders_card_per_schema(self, tmp_path):
+        """Each schema should get a nav link, a card and one row per field."""
+        schema_dir = tmp_path / "schemas"
+        schema_dir.mkdir()
+        _write_schema(schema_dir / "users.v1.yml", {
+            "collection": "users",
+            "database": "app",
+            "schema": {
+                "properties": {"name": {"bsonType": "string", "presence": 0.5}},
+                "required": ["name"],
+            },
+            "anomalies": [{"type": "mixed_types", "field": "age"}],
+        })
+        _write_schema(schema_dir / "orders.yml", {"schema": {"properties": {}}})
+
+        out = tmp_path / "site" / "index.html"
+        generate_docs(schema_dir, out)
+        page = out.read_text()
+
+        assert '<a href="#orders" class="nav-link">orders</a>' in page
+        assert '<div id="users" class="schema-card">' in page
+        assert "<td><strong>name</strong></td>" in page
+        assert '<span class="badge badge-req">Required</span>' in page
+        assert "<td>50.0%</td>" in page
+        assert "<li>mixed_types: age</li>" in page
+        assert page.index('id="orders"') < page.index('id="users"')
+
+    def test_escapes_field_names(self, tmp_path):
+        """Field names and types should be HTML-escaped."""
+        _write_schema(tmp_path / "notes.yml", {
+            "schema": {"properties": {"<b>": {"bsonType": "a&b"}}},
+        })
+
+        out = tmp_path / "index.html"
+        generate_docs(tmp_path, out)
+        page = out.read_text()
+
+        assert "<strong>&lt;b&gt;</strong>" in page
+        assert ">a&amp;b</span>" in page
@@ -4,6 +4,7 @@ from __future__ import annotations
 
 import pytest
 
+from mongo_schematic import drift
 from mongo_schematic.drift import detect_drift, _classify_severity, _calculate_drift_score
 
 
@@ -26,6 +27,19 @@ class TestDetectDrift:
         assert result["critical_count"] == 0
         assert result["warning_count"] == 0
 
+    def test_stable_schema_skips_assessment(self, monkeypatch):
+        """An empty diff should return zero drift without the scoring pass."""
+        def fail(*args, **kwargs):
+            raise AssertionError("_assess_drift should not run")
+
+        monkeypatch.setattr(drift, "_assess_drift", fail)
+        schema = {"schema": {"properties": {"name": {"bsonType": "string", "presence": 1.0}}}}
+        result = drift.detect_drift(schema, {"schema": {"properties": {"name": {"bsonType": "string", "presence": 1.0}}}})
+
+        assert result["severity"] == []
+        assert result["drift_score"] == 0.0
+        assert result["info_count"] == 0
+
     def test_drift_with_added_field(self):
         """Drift detected when field is added."""
         expected = {
@@ -142,3 +156,63 @@ class TestCalculateDriftScore:
         }
         score = _calculate_drift_score(diff)
         assert score == 0.25
+
+    def test_mixed_changes(self):
+        """Breaking type changes and other changes should be weighted separately."""
+        diff = {
+            "added_fields": [],
+            "removed_fields": [],
+            "changed_fields": [
+                {"from": {"bsonType": "string"}, "to": {"bsonType": "int"}},
+                {"from": {"bsonType": ["string", "null"]}, "to": {"bsonType": "string"}},
+                {"from": {"bsonType": "int", "presence": 1.0}, "to": {"bsonType": "int", "presence": 0.5}},
+            ],
+        }
+        assert _calculate_drift_score(diff) == 0.45
+
+
+class TestCompatReuse:
+    """Each side of a change should be normalized once per drift check."""
+
+    def test_single_normalization_per_definition(self, monkeypatch):
+        """Filtering and compatibility should share one normalization per side."""
+        calls = []
+        original = drift._normalize_types
+
+        def counting(definition):
+            calls.append(1)
+            return original(definition)
+
+        monkeypatch.setattr(drift, "_normalize_types", counting)
+        expected = {"schema": {"properties": {
+            "a": {"bsonType": "string", "presence": 1.0},
+            "b": {"bsonType": ["int", "null"], "presence": 1.0},
+            "c": {"bsonType": ["string", "null"], "presence": 1.0},
+        }}}
+        observed = {"schema": {"properties": {
+            "a": {"bsonType": "int", "presence": 1.0},
+            "b": {"bsonType": "int", "presence": 0.5},
+            "c": {"bsonType": "string", "presence": 1.0},
+        }}}
+
+        result = drift.detect_drift(expected, observed)
+
+        assert len(calls) == 6
+        assert result["critical_count"] == 1
+        assert result["drift_score"] == 0.35
+
+
+class TestNormalizeTypes:
+    """Tests for _normalize_types helper."""
+
+    def test_scalar_types_are_shared(self):
+        """Common scalar types should return the same cached frozenset."""
+        assert drift._normalize_types({"bsonType": "int"}) is drift._normalize_types({"bsonType": "int"})
+        assert drift._normalize_types({"bsonType": "custom"}) == frozenset({"custom"})
+
+    def test_lists_and_missing(self):
+        """Lists map None to null; a missing type means null; junk means nothing."""
+        assert drift._normalize_types({"bsonType": ["int", None, 3]}) == frozenset({"int", "null"})
+        assert drift._normalize_types({}) == frozenset({"null"})
+        assert drift._normalize_types({"bsonType": 5}) == frozenset()
+        assert drift._normalize_types("string") == frozenset()
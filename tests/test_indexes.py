@@ -0,0 +1,40 @@
+"""Tests for index recommendations."""
+
+from __future__ import annotations
+
+from mongo_schematic.indexes import recommend_indexes
+
+
+class TestRecommendIndexes:
+    """Tests for recommend_indexes function."""
+
+    def test_high_presence_unindexed_fields(self):
+        """Only frequent fields without an existing index should be suggested."""
+        schema = {
+            "schema": {
+                "properties": {
+                    "email": {"bsonType": "string", "presence": 0.95},
+                    "name": {"bsonType": "string", "presence": 0.9},
+                    "nickname": {"bsonType": "string", "presence": 0.2},
+                    "broken": "not-a-dict",
+                }
+            }
+        }
+        indexes = [
+            {"name": "_id_", "keys": [("_id", 1)]},
+            {"name": "email_1", "keys": [("email", 1)]},
+        ]
+
+        result = recommend_indexes(schema, indexes)
+
+        assert result == [
+            {
+                "field": "name",
+                "reason": "High presence; consider indexing",
+                "suggested_index": {"fields": {"name": 1}},
+            }
+        ]
+
+    def test_empty_schema(self):
+        """An empty schema should produce no recommendations."""
+        assert recommend_indexes({}, []) == []
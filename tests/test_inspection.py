@@ -0,0 +1,57 @@
+"""Tests for single-pass collection inspection."""
+
+from __future__ import annotations
+
+import asyncio
+
+from mongo_schematic.inspection import inspect_collection
+from tests.test_analyze import _fake_client
+
+
+EXPECTED = {
+    "schema": {
+        "type": "object",
+        "properties": {
+            "name": {"bsonType": "string", "presence": 1.0, "nullable": False},
+        },
+        "required": ["name"],
+    }
+}
+
+
+class TestInspectCollection:
+    """Tests for inspect_collection function."""
+
+    def test_single_cursor_feeds_all_results(self):
+        """Analysis, validation and drift should all come from one read."""
+        docs = [{"_id": i, "name": f"n{i}"} for i in range(8)] + [
+            {"_id": 8, "name": 5},
+            {"_id": 9, "age": 3},
+        ]
+        client, coll = _fake_client(docs)
+        result = asyncio.run(inspect_collection(client, "db", "coll", EXPECTED))
+
+        assert coll.cursor.consumed == 10
+        assert result["analysis"]["sampled_documents"] == 10
+        assert result["validation"]["valid"] == 8
+        assert result["validation"]["invalid"] == 2
+        assert result["drift"]["has_drift"]
+        assert "age" in result["drift"]["added_fields"]
+
+    def test_max_errors_caps_reported_errors(self):
+        """Only max_errors invalid documents should be detailed."""
+        docs = [{"_id": i, "name": i} for i in range(5)]
+        client, _ = _fake_client(docs)
+        result = asyncio.run(inspect_collection(client, "db", "coll", EXPECTED, max_errors=2))
+
+        assert result["validation"]["invalid"] == 5
+        assert len(result["validation"]["errors"]) == 2
+
+    def test_empty_collection(self):
+        """An empty collection should produce empty results without reading."""
+        client, coll = _fake_client([])
+        result = asyncio.run(inspect_collection(client, "db", "coll", EXPECTED))
+
+        assert coll.cursor is None
+        assert result["validation"]["sampled_documents"] == 0
+        assert result["analysis"]["schema"]["properties"] == {}
@@ -0,0 +1,415 @@
+"""Tests for migration generation and application."""
+
+from __future__ import annotations
+
+import ast
+import asyncio
+import json
+from datetime import datetime
+
+from mongo_schematic.diff import diff_schemas
+from mongo_schematic.migrate import (
+    _batched_convert,
+    _batched_update,
+    _convert_pipeline,
+    _default_repr,
+    _default_value_for_bson_type,
+    _generate_down_code,
+    _generate_up_code,
+    _group_steps_by_field,
+    _parse_resume_id,
+    apply_migration_plan,
+    generate_migration_file,
+    generate_migration_plan,
+)
+
+
+FROM_SCHEMA = {
+    "schema": {
+        "properties": {
+            "age": {"bsonType": "string"},
+            "tags": {"bsonType": "string"},
+            "legacy": {"bsonType": "bool"},
+        },
+    }
+}
+
+TO_SCHEMA = {
+    "schema": {
+        "properties": {
+            "age": {"bsonType": "int"},
+            "tags": {"bsonType": "array"},
+            "status": {"bsonType": "string", "default": "active"},
+        },
+    }
+}
+
+
+def _compiles(body: str) -> bool:
+    ast.parse("async def up(self):\n" + body)
+    return True
+
+
+class TestGenerateUpCode:
+    """Tests for the generated up() body."""
+
+    def test_no_changes(self):
+        """An empty diff should render a bare pass."""
+        diff = diff_schemas(FROM_SCHEMA, FROM_SCHEMA)
+        assert _generate_up_code(diff, FROM_SCHEMA, "users", FROM_SCHEMA) == (
+            "        # No changes detected\n        pass"
+        )
+
+    def test_blocks_rendered(self):
+        """Add, wrap, convert and remove blocks should all be present."""
+        diff = diff_schemas(FROM_SCHEMA, TO_SCHEMA)
+        body = _generate_up_code(diff, TO_SCHEMA, "users", FROM_SCHEMA)
+
+        assert body.startswith("        coll = self.db['users']\n\n")
+        assert "{'$set': {'status': \"active\"}}" in body
+        assert "# Wrap 'tags' into array" in body
+        assert "'to': 'int'," in body
+        assert "# Uncomment to remove field 'legacy' (DESTRUCTIVE)" in body
+        assert body.endswith("        # )\n")
+        assert _compiles(body)
+
+    def test_nested_default_literal(self):
+        """Structured defaults should render as a single JSON literal."""
+        default = {"tier": "free", "limits": [1, 2], "label": "café"}
+        rendered = _default_repr(default)
+
+        assert "\n" not in rendered
+        assert json.loads(rendered) == default
+
+
+class TestGenerateMigrationPlan:
+    """Tests for generate_migration_plan."""
+
+    def test_step_order(self):
+        """Item, required and nullability steps should follow the diff steps."""
+        source = {
+            "schema": {
+                "properties": {
+                    "tags": {"bsonType": "array", "items": {"bsonType": "int"}},
+                    "email": {"bsonType": "string", "nullable": True},
+                },
+            }
+        }
+        target = {
+            "schema": {
+                "properties": {
+                    "tags": {"bsonType": "array", "items": {"bsonType": "string"}},
+                    "email": {"bsonType": "string", "nullable": False, "default": ""},
+                    "plan": {"bsonType": "string", "default": "free"},
+                },
+                "required": ["plan"],
+            }
+        }
+
+        plan = generate_migration_plan(source, target)
+
+        assert plan["steps"][0]["action"] == "add_field"
+        assert [(step["action"], step["field"]) for step in plan["steps"][-3:]] == [
+            ("convert_array_items", "tags"),
+            ("fill_missing", "plan"),
+            ("fill_nulls", "email"),
+        ]
+
+
+class TestGenerateMigrationFile:
+    """Tests for generate_migration_file."""
+
+    def test_header_timestamp_is_utc(self, tmp_path):
+        """The generated-at stamp should be timezone-aware UTC."""
+        path = generate_migration_file(FROM_SCHEMA, TO_SCHEMA, "users", tmp_path / "m.py")
+        content = path.read_text()
+
+        stamp = content.split("Generated at: ", 1)[1].split("\n", 1)[0]
+        assert datetime.fromisoformat(stamp).utcoffset().total_seconds() == 0
+        ast.parse(content)
+
+    def test_overwrites_without_leftover_temp(self, tmp_path):
+        """Regenerating should replace the file in place and leave no temp file."""
+        out = tmp_path / "m.py"
+        out.write_text("stale")
+        generate_migration_file(FROM_SCHEMA, TO_SCHEMA, "users", out)
+
+        assert out.read_text().startswith('"""\nMigration: users schema change')
+        assert [p.name for p in tmp_path.iterdir()] == ["m.py"]
+
+
+class TestGenerateDownCode:
+    """Tests for the generated down() body."""
+
+    def test_blocks_rendered(self):
+        """Rollback should unset, restore, unwrap and revert."""
+        diff = diff_schemas(FROM_SCHEMA, TO_SCHEMA)
+        body = _generate_down_code(diff, FROM_SCHEMA, "users")
+
+        assert "{'$unset': {'status': ''}}" in body
+        assert "# TODO: Implement data restoration for 'legacy'" in body
+        assert "# Unwrap 'tags' from array (rollback)" in body
+        assert "# Revert 'age' to string" in body
+        assert body.endswith("        )\n")
+        assert _compiles(body)
+
+
+class _FakeCursor:
+    def __init__(self, docs):
+        self.docs = list(docs)
+
+    def sort(self, key, direction):
+        self.docs.sort(key=lambda doc: doc[key], reverse=direction < 0)
+        return self
+
+    def limit(self, n):
+        self.docs = self.docs[:n]
+        return self
+
+    async def to_list(self, length=None):
+        return self.docs[:length]
+
+
+class _UpdateResult:
+    def __init__(self, matched_count):
+        self.matched_count = matched_count
+        self.modified_count = matched_count
+
+
+class _FakeCollection:
+    def __init__(self, docs):
+        self.docs = docs
+        self.finds = []
+        self.updates = []
+        self.bulk_writes = 0
+
+    def find(self, query, projection=None):
+        self.finds.append(query)
+        after = query.get("_id", {}).get("$gt")
+        docs = [doc for doc in self.docs if after is None or doc["_id"] > after]
+        return _FakeCursor(docs)
+
+    async def update_many(self, query, update):
+        self.updates.append(query)
+        ids = query.get("_id", {}).get("$in")
+        return _UpdateResult(len(self.docs) if ids is None else len(ids))
+
+    async def bulk_write(self, ops, ordered=True):
+        self.bulk_writes += 1
+        matched = 0
+        for op in ops:
+            matched += (await self.update_many(op._filter, op._doc)).matched_count
+        return _UpdateResult(matched)
+
+
+class TestBatchedUpdate:
+    """Tests for _batched_update."""
+
+    def test_single_update_without_resume_or_throttle(self):
+        """A plain run should skip id discovery and update once."""
+        coll = _FakeCollection([{"_id": i} for i in range(5)])
+        query = {"a": {"$exists": False}}
+        updated, last_id = asyncio.run(
+            _batched_update(coll, query, {"$set": {"a": 1}}, 2, False, 0)
+        )
+
+        assert (updated, last_id) == (5, None)
+        assert coll.finds == []
+        assert coll.updates == [query]
+
+    def test_batches_when_resuming(self):
+        """A resume point should page by id and bundle the pages into one bulk write."""
+        coll = _FakeCollection([{"_id": i} for i in range(5)])
+        updated, last_id = asyncio.run(
+            _batched_update(coll, {}, {"$set": {"a": 1}}, 2, False, 0, resume_from=-1)
+        )
+
+        assert (updated, last_id) == (5, 4)
+        assert [u["_id"]["$in"] for u in coll.updates] == [[0, 1], [2, 3], [4]]
+        assert coll.bulk_writes == 1
+        assert [f["_id"]["$gt"] for f in coll.finds] == [-1, 1, 3]
+
+    def test_dry_run_counts_without_updating(self):
+        """Dry runs should still walk the ids for counting."""
+        coll = _FakeCollection([{"_id": i} for i in range(3)])
+        updated, _ = asyncio.run(_batched_update(coll, {}, {"$set": {"a": 1}}, 2, True, 0))
+
+        assert updated == 3
+        assert len(coll.finds) == 2
+        assert coll.updates == []
+
+
+class TestBatchedConvert:
+    """Tests for _batched_convert."""
+
+    def test_single_pipeline_update(self):
+        """A plain run should convert server-side with one update_many."""
+        coll = _FakeCollection([{"_id": i} for i in range(4)])
+        updated, last_id = asyncio.run(_batched_convert(coll, "age", "int", 2, False, 0))
+
+        assert (updated, last_id) == (4, None)
+        assert coll.finds == []
+        assert coll.updates == [{"age": {"$exists": True}}]
+
+    def test_batches_when_throttled(self):
+        """Rate limiting should convert page by page."""
+        coll = _FakeCollection([{"_id": i} for i in range(3)])
+        updated, last_id = asyncio.run(_batched_convert(coll, "age", "int", 2, False, 1))
+
+        assert (updated, last_id) == (3, 2)
+        assert [u["_id"]["$in"] for u in coll.updates] == [[0, 1], [2]]
+        assert coll.bulk_writes == 2
+
+    def test_pipeline_shape(self):
+        """The pipeline should $convert the field in place."""
+        convert = _convert_pipeline("age", "int")[0]["$set"]["age"]["$convert"]
+        assert convert == {"input": "$age", "to": "int", "onError": "$age", "onNull": None}
+
+
+PLAN_SCHEMA = {
+    "schema": {
+        "properties": {
+            "status": {"bsonType": "string", "default": "active"},
+            "age": {"bsonType": "int"},
+        }
+    }
+}
+
+
+class TestApplyMigrationPlan:
+    """Tests for apply_migration_plan."""
+
+    PLAN = {
+        "steps": [
+            {"action": "add_field", "field": "status"},
+            {"action": "convert_type", "field": "age"},
+            {"action": "remove_field", "field": "legacy"},
+            {"action": "rename_field", "field": "age", "details": {"to": "years"}},
+            {"field": "missing_action"},
+        ]
+    }
+
+    def _apply(self, **kwargs):
+        coll = _FakeCollection([{"_id": i} for i in range(3)])
+        client = {"db": {"users": coll}}
+        return asyncio.run(
+            apply_migration_plan(client, "db", "users", self.PLAN, PLAN_SCHEMA, **kwargs)
+        )
+
+    def test_serial_summary(self):
+        """Skipped and applied steps should be tallied in plan order."""
+        result = self._apply()
+
+        assert result["summary"] == {"updated": 9, "skipped": 2, "errors": 0}
+        assert [step["action"] for step in result["steps"]] == [
+            "add_field",
+            "convert_type",
+            "remove_field",
+            "rename_field",
+        ]
+        assert result["steps"][2]["skipped"] is True
+
+    def test_concurrent_matches_serial(self):
+        """Concurrent execution should report the same results as serial."""
+        assert self._apply(concurrent_steps=True) == self._apply()
+
+    def test_field_steps_use_single_update(self):
+        """Add, remove and rename should each be one server-side update."""
+        coll = _FakeCollection([{"_id": i} for i in range(3)])
+        plan = {
+            "steps": [
+                {"action": "add_field", "field": "status"},
+                {"action": "remove_field", "field": "legacy"},
+                {"action": "rename_field", "field": "age", "details": {"to": "years"}},
+            ]
+        }
+        asyncio.run(
+            apply_migration_plan(
+                {"db": {"users": coll}}, "db", "users", plan, PLAN_SCHEMA, allow_remove=True
+            )
+        )
+
+        assert coll.finds == []
+        assert coll.updates == [
+            {"status": {"$exists": False}},
+            {"legacy": {"$exists": True}},
+            {"age": {"$exists": True}},
+        ]
+
+    def test_fused_steps_share_one_bulk_write(self):
+        """Fusing should send every applied step as one ordered bulk write."""
+        coll = _FakeCollection([{"_id": i} for i in range(3)])
+        result = asyncio.run(
+            apply_migration_plan(
+                {"db": {"users": coll}}, "db", "users", self.PLAN, PLAN_SCHEMA, fuse_steps=True
+            )
+        )
+
+        assert coll.bulk_writes == 1
+        assert coll.updates == [
+            {"status": {"$exists": False}},
+            {"age": {"$exists": True}},
+            {"age": {"$exists": True}},
+        ]
+        assert result["summary"] == {"updated": 9, "skipped": 2, "errors": 0}
+        assert result["steps"][2]["skipped"] is True
+        assert [result["steps"][i]["updated"] for i in (0, 1, 3)] == [None, None, None]
+
+    def test_fusing_ignored_when_batching(self):
+        """A resume point should fall back to per-step batched updates."""
+        assert self._apply(fuse_steps=True, resume_from=-1) == self._apply(resume_from=-1)
+
+
+class TestGroupStepsByField:
+    """Tests for _group_steps_by_field."""
+
+    def test_disjoint_fields_split(self):
+        """Steps on different fields should land in separate chains."""
+        steps = [{"field": "a"}, {"field": "b"}, {"field": "a"}]
+        assert _group_steps_by_field(steps) == [[0, 2], [1]]
+
+    def test_rename_links_target(self):
+        """A rename should share a chain with steps on its target name."""
+        steps = [
+            {"field": "a"},
+            {"field": "b"},
+            {"field": "a", "action": "rename_field", "details": {"to": "b"}},
+            {"field": "c"},
+        ]
+        assert _group_steps_by_field(steps) == [[0, 1, 2], [3]]
+
+    def test_dotted_paths_share_parent_chain(self):
+        """A parent field and its dotted children should run in one chain."""
+        steps = [
+            {"field": "address"},
+            {"field": "email"},
+            {"field": "address.city"},
+            {"field": "name", "action": "rename_field", "details": {"to": "profile.name"}},
+            {"field": "profile"},
+        ]
+        assert _group_steps_by_field(steps) == [[0, 2], [1], [3, 4]]
+
+
+class TestDefaultValueForBsonType:
+    """Tests for _default_value_for_bson_type."""
+
+    def test_date_default_is_aware_utc(self):
+        """Backfilled dates should be timezone-aware UTC."""
+        value = _default_value_for_bson_type("date")
+        assert value.utcoffset().total_seconds() == 0
+
+
+class TestParseResumeId:
+    """Tests for _parse_resume_id."""
+
+    def test_object_id_string(self):
+        """A 24-hex string should become an ObjectId."""
+        from bson import ObjectId
+
+        value = "65a1b2c3d4e5f60718293a4b"
+        assert _parse_resume_id(value) == ObjectId(value)
+
+    def test_other_values_pass_through(self):
+        """Non-ObjectId strings and other types should be returned unchanged."""
+        assert _parse_resume_id("user-42") == "user-42"
+        assert _parse_resume_id(42) == 42
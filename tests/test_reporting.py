@@ -0,0 +1,65 @@
+"""Tests for reporting helpers."""
+
+from __future__ import annotations
+
+import json
+from datetime import datetime
+
+import pytest
+
+from mongo_schematic import reporting
+from mongo_schematic.reporting import dumps_json, loads_json
+
+
+@pytest.fixture(params=["orjson", "stdlib"])
+def backend(request, monkeypatch):
+    if request.param == "stdlib":
+        monkeypatch.setattr(reporting, "orjson", None)
+    elif reporting.orjson is None:
+        pytest.skip("orjson not installed")
+    return request.param
+
+
+class TestDumpsJson:
+    """Tests for dumps_json function."""
+
+    def test_round_trips(self, backend):
+        """Output should be UTF-8 JSON bytes that parse back to the payload."""
+        payload = {"name": "café", "nested": {"count": 3}, "items": [1, None]}
+        data = dumps_json(payload)
+        assert isinstance(data, bytes)
+        assert json.loads(data) == payload
+
+    def test_indent_toggle(self, backend):
+        """Compact output should contain no newlines."""
+        assert b"\n" in dumps_json({"a": 1})
+        assert b"\n" not in dumps_json({"a": 1}, indent=False)
+
+    def test_compact_matches_across_backends(self, backend):
+        """Compact output should use tight separators and raw UTF-8."""
+        assert dumps_json({"a": [1, "é"]}, indent=False) == '{"a":[1,"é"]}'.encode("utf-8")
+
+    def test_default_handles_unknown_types(self, backend):
+        """The default hook should serialize otherwise unsupported values."""
+        class Opaque:
+            def __str__(self):
+                return "opaque"
+
+        data = dumps_json({"value": Opaque(), "at": datetime(2024, 1, 1)}, default=str)
+        assert json.loads(data)["value"] == "opaque"
+
+
+class TestLoadsJson:
+    """Tests for loads_json function."""
+
+    def test_parses_bytes(self, backend):
+        """UTF-8 bytes should parse without decoding to str first."""
+        assert loads_json('{"name": "café", "n": [1, 2]}'.encode("utf-8")) == {
+            "name": "café",
+            "n": [1, 2],
+        }
+
+    def test_invalid_raises_json_error(self, backend):
+        """Malformed input should raise json.JSONDecodeError for either backend."""
+        with pytest.raises(json.JSONDecodeError):
+            loads_json(b"{not json")
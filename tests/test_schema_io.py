@@ -0,0 +1,44 @@
+"""Tests for schema file helpers."""
+
+from __future__ import annotations
+
+from mongo_schematic.schema_io import list_schema_files, load_schema
+
+
+class TestListSchemaFiles:
+    """Tests for list_schema_files function."""
+
+    def test_filters_and_sorts(self, tmp_path):
+        """Only .yml/.yaml files should be returned, sorted by path."""
+        for name in ("users.yml", "orders.yaml", "notes.txt", "README.md"):
+            (tmp_path / name).write_text("{}")
+        (tmp_path / "nested.yml").mkdir()
+
+        assert list_schema_files(tmp_path) == [
+            tmp_path / "orders.yaml",
+            tmp_path / "users.yml",
+        ]
+
+    def test_empty_directory(self, tmp_path):
+        """An empty directory should yield no files."""
+        assert list_schema_files(tmp_path) == []
+
+    def test_missing_directory(self, tmp_path):
+        """A missing directory should have no schema files."""
+        assert list_schema_files(tmp_path / "missing") == []
+
+
+class TestLoadSchema:
+    """Tests for load_schema function."""
+
+    def test_parses_yaml(self, tmp_path):
+        """Schema files should parse to plain dicts."""
+        path = tmp_path / "users.yml"
+        path.write_text("collection: users\nschema:\n  required: [name]\n")
+        assert load_schema(path) == {"collection": "users", "schema": {"required": ["name"]}}
+
+    def test_empty_file(self, tmp_path):
+        """An empty file should load as an empty dict."""
+        path = tmp_path / "empty.yml"
+        path.write_text("")
+        assert load_schema(path) == {}
@@ -0,0 +1,42 @@
+"""Tests for BSON type detection."""
+
+from __future__ import annotations
+
+import re
+from collections import OrderedDict
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+from bson import Binary, Int64, ObjectId, Regex
+
+from mongo_schematic.utils import detect_type
+
+
+class TestDetectType:
+    """Tests for detect_type function."""
+
+    @pytest.mark.parametrize(
+        "value, expected",
+        [
+            (None, "null"),
+            (True, "bool"),
+            (1, "int"),
+            (Int64(1), "long"),
+            (1.5, "double"),
+            ("x", "string"),
+            ({}, "object"),
+            (OrderedDict(), "object"),
+            ([], "array"),
+            (datetime(2024, 1, 1), "date"),
+            (ObjectId(), "objectId"),
+            (Decimal("1.5"), "decimal"),
+            (Binary(b"x"), "binData"),
+            (b"x", "binData"),
+            (Regex("^a"), "regex"),
+            (re.compile("^a"), "regex"),
+        ],
+    )
+    def test_types(self, value, expected):
+        """Values should map to their BSON type alias."""
+        assert detect_type(value) == expected